@@ -34,20 +34,38 @@ async def process_incoming_message(message: dict):
     print(f'Received: {message}')
 
 
+# ---------------------------------------------------------
+#
+async def process_incoming_batch(messages: list):
+    """ Print received batch of messages.
+
+    :param messages:
+    """
+    print(f'Received batch of {len(messages)} messages:')
+
+    for message in messages:
+        print(f'  {message}')
+
+
 # ---------------------------------------------------------
 #
 async def receiver():
     """ Start a asyncio task to consume messages. """
     print(f'Started RabbitMQ message queue subscription on {SERVICE}...')
-    client = RabbitClient(config.rabbit_url, SERVICE, process_incoming_message)
-    connection = await asyncio.create_task(client.start_subscription())
+    handler = (process_incoming_batch if config.consumer_batch_size
+               else process_incoming_message)
+    client = RabbitClient(config.rabbit_url, SERVICE, handler,
+                          config.consumer_concurrency, config.consumer_prefetch,
+                          config.consumer_batch_size, config.consumer_batch_window)
+    await asyncio.create_task(client.start_subscription())
 
     try:
         # Wait until termination.
         await asyncio.Future()
 
     finally:
-        await connection.close()
+        # Finish the messages that are being handled.
+        await client.stop_subscription(timeout=10.0)
 
 
 # ---------------------------------------------------------
@@ -40,7 +40,8 @@ health_example = {
             "name": "Certificate.valid",
             "status": True
         }
-    ]
+    ],
+    "status_cache": {"hits": 5120, "misses": 312, "items": 288, "bytes": 73216}
 }
 
 status_example = {
@@ -48,17 +49,39 @@ status_example = {
     "result": {"message": "Lots of work was done here", "value": 3}
 }
 
+bulk_status_example = {
+    "items": [
+        {"id": "94624ffb-d5e8-4fbb-a760-dbdef0abb46f", "status": "PENDING"},
+        {"id": "0f1c0d6e-2c7e-4d0a-9b59-0f5b3c6f7a21", "status": "SUCCESS",
+         "result": {"message": "Lots of work was done here"}}
+    ]
+}
+
 process_example = {
     "status": "PENDING",
     "id": "94624ffb-d5e8-4fbb-a760-dbdef0abb46f"
 }
 
+batch_example = {
+    "items": [
+        {"status": "PENDING", "id": "94624ffb-d5e8-4fbb-a760-dbdef0abb46f"},
+        {"status": "PENDING", "id": "0f1c0d6e-2c7e-4d0a-9b59-0f5b3c6f7a21"}
+    ]
+}
+
 retry_example = {
     "status": "PENDING",
     "task_id": "9a8e43a6-be5b-41da-8cd1-b6ba78222417",
     "failed_id": "94624ffb-d5e8-4fbb-a760-dbdef0abb46f"
 }
 
+retry_summary_example = {
+    "selected": 2,
+    "resubmitted": 2,
+    "failed": 0,
+    "items": [retry_example]
+}
+
 post_query_documentation = {
     "callback_url": {'default': None,
                      'description': 'Specify callback URL.<br>'
@@ -66,9 +89,45 @@ post_query_documentation = {
     "callback_queue": {'default': None,
                        'description': 'Specify name of callback service.<br>'
                                       '*Example: `CallerService`*'},
+    "callback_batch": {'default': False,
+                       'description': 'Send the callback response batched together with '
+                                      'other responses to the same callback URL (as one '
+                                      'JSON array) or queue (needs the outbox '
+                                      'callback delivery mode).'},
+    "priority": {'default': None,
+                 'description': 'Specify priority lane (*high*, *normal* or *bulk*).<br>'
+                                'Defaults to the priority configured for the API key.'},
+    "ttl": {'default': None, 'gt': 0,
+            'description': 'Seconds until the task expires (is dropped unprocessed).'},
+    "deadline": {'default': None,
+                 'description': 'Time when the task expires (is dropped unprocessed).<br>'
+                                '*Example: `2026-10-17T12:00:00Z`*'},
 }
 """ OpenAPI Process POST query parameters documentation. """
 
+post_header_documentation = {
+    "idempotency_key": {'default': None, 'alias': 'Idempotency-Key',
+                        'description': 'Optional unique request key. A repeated key '
+                                       'returns the existing task instead of a new one.<br>'
+                                       '*Example: `0d6a0c1e-5d43-4f0e-9d8e-7c0a1b2c3d4e`*'},
+}
+""" OpenAPI Process POST header parameters documentation. """
+
+status_query_documentation = {
+    "ids": {'description': 'Task IDs to check status for.'},
+    "traceback": {'default': True,
+                  'description': 'Return the traceback for a failed task.<br>'
+                                 'When false, only the exception info is returned.'},
+}
+""" OpenAPI Process status query parameters documentation. """
+
+revoke_query_documentation = {
+    "ids": {'description': 'Task IDs to revoke.'},
+    "terminate": {'default': False,
+                  'description': 'Terminate the task when it is already running.'},
+}
+""" OpenAPI Process revoke parameters documentation. """
+
 tags_metadata = [
     {
         "name": "Process endpoints",
@@ -125,13 +184,18 @@ and callbacks to keep a responsive API regardless of processing time.**
     *Prism is an open-source HTTP mock and proxy server.*
     
 <br>**The following HTTP status codes are returned:**
-  * `200:` Successful GET response.
+  * `200:` Successful GET (status events are streamed as `text/event-stream`) or revoke response.
   * `202:` Successful POST response.
   * `400:` Task ID has the wrong state for a retry (not FAILED).
-  * `404:` Task ID not found in DB.
+  * `404:` Task ID not found in DB (or owned by another tenant).
+  * `406:` Both callback (or both ttl and deadline) query arguments are provided,
+    or a batched callback is requested without outbox callback delivery.
+  * `413:` Batch contains more payloads (or task IDs) than allowed.
+  * `429:` Processing backlog is full, retry after `Retry-After` seconds.
   * `422:` Validation error, supplied parameter(s) are incorrect.
   * `500:` Failed Health response.
-  * `500:` Failed Celery task initialisation.
+  * `500:` Failed Celery task initialisation (or revoke).
+  * `503:` No workers available for the backlog, retry after `Retry-After` seconds.
 <br><br>
 ---
 """
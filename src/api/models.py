@@ -13,14 +13,16 @@ VERSION INFO::
 
 # BUILTIN modules
 from uuid import UUID
+from datetime import datetime
 from typing import Optional, List, Union
 
 # Third party modules
-from pydantic import ConfigDict, BaseModel
+from pydantic import ConfigDict, BaseModel, Field
 
 # local modules
 from .documentation import (process_example, status_example,
-                            retry_example, health_example)
+                            retry_example, health_example, batch_example,
+                            bulk_status_example, retry_summary_example)
 
 
 # -----------------------------------------------------------------------------
@@ -46,6 +48,30 @@ class ArgumentError(BaseModel):
     detail: str = "Only one query argument can be provided in query URL"
 
 
+class BatchSizeError(BaseModel):
+    """ Define OpenAPI documentation for a http 413 exception (Payload Too Large).
+
+    :ivar detail: Error detail text.
+    """
+    detail: str = "Batch contains more payloads than allowed"
+
+
+class BacklogError(BaseModel):
+    """ Define OpenAPI documentation for a http 429 exception (Too Many Requests).
+
+    :ivar detail: Error detail text.
+    """
+    detail: str = "Processing backlog is full (25000 queued tasks)"
+
+
+class NoWorkersError(BaseModel):
+    """ Define OpenAPI documentation for a http 503 exception (Service Unavailable).
+
+    :ivar detail: Error detail text.
+    """
+    detail: str = "No workers available (25000 queued tasks)"
+
+
 class HealthStatusError(BaseModel):
     """ Define OpenAPI documentation for a http 500 exception (INTERNAL_SERVER_ERROR).
 
@@ -74,6 +100,22 @@ class ResourceModel(BaseModel):
     status: bool
 
 
+# -----------------------------------------------------------------------------
+#
+class StatusCacheModel(BaseModel):
+    """ Representation of the task status cache statistics (this API process).
+
+    :ivar hits: Number of cache hits.
+    :ivar misses: Number of cache misses.
+    :ivar items: Number of cached task states.
+    :ivar bytes: Estimated size of the cached task states.
+    """
+    hits: int
+    misses: int
+    items: int
+    bytes: int
+
+
 # -----------------------------------------------------------------------------
 #
 class HealthResponseModel(BaseModel):
@@ -84,6 +126,7 @@ class HealthResponseModel(BaseModel):
     :ivar version: Service version.
     :ivar resources: Status for individual resources.
     :ivar cert_remaining_days: Remaining SSL/TLS certificate valid days.
+    :ivar status_cache: Task status cache statistics.
     """
     model_config = ConfigDict(json_schema_extra={"example": health_example})
 
@@ -92,6 +135,7 @@ class HealthResponseModel(BaseModel):
     version: str
     cert_remaining_days: int
     resources: List[ResourceModel]
+    status_cache: StatusCacheModel
 
 
 # -----------------------------------------------------------------------------
@@ -100,7 +144,7 @@ class ProcessResponseModel(BaseModel):
     """ Define the OpenAPI model for API process_payload responses.
 
     :ivar id: Task ID for the current job.
-    :ivar status: Response status (REVOKED|STARTED|PENDING|RETRY|FAILURE|SUCCESS).
+    :ivar status: Response status (EXPIRED|REVOKED|STARTED|PENDING|RETRY|FAILURE|SUCCESS).
     """
     model_config = ConfigDict(json_schema_extra={"example": process_example})
 
@@ -108,12 +152,41 @@ class ProcessResponseModel(BaseModel):
     status: str
 
 
+# -----------------------------------------------------------------------------
+#
+class BatchItemModel(BaseModel):
+    """ Define the OpenAPI model for one API process_batch payload item.
+
+    The callback parameters are optional and override the shared
+    callback query parameters for this item only.
+
+    :ivar payload: Data to be processed by Celery.
+    :ivar callback_url: Optional item callback URL.
+    :ivar callback_queue: Optional item callback queue name.
+    """
+    payload: dict
+    callback_url: Optional[str] = None
+    callback_queue: Optional[str] = None
+
+
+# -----------------------------------------------------------------------------
+#
+class BatchResponseModel(BaseModel):
+    """ Define the OpenAPI model for API process_batch responses.
+
+    :ivar items: Task status for each payload, in submission order.
+    """
+    model_config = ConfigDict(json_schema_extra={"example": batch_example})
+
+    items: List[ProcessResponseModel]
+
+
 # -----------------------------------------------------------------------------
 #
 class StatusResponseModel(BaseModel):
     """ Define the OpenAPI model for a pending API check_task_status responses.
 
-    :ivar status: Response status (REVOKED|STARTED|PENDING|RETRY|FAILURE|SUCCESS).
+    :ivar status: Response status (EXPIRED|REVOKED|STARTED|PENDING|RETRY|FAILURE|SUCCESS).
     :ivar result: Possible response message when status is FAILURE or SUCCESS.
     """
     model_config = ConfigDict(json_schema_extra={"example": status_example})
@@ -122,12 +195,34 @@ class StatusResponseModel(BaseModel):
     result: Optional[Union[dict, str]] = None
 
 
+# -----------------------------------------------------------------------------
+#
+class TaskStatusModel(StatusResponseModel):
+    """ Define the OpenAPI model for one task in a bulk status response.
+
+    :ivar id: Task ID.
+    """
+    id: UUID
+
+
+# -----------------------------------------------------------------------------
+#
+class BulkStatusResponseModel(BaseModel):
+    """ Define the OpenAPI model for API check_task_statuses responses.
+
+    :ivar items: Task status for each requested task ID.
+    """
+    model_config = ConfigDict(json_schema_extra={"example": bulk_status_example})
+
+    items: List[TaskStatusModel]
+
+
 # -----------------------------------------------------------------------------
 #
 class RetryResponseModel(BaseModel):
     """ Define the OpenAPI model for API retry_failed_task responses.
 
-    :ivar status: Response status (REVOKED|STARTED|PENDING|RETRY|FAILURE|SUCCESS).
+    :ivar status: Response status (EXPIRED|REVOKED|STARTED|PENDING|RETRY|FAILURE|SUCCESS).
     :ivar task_id: Task ID for the current job.
     :ivar failed_id: Task ID for a failed job.
     """
@@ -136,3 +231,39 @@ class RetryResponseModel(BaseModel):
     status: str
     task_id: UUID
     failed_id: UUID
+
+
+# -----------------------------------------------------------------------------
+#
+class RetryFilterModel(BaseModel):
+    """ Define the OpenAPI model for API retry_failed_tasks selection filters.
+
+    :ivar date_from: Only tasks that failed at, or after this time.
+    :ivar date_to: Only tasks that failed at, or before this time.
+    :ivar task_name: Only tasks with this name.
+    :ivar error_type: Only tasks that failed with this exception type.
+    :ivar max_count: Max number of retried tasks (oldest first).
+    """
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    task_name: Optional[str] = Field(None, examples=['tasks.processor'])
+    error_type: Optional[str] = Field(None, examples=['ValueError'])
+    max_count: int = Field(1000, gt=0)
+
+
+# -----------------------------------------------------------------------------
+#
+class RetrySummaryModel(BaseModel):
+    """ Define the OpenAPI model for API retry_failed_tasks responses.
+
+    :ivar selected: Number of failed tasks that matched the filters.
+    :ivar resubmitted: Number of resubmitted tasks.
+    :ivar failed: Number of tasks that couldn't be resubmitted.
+    :ivar items: New and failed task ID for each resubmitted task.
+    """
+    model_config = ConfigDict(json_schema_extra={"example": retry_summary_example})
+
+    selected: int
+    resubmitted: int
+    failed: int
+    items: List[RetryResponseModel]
@@ -12,26 +12,259 @@ VERSION INFO::
 """
 
 # BUILTIN modules
+import asyncio
 from uuid import UUID
+from datetime import datetime, timedelta, timezone
+from collections import defaultdict
+from typing import AsyncIterator, Dict, List, Optional, Sequence
 
 # Third party modules
+from celery import group, states
+from celery.utils import uuid
 from loguru import logger
-from celery.result import AsyncResult
 from kombu.exceptions import OperationalError
-from fastapi import HTTPException, Depends, APIRouter, Query
+from pymongo.errors import PyMongoError
+from fastapi import HTTPException, Depends, APIRouter, Query, Body, Header
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 
 # local modules
-from ..tasks import processor, WORKER
+from src import config
+from ..tasks import processor, WORKER, CLAIMS, DURATIONS
 from .documentation import post_query_documentation as query_doc
-from ..tools.security import validate_authentication
+from .documentation import status_query_documentation as status_doc
+from .documentation import post_header_documentation as header_doc
+from .documentation import revoke_query_documentation as revoke_doc
+from ..core.setup import Priority, TenantConfig
+from ..tools.task_routing import select_queue
+from ..tools.claim_check import CLAIM_PARAM
+from ..tools.task_durations import payload_size
+from ..tools.security import (validate_authentication, charge_tokens, owns_task,
+                              tenant_by_name, DEFAULT_TENANT)
+from ..tools.status_hub import StatusHub
+from ..tools.admission import AdmissionController
+from ..tools.idempotency import IdempotencyStore
+from ..tools.task_owners import TaskOwners
+from ..tools.failed_tasks import (find_failed_tasks, claim_failed_tasks,
+                                  release_failed_tasks, mark_retried)
+from ..tools.task_status import (get_task_status, get_task_statuses,
+                                 invalidate_task_status, TERMINAL_STATES)
+from ..tools.task_revoke import revoke_tasks
+from ..tools.task_publisher import TaskPublisher
+from ..tools.rabbit_client import PUBLISHER as RABBIT_PUBLISHER
 from .models import (ArgumentError, ProcessResponseModel,
                      StatusResponseModel, RetryResponseModel,
-                     NotFoundError, UnknownError, BadStateError)
+                     NotFoundError, UnknownError, BadStateError,
+                     BatchItemModel, BatchResponseModel, BatchSizeError,
+                     BulkStatusResponseModel, TaskStatusModel,
+                     RetryFilterModel, RetrySummaryModel,
+                     BacklogError, NoWorkersError)
 
 # Constants
 ROUTER = APIRouter(prefix="/v1/process", tags=["Process endpoints"],
                    dependencies=[Depends(validate_authentication)])
 """ Process API endpoint router. """
+PUBLISHER = TaskPublisher(WORKER, RABBIT_PUBLISHER)
+""" Non-blocking Celery task publisher (used in 'async' submission mode). """
+HUB = StatusHub(config.status_stream_source, config.status_poll_interval)
+""" Shared task status event source for all streaming subscribers. """
+IDEMPOTENCY = IdempotencyStore(WORKER, config.idempotency_window,
+                               config.idempotency_cache_size)
+""" Idempotency key to task ID mapping for process_payload. """
+OWNERS = TaskOwners(WORKER)
+""" Tenant that submitted each task (only the owner can revoke a task). """
+ADMISSION = AdmissionController(config.rabbit_url, lambda: list(WORKER.amqp.queues),
+                                config.admission_max_backlog,
+                                config.admission_max_wait,
+                                config.admission_interval,
+                                config.rabbit_management_port)
+""" Queue depth aware admission control for new tasks. """
+
+
+# ---------------------------------------------------------
+#
+def _callback_params(tenant: TenantConfig, callback_url: Optional[str],
+                     callback_queue: Optional[str],
+                     callback_batch: bool = False) -> dict:
+    """ Return task callback parameters for the specified query arguments.
+
+    The tenant name is recorded in the parameters as the task owner
+    (used when failed tasks are retried).
+
+    :param tenant: Tenant configuration for the request API key.
+    :param callback_url: Optional URL callback query parameter.
+    :param callback_queue: Optional queue callback query parameter.
+    :param callback_batch: Send the callback response batched.
+    :return: Callback parameters used by the Celery response_handler.
+    :raise HTTPException(406): When both callback arguments have a value,
+        or batched callbacks are requested without outbox delivery.
+    """
+
+    # Verify that none, or only one of the query parameters has a value.
+    if all(info is not None for info in (callback_queue, callback_url)):
+        errmsg = "Only one query argument can be provided in query URL"
+        raise HTTPException(status_code=406, detail=errmsg)
+
+    # Each prefork worker process would only batch its own responses.
+    if callback_batch and config.callback_delivery != 'outbox':
+        errmsg = "Batched callbacks need the 'outbox' callback delivery mode"
+        raise HTTPException(status_code=406, detail=errmsg)
+
+    params = {'callbackUrl': callback_url,
+              'callbackQueue': callback_queue, 'tenant': tenant.name}
+
+    if callback_batch:
+        params['callbackBatch'] = True
+
+    return params
+
+
+# ---------------------------------------------------------
+#
+def _expires(ttl: Optional[float],
+             deadline: Optional[datetime]) -> Optional[datetime]:
+    """ Return the task expiry time for the specified query arguments.
+
+    :param ttl: Optional time to live (seconds) query parameter.
+    :param deadline: Optional deadline query parameter.
+    :return: Task expiry time (None when the task never expires).
+    :raise HTTPException(406): When both arguments have a value.
+    """
+
+    if ttl is not None and deadline is not None:
+        errmsg = "Only one of the ttl and deadline arguments can be provided"
+        raise HTTPException(status_code=406, detail=errmsg)
+
+    if ttl is not None:
+        return datetime.now(timezone.utc) + timedelta(seconds=ttl)
+
+    if deadline is not None and deadline.tzinfo is None:
+        return deadline.replace(tzinfo=timezone.utc)
+
+    return deadline
+
+
+# ---------------------------------------------------------
+#
+async def _check_admission():
+    """ Reject new tasks when the Celery queues are overloaded.
+
+    :raise HTTPException(429): When the backlog is above the limits.
+    :raise HTTPException(503): When there are no workers for the backlog.
+    """
+    ADMISSION.check()
+
+
+# ---------------------------------------------------------
+#
+async def _task_options(tenant: TenantConfig, priority: Optional[Priority],
+                        payloads: List[dict]) -> dict:
+    """ Return task execution options (routing) for a tenant's task.
+
+    With duration routing enabled, normal priority tasks are sent to the
+    short queue when the recorded runtime for the largest payload is short.
+
+    :param tenant: Tenant configuration for the request API key.
+    :param priority: Requested priority lane (defaults to the tenant's).
+    :param payloads: Task payloads (or claim check references).
+    :return: Task execution options.
+    """
+    options = {}
+    short = False
+
+    if config.duration_routing:
+        size = max((payload_size(payload) for payload in payloads), default=0)
+        short = await DURATIONS.is_short(processor.name, size)
+
+    if queue := select_queue(tenant, priority, short):
+        options['queue'] = queue
+
+    return options
+
+
+# ---------------------------------------------------------
+#
+async def _offload(payloads: List[dict], params_list: List[dict]) -> List[tuple]:
+    """ Return task arguments where large payloads are replaced by claim check references.
+
+    An offloaded payload is marked in its task parameters, so the worker
+    only resolves references that the API has created.
+
+    :param payloads: Payloads to be processed by Celery.
+    :param params_list: Task parameters, one item per payload.
+    :return: Task arguments (payload or reference, and parameters).
+    """
+
+    if CLAIMS.threshold <= 0:
+        return list(zip(payloads, params_list))
+
+    def offload(payload: dict, params: dict) -> tuple:
+        if (value := CLAIMS.offload(payload)) is payload:
+            return payload, params
+
+        return value, {**params, CLAIM_PARAM: True}
+
+    return await run_in_threadpool(
+        lambda: [offload(*args) for args in zip(payloads, params_list)])
+
+
+# ---------------------------------------------------------
+#
+async def _record_owners(task_ids: List[str], tenant: str, task=processor):
+    """ Record the tenant as the owner of submitted tasks.
+
+    The tasks have already been submitted, so a failed record is only
+    logged (the tenant can't revoke these tasks then).
+
+    :param task_ids: Submitted task IDs.
+    :param tenant: Name of the tenant that owns the tasks.
+    :param task: Submitted Celery task.
+    """
+
+    try:
+        await OWNERS.record(task_ids, tenant, task.name)
+
+    except PyMongoError as why:
+        logger.error(f'Failed to record the owner of {len(task_ids)} tasks: {why}')
+
+
+# ---------------------------------------------------------
+#
+async def _send_task(task, args: Sequence, **options) -> ProcessResponseModel:
+    """ Send one task to Celery using the configured submission mode.
+
+    :param task: Celery task to execute.
+    :param args: Task positional arguments.
+    :param options: Task execution options (task_id, queue, expires...).
+    :return: Task ID and status of the submitted task.
+    :raise OperationalError: When the task can't be published.
+    """
+
+    if config.task_submission == 'async':
+        task_id = await PUBLISHER.apply_async(task.name, args, **options)
+        return ProcessResponseModel(status=states.PENDING, id=task_id)
+
+    result = task.apply_async(args=args, **options)
+    return ProcessResponseModel(status=result.state, id=result.id)
+
+
+# ---------------------------------------------------------
+#
+async def _send_batch(task, args_list: List[Sequence], **options) -> List[str]:
+    """ Send several tasks to Celery using the configured submission mode.
+
+    :param task: Celery task to execute.
+    :param args_list: Task positional arguments, one item per task.
+    :param options: Task execution options shared by all tasks.
+    :return: Task IDs, in the same order as args_list.
+    :raise OperationalError: When the tasks can't be published.
+    """
+
+    if config.task_submission == 'async':
+        return await PUBLISHER.apply_many(task.name, args_list, **options)
+
+    result = group(task.s(*args) for args in args_list).apply_async(**options)
+    return [item.id for item in result.results]
 
 
 # ---------------------------------------------------------
@@ -39,38 +272,362 @@ ROUTER = APIRouter(prefix="/v1/process", tags=["Process endpoints"],
 @ROUTER.post(
     '', status_code=202,
     response_model=ProcessResponseModel,
+    dependencies=[Depends(_check_admission)],
     responses={500: {"model": UnknownError},
-               406: {"model": ArgumentError}}
+               406: {"model": ArgumentError},
+               429: {"model": BacklogError},
+               503: {"model": NoWorkersError}}
 )
 async def process_payload(
         payload: dict,
         callback_url: str = Query(**query_doc['callback_url']),
         callback_queue: str = Query(**query_doc['callback_queue']),
+        callback_batch: bool = Query(**query_doc['callback_batch']),
+        priority: Priority = Query(**query_doc['priority']),
+        ttl: float = Query(**query_doc['ttl']),
+        deadline: datetime = Query(**query_doc['deadline']),
+        idempotency_key: str = Header(**header_doc['idempotency_key']),
+        tenant: TenantConfig = Depends(validate_authentication),
 ) -> ProcessResponseModel:
     """**Trigger Celery task processing of specified payload.**
 
+    When an *Idempotency-Key* header is supplied and the same key has been
+    used within the idempotency window, the existing task ID and its current
+    status are returned instead of processing the payload again.
+
     :param payload: Data to be processed by Celery.
     :param callback_url: Optional URL callback query parameter.
     :param callback_queue: Optional queue callback query parameter.
+    :param callback_batch: Optional batched callback query parameter.
+    :param priority: Optional priority lane query parameter.
+    :param ttl: Optional time to live (seconds) query parameter.
+    :param deadline: Optional deadline query parameter.
+    :param idempotency_key: Optional client supplied request key.
+    :param tenant: Tenant configuration for the request API key.
     """
 
-    # Verify that none, or only one of the query parameters has a value.
-    if all(info is not None for info in (callback_queue, callback_url)):
-        errmsg = "Only one query argument can be provided in query URL"
-        raise HTTPException(status_code=406, detail=errmsg)
+    params = _callback_params(tenant, callback_url, callback_queue, callback_batch)
+    expires = _expires(ttl, deadline)
+    task_id = uuid()
+
+    # Idempotency keys are unique per tenant.
+    if idempotency_key:
+        idempotency_key = f'{tenant.name}:{idempotency_key}'
+
+        if owner := await IDEMPOTENCY.claim(idempotency_key, task_id):
+            logger.debug(f'Idempotency key matched existing task [{owner}]')
+            status = await get_task_status(owner, False)
+            return ProcessResponseModel(status=status.status, id=owner)
 
     # Send payload and query arguments to Celery for processing.
+    sent = False
+
     try:
-        params = {'callbackUrl': callback_url, 'callbackQueue': callback_queue}
-        result = processor.delay(payload, params)
-        logger.debug(f'Added task [{result.id}] to Celery for processing')
-        return ProcessResponseModel(status=result.state, id=result.id)
+        [args] = await _offload([payload], [params])
+        options = await _task_options(tenant, priority, [args[0]])
+        response = await _send_task(processor, args,
+                                    task_id=task_id, expires=expires, **options)
+        sent = True
 
     except OperationalError as why:
         errmsg = f'Celery task initialization failed: {why}'
         logger.error(errmsg)
         raise HTTPException(status_code=500, detail=errmsg)
 
+    finally:
+        # The task wasn't sent, so the key must not point to it.
+        if idempotency_key and not sent:
+            await IDEMPOTENCY.release(idempotency_key, task_id)
+
+    if idempotency_key:
+        await IDEMPOTENCY.confirm(idempotency_key, task_id)
+
+    await _record_owners([task_id], tenant.name)
+    logger.debug(f'Added task [{response.id}] to Celery for processing')
+    return response
+
+
+# ---------------------------------------------------------
+#
+@ROUTER.post(
+    '/batch', status_code=202,
+    response_model=BatchResponseModel,
+    dependencies=[Depends(_check_admission)],
+    responses={500: {"model": UnknownError},
+               406: {"model": ArgumentError},
+               413: {"model": BatchSizeError},
+               429: {"model": BacklogError},
+               503: {"model": NoWorkersError}}
+)
+async def process_batch(
+        items: List[BatchItemModel],
+        callback_url: str = Query(**query_doc['callback_url']),
+        callback_queue: str = Query(**query_doc['callback_queue']),
+        callback_batch: bool = Query(**query_doc['callback_batch']),
+        priority: Priority = Query(**query_doc['priority']),
+        ttl: float = Query(**query_doc['ttl']),
+        deadline: datetime = Query(**query_doc['deadline']),
+        tenant: TenantConfig = Depends(validate_authentication),
+) -> BatchResponseModel:
+    """**Trigger Celery task processing of several payloads at once.**
+
+    All tasks are published on one broker connection and channel. The
+    callback query parameters are used for every item that does not
+    specify its own callback.
+
+    :param items: Payloads (and optional callbacks) to be processed by Celery.
+    :param callback_url: Optional shared URL callback query parameter.
+    :param callback_queue: Optional shared queue callback query parameter.
+    :param callback_batch: Optional batched callback query parameter.
+    :param priority: Optional priority lane query parameter.
+    :param ttl: Optional time to live (seconds) query parameter.
+    :param deadline: Optional deadline query parameter.
+    :param tenant: Tenant configuration for the request API key.
+    """
+
+    if not items:
+        raise HTTPException(status_code=406, detail="Batch contains no payloads")
+
+    if len(items) > config.max_batch_size:
+        errmsg = (f"Batch contains {len(items)} payloads, "
+                  f"max allowed is {config.max_batch_size}")
+        raise HTTPException(status_code=413, detail=errmsg)
+
+    # Each submitted task costs one token (one is taken by the authentication).
+    charge_tokens(tenant, len(items) - 1)
+
+    shared = _callback_params(tenant, callback_url, callback_queue, callback_batch)
+    expires = _expires(ttl, deadline)
+    params_list = []
+
+    for item in items:
+        if item.callback_url is None and item.callback_queue is None:
+            params_list.append(shared)
+
+        else:
+            params_list.append(_callback_params(tenant, item.callback_url,
+                                                item.callback_queue,
+                                                callback_batch))
+
+    args_list = await _offload([item.payload for item in items], params_list)
+    payloads = [args[0] for args in args_list]
+
+    # Send all payloads to Celery using one producer (newly published
+    # tasks are always PENDING, so the backend is not queried per item).
+    try:
+        options = await _task_options(tenant, priority, payloads)
+        task_ids = await _send_batch(processor, args_list,
+                                     expires=expires, **options)
+        await _record_owners(task_ids, tenant.name)
+        logger.debug(f'Added {len(task_ids)} batch tasks to Celery for processing')
+        return BatchResponseModel(
+            items=[ProcessResponseModel(status=states.PENDING, id=task_id)
+                   for task_id in task_ids])
+
+    except OperationalError as why:
+        errmsg = f'Celery task initialization failed: {why}'
+        logger.error(errmsg)
+        raise HTTPException(status_code=500, detail=errmsg)
+
+
+# ---------------------------------------------------------
+#
+async def _owned_tasks(task_ids: List[str], tenant: TenantConfig) -> Dict[str, str]:
+    """ Return the tasks that the tenant has submitted.
+
+    The service API key owns the tasks of all tenants.
+
+    :param task_ids: Task IDs to look up.
+    :param tenant: Tenant configuration for the request API key.
+    :return: Task name per owned task ID.
+    :raise HTTPException(500): When the task owners can't be read.
+    """
+
+    try:
+        owned = await OWNERS.owned(
+            task_ids, None if tenant is DEFAULT_TENANT else tenant.name)
+
+    except PyMongoError as why:
+        errmsg = f'Celery task revoke failed: {why}'
+        logger.error(errmsg)
+        raise HTTPException(status_code=500, detail=errmsg)
+
+    return {task_id: owner['name'] for task_id, owner in owned.items()}
+
+
+# ---------------------------------------------------------
+#
+async def _revoke(tasks: Dict[str, str], task_ids: List[str],
+                  terminate: bool) -> List[ProcessResponseModel]:
+    """ Revoke owned tasks and notify the status event subscribers.
+
+    Unknown task IDs and other tenants' tasks are not
+    changed, and they are reported as PENDING.
+
+    :param tasks: Task name per owned task ID.
+    :param task_ids: All requested task IDs.
+    :param terminate: Terminate running tasks as well.
+    :return: Task status for each requested task ID.
+    :raise HTTPException(500): When the revoke broadcast fails.
+    """
+    result = dict.fromkeys(task_ids, states.PENDING)
+
+    try:
+        if tasks:
+            result.update(await revoke_tasks(tasks, terminate))
+
+    except (OperationalError, PyMongoError) as why:
+        errmsg = f'Celery task revoke failed: {why}'
+        logger.error(errmsg)
+        raise HTTPException(status_code=500, detail=errmsg)
+
+    for task_id, state in result.items():
+        if state == states.REVOKED:
+            HUB.publish(task_id, StatusResponseModel(status=state))
+
+    return [ProcessResponseModel(status=state, id=task_id)
+            for task_id, state in result.items()]
+
+
+# ---------------------------------------------------------
+#
+@ROUTER.delete(
+    '/{task_id}',
+    response_model=ProcessResponseModel,
+    responses={500: {"model": UnknownError},
+               404: {"model": NotFoundError}}
+)
+async def revoke_task(
+        task_id: UUID,
+        terminate: bool = Query(**revoke_doc['terminate']),
+        tenant: TenantConfig = Depends(validate_authentication),
+) -> ProcessResponseModel:
+    """**Revoke a queued (or optionally running) Celery task.**
+
+    The task is dropped by the workers and stored as REVOKED. A task that
+    has already finished is not changed, its current status is returned.
+
+    :param task_id: Task ID to revoke.
+    :param terminate: Terminate the task when it is already running.
+    :param tenant: Tenant configuration for the request API key.
+    """
+
+    owned = await _owned_tasks([str(task_id)], tenant)
+
+    # Another tenant's task is reported as missing.
+    if not owned:
+        raise HTTPException(status_code=404,
+                            detail=f"Task ID {task_id} does not exist")
+
+    [response] = await _revoke(owned, [str(task_id)], terminate)
+    logger.debug(f'Revoked task [{task_id}] - {response.status}')
+    return response
+
+
+# ---------------------------------------------------------
+#
+@ROUTER.post(
+    '/revoke',
+    response_model=BatchResponseModel,
+    responses={500: {"model": UnknownError},
+               413: {"model": BatchSizeError}}
+)
+async def revoke_task_list(
+        ids: List[UUID] = Body(**revoke_doc['ids']),
+        terminate: bool = Query(**revoke_doc['terminate']),
+        tenant: TenantConfig = Depends(validate_authentication),
+) -> BatchResponseModel:
+    """**Revoke several queued (or optionally running) Celery tasks.**
+
+    All revocations are sent to the workers in one broadcast message.
+    Only the tenant's own tasks are revoked.
+
+    :param ids: Task IDs to revoke.
+    :param terminate: Terminate tasks that are already running.
+    :param tenant: Tenant configuration for the request API key.
+    """
+
+    task_ids = _unique_ids(ids)
+    owned = await _owned_tasks(task_ids, tenant)
+    items = await _revoke(owned, task_ids, terminate)
+    logger.debug(f'Revoked {len(items)} tasks')
+    return BatchResponseModel(items=items)
+
+
+# ---------------------------------------------------------
+#
+@ROUTER.post(
+    '/retry', status_code=202,
+    response_model=RetrySummaryModel,
+    responses={413: {"model": BatchSizeError}}
+)
+async def retry_failed_tasks(
+        filters: RetryFilterModel,
+        tenant: TenantConfig = Depends(validate_authentication),
+) -> RetrySummaryModel:
+    """**Trigger a retry for all previously failed tasks that match the filters.**
+
+    The failed tasks are selected with one DB query (oldest first) and
+    resubmitted in batches at a limited rate. Each batch is claimed in
+    the DB before it's resubmitted, so a retried task is not selected
+    again by the next (or a concurrent) bulk retry.
+
+    Only the tenant's own tasks are selected (the service API key selects
+    the tasks of all tenants), and they are routed to their tenant's queue.
+
+    :param filters: Failed task selection filters.
+    :param tenant: Tenant configuration for the request API key.
+    """
+
+    if filters.max_count > config.max_retry_count:
+        errmsg = (f"Retry max_count is {filters.max_count}, "
+                  f"max allowed is {config.max_retry_count}")
+        raise HTTPException(status_code=413, detail=errmsg)
+
+    owner = None if tenant is DEFAULT_TENANT else tenant.name
+    failed = await find_failed_tasks(tenant=owner, **filters.model_dump())
+    by_name, items, errors = defaultdict(list), [], 0
+
+    for document in failed:
+        params = document['args'][1]
+        by_name[document['name'], params.get('tenant')].append(document)
+
+    for (name, owner), documents in by_name.items():
+        for idx in range(0, len(documents), config.retry_batch_size):
+            chunk = documents[idx:idx + config.retry_batch_size]
+            claim, claimed = await claim_failed_tasks([item['_id'] for item in chunk])
+
+            # Tasks that a concurrent bulk retry has claimed are skipped.
+            if not (chunk := [item for item in chunk if item['_id'] in claimed]):
+                continue
+
+            args_list = [item['args'] for item in chunk]
+
+            try:
+                options = await _task_options(tenant_by_name(owner), None,
+                                              [args[0] for args in args_list])
+                task_ids = await _send_batch(WORKER.tasks[name], args_list, **options)
+
+            except (KeyError, OperationalError) as why:
+                logger.error(f'Bulk retry of {len(chunk)} {name} tasks failed: {why}')
+                await release_failed_tasks(claim)
+                errors += len(chunk)
+                continue
+
+            await _record_owners(task_ids, owner or DEFAULT_TENANT.name, WORKER.tasks[name])
+            retries = {item['_id']: task_id for item, task_id in zip(chunk, task_ids)}
+            await mark_retried(retries)
+            items += [RetryResponseModel(status=states.PENDING,
+                                         task_id=task_id, failed_id=failed_id)
+                      for failed_id, task_id in retries.items()]
+
+            # Limit the resubmission rate.
+            await asyncio.sleep(len(chunk) / config.retry_rate)
+
+    logger.info(f'Bulk retry resubmitted {len(items)} of {len(failed)} failed tasks')
+    return RetrySummaryModel(selected=len(failed), resubmitted=len(items),
+                             failed=errors, items=items)
+
 
 # ---------------------------------------------------------
 #
@@ -80,21 +637,35 @@ async def process_payload(
     responses={400: {"model": BadStateError},
                404: {"model": NotFoundError}}
 )
-async def retry_failed_task(failed_id: UUID) -> RetryResponseModel:
+async def retry_failed_task(
+        failed_id: UUID,
+        tenant: TenantConfig = Depends(validate_authentication),
+) -> RetryResponseModel:
     """**Trigger a retry for a previously failed task.**
 
+    The retried task is routed to the queue of the tenant that owns it.
+
     :param failed_id: Failed task ID that should be re-tried.
+    :param tenant: Tenant configuration for the request API key.
     """
+    meta = await run_in_threadpool(WORKER.backend.get_task_meta, str(failed_id))
 
-    # Extract and return Celery processing status from DB.
-    if meta := WORKER.backend.get_task_meta(str(failed_id)):
+    # Another tenant's task is reported as missing.
+    if meta.get('args') and owns_task(tenant, meta['args']):
 
         if meta['status'] == 'FAILURE':
+            args = meta['args']
             task = WORKER.tasks[meta['name']]
-            result = task.apply_async(args=meta['args'])
-            return RetryResponseModel(task_id=result.id,
+            options = await _task_options(
+                tenant_by_name(args[1].get('tenant')), None, [args[0]])
+            response = await _send_task(task, args, **options)
+            await _record_owners([str(response.id)],
+                                 args[1].get('tenant', DEFAULT_TENANT.name), task)
+            await mark_retried({str(failed_id): str(response.id)})
+            invalidate_task_status(str(failed_id))
+            return RetryResponseModel(task_id=response.id,
                                       failed_id=failed_id,
-                                      status=result.state)
+                                      status=response.status)
 
         errmsg = (f"Task ID {failed_id} has the "
                   f"wrong state for a retry (not FAILED)")
@@ -110,27 +681,177 @@ async def retry_failed_task(failed_id: UUID) -> RetryResponseModel:
     '/status/{task_id}',
     response_model_exclude_unset=True,
     response_model=StatusResponseModel,
-    responses={404: {"model": NotFoundError}}
 )
-async def check_task_status(task_id: UUID) -> StatusResponseModel:
+async def check_task_status(
+        task_id: UUID,
+        traceback: bool = Query(**status_doc['traceback']),
+) -> StatusResponseModel:
     """**Return specified Celery task progress status.**
 
+    The status is read from the DB in one query that only fetches
+    the fields that are needed for the response.
+
     :param task_id: Task ID to check status for.
+    :param traceback: Return the traceback for a failed task.
     """
 
-    # Extract and return Celery processing status from DB.
-    if not WORKER.backend.get_task_meta(str(task_id)):
-        raise HTTPException(status_code=404,
-                            detail=f"Task ID {task_id} does not exist")
+    return await get_task_status(str(task_id), traceback)
+
 
-    # Check Celery task processing status.
-    status = AsyncResult(str(task_id))
+# ---------------------------------------------------------
+#
+def _unique_ids(task_ids: List[UUID]) -> List[str]:
+    """ Return task IDs without duplicates, in the requested order.
+
+    :param task_ids: Requested task IDs.
+    :return: Unique task IDs.
+    :raise HTTPException(413): When too many task IDs are specified.
+    """
+    unique_ids = list(dict.fromkeys(str(task_id) for task_id in task_ids))
+
+    if len(unique_ids) > config.max_status_ids:
+        errmsg = (f"Query contains {len(unique_ids)} task IDs, "
+                  f"max allowed is {config.max_status_ids}")
+        raise HTTPException(status_code=413, detail=errmsg)
+
+    return unique_ids
+
+
+# ---------------------------------------------------------
+#
+async def _bulk_status(task_ids: List[UUID],
+                       traceback: bool) -> BulkStatusResponseModel:
+    """ Return Celery task progress status for several task IDs.
+
+    :param task_ids: Task IDs to check status for.
+    :param traceback: Return the traceback for failed tasks.
+    :raise HTTPException(413): When too many task IDs are specified.
+    """
+    result = await get_task_statuses(_unique_ids(task_ids), traceback)
+    return BulkStatusResponseModel(
+        items=[TaskStatusModel(id=task_id, **status.model_dump(exclude_unset=True))
+               for task_id, status in result.items()])
 
-    # Task processing has not finished yet.
-    if not status.ready():
-        return StatusResponseModel(status=status.state)
 
-    # Extract and return Celery processing status from DB.
-    if result := WORKER.backend.get_task_meta(str(task_id)):
-        key = ('result' if result['status'] == 'SUCCESS' else 'traceback')
-        return StatusResponseModel(status=result['status'], result=result[key])
+# ---------------------------------------------------------
+#
+@ROUTER.get(
+    '/status',
+    response_model_exclude_unset=True,
+    response_model=BulkStatusResponseModel,
+    responses={413: {"model": BatchSizeError}}
+)
+async def check_task_statuses(
+        ids: List[UUID] = Query(**status_doc['ids']),
+        traceback: bool = Query(**status_doc['traceback']),
+) -> BulkStatusResponseModel:
+    """**Return Celery task progress status for several tasks.**
+
+    All statuses are read from the DB using one query.
+
+    :param ids: Task IDs to check status for.
+    :param traceback: Return the traceback for failed tasks.
+    """
+
+    return await _bulk_status(ids, traceback)
+
+
+# ---------------------------------------------------------
+#
+@ROUTER.post(
+    '/status',
+    response_model_exclude_unset=True,
+    response_model=BulkStatusResponseModel,
+    responses={413: {"model": BatchSizeError}}
+)
+async def post_task_statuses(
+        ids: List[UUID] = Body(**status_doc['ids']),
+        traceback: bool = Query(**status_doc['traceback']),
+) -> BulkStatusResponseModel:
+    """**Return Celery task progress status for several tasks.**
+
+    Same as the GET variant, but the task IDs are sent in the request
+    body, which avoids URL length limits for large ID lists.
+
+    :param ids: Task IDs to check status for.
+    :param traceback: Return the traceback for failed tasks.
+    """
+
+    return await _bulk_status(ids, traceback)
+
+
+# ---------------------------------------------------------
+#
+async def _status_events(task_ids: List[str]) -> AsyncIterator[str]:
+    """ Yield Server-Sent Events for task status changes.
+
+    The current status of all tasks is sent first, after that only status
+    changes are sent until all tasks have reached a terminal state. The
+    statuses are re-read at each keep-alive interval as a safety net for
+    changes that happened before the subscription was active.
+
+    :param task_ids: Task IDs to stream status events for.
+    """
+    sent = {}
+    pending = set(task_ids)
+    queue = HUB.subscribe(task_ids)
+
+    def _event(task_id: str, status: StatusResponseModel) -> str:
+        """ Return an SSE status event (or nothing when it was already sent). """
+
+        if task_id not in pending or sent.get(task_id) == status.status:
+            return ''
+
+        sent[task_id] = status.status
+
+        if status.status in TERMINAL_STATES:
+            pending.discard(task_id)
+
+        data = TaskStatusModel(id=task_id, **status.model_dump(exclude_unset=True))
+        return f'event: status\ndata: {data.model_dump_json(exclude_unset=True)}\n\n'
+
+    try:
+        while pending:
+            result = await get_task_statuses(list(pending), False)
+            yield ''.join(_event(task_id, status)
+                          for task_id, status in result.items()) or ': keep-alive\n\n'
+
+            try:
+                while pending:
+                    task_id, status = await asyncio.wait_for(
+                        queue.get(), config.status_stream_keepalive)
+
+                    if event := _event(task_id, status):
+                        yield event
+
+            except asyncio.TimeoutError:
+                continue
+
+    finally:
+        HUB.unsubscribe(task_ids, queue)
+
+
+# ---------------------------------------------------------
+#
+@ROUTER.get(
+    '/events',
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}},
+               413: {"model": BatchSizeError}}
+)
+async def stream_task_statuses(
+        ids: List[UUID] = Query(**status_doc['ids']),
+) -> StreamingResponse:
+    """**Stream Celery task status changes as Server-Sent Events.**
+
+    One `status` event is sent per state change, with the same content as
+    a bulk status item (failed tasks return the exception info, not the
+    traceback). The stream ends when all tasks have reached a terminal
+    state, which makes polling for status unnecessary.
+
+    :param ids: Task IDs to stream status events for.
+    """
+
+    return StreamingResponse(_status_events(_unique_ids(ids)),
+                             media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache'})
@@ -11,8 +11,17 @@ VERSION INFO::
      $Rev: 7
 """
 
+# BUILTIN modules
+from os import environ
+
+# Third party modules
+from kombu import Queue
+
 # Local modules
 from src import config
+from src.tools.message_codecs import CONTENT_TYPES, select_codec
+from src.tools.task_routing import (LANE_QUEUES, SHORT_QUEUE,
+                                    all_tenant_queue_names)
 
 # ---------------------------------------------------------
 
@@ -26,6 +35,42 @@ result_backend = f'{config.mongo_url}service_results'
 # Add input parameters to backend result (used by retry endpoint).
 result_extended = True
 
+# Task messages and results use the configured serializer. All available
+# serializers are accepted, so json messages from older producers (and
+# stored json results) are still handled. The orjson serializer produces
+# application/json, which older (json only) workers accept as well.
+task_serializer = result_serializer = select_codec(config.task_serializer)
+accept_content = result_accept_content = list(CONTENT_TYPES)
+
+# The normal priority lane is the default queue and one or more queues per
+# tenant (API key), the worker consumes all of them round-robin (weighted
+# fair scheduling). The high and bulk lanes are shared by all tenants.
+task_default_queue = 'celery'
+NORMAL_QUEUES = [task_default_queue, *all_tenant_queue_names(config.api_tenants)]
+
+# Worker start profiles (selected with the WORKER_PROFILE environment
+# variable). Celery consumes its queues round-robin, so the priority is
+# given by dedicated workers that only take one task at a time: a high
+# priority task never waits behind prefetched normal or bulk tasks.
+# Tasks with a short recorded runtime go to the short queue, where a
+# high prefetch pays off, long tasks are fairly scheduled (prefetch 1).
+# The normal workers also consume the short queue, so short tasks are
+# handled without a dedicated short worker. A production deployment
+# runs the high, normal and bulk profiles ('all' is for a single worker).
+WORKER_PROFILES = {
+    'all': {'queues': [LANE_QUEUES['high'], SHORT_QUEUE,
+                       *NORMAL_QUEUES, LANE_QUEUES['bulk']], 'prefetch': 1},
+    'high': {'queues': [LANE_QUEUES['high']], 'prefetch': 1},
+    'normal': {'queues': [LANE_QUEUES['high'], SHORT_QUEUE, *NORMAL_QUEUES],
+               'prefetch': 1},
+    'short': {'queues': [SHORT_QUEUE], 'prefetch': 10},
+    'bulk': {'queues': [LANE_QUEUES['bulk']], 'prefetch': 10},
+}
+WORKER_PROFILE = WORKER_PROFILES[environ.get('WORKER_PROFILE', 'all')]
+
+# The API (and the default worker profile) knows about all queues.
+task_queues = [Queue(name, routing_key=name) for name in WORKER_PROFILE['queues']]
+
 # List of modules to import when the Celery
 # worker starts (improves start time).
 imports = ('src.tasks',)
@@ -35,16 +80,18 @@ worker_log_format = '%(asctime)s | %(levelname)-8s | %(processName)s | %(message
 worker_task_log_format = '%(asctime)s | %(levelname)-8s | %(processName)s | ' \
                          '%(task_name)s[%(task_id)s] | %(message)s'
 
-# Decrease the message rates substantially.
-worker_send_task_event = False
+# Task events decrease the message rates substantially, so they are
+# only sent when the API keeps an event driven task state view.
+worker_send_task_event = config.task_events
+task_send_sent_event = config.task_events
 
 # task messages will be acknowledged after the task has been executed,
 # not just before (the default behavior).
 task_acks_late = True
 
-# One worker takes 10 tasks from the queue at a time
-# and will increase the performance.
-worker_prefetch_multiplier = 10
+# Short tasks: one worker takes 10 tasks from the queue at a time
+# and will increase the performance. Long tasks: 1 at a time.
+worker_prefetch_multiplier = WORKER_PROFILE['prefetch']
 
 # task will be killed after 60 seconds
 # task_time_limit = 60
@@ -15,10 +15,10 @@ VERSION INFO::
 import site
 from os import environ
 from pathlib import Path
-from typing import Type, Tuple
+from typing import Dict, Literal, Type, Tuple
 
 # Third party modules
-from pydantic import BaseModel, Field, computed_field
+from pydantic import BaseModel, Field, computed_field, field_validator
 from pydantic_settings import (PydanticBaseSettingsSource,
                                BaseSettings, SettingsConfigDict)
 
@@ -33,6 +33,28 @@ SECRETS_DIR = ('/run/secrets'
                if Path('/.dockerenv').exists()
                else f'{site.USER_BASE}/secrets')
 """ This is where your secrets are stored (in Docker or locally). """
+Priority = Literal['high', 'normal', 'bulk']
+""" Task priority lanes. """
+DEFAULT_TENANT_NAME = 'default'
+""" Tenant name of the shared service API key (reserved). """
+
+
+# -----------------------------------------------------------------------------
+#
+class TenantConfig(BaseModel):
+    """ Configuration parameters for one API key (tenant).
+
+    :ivar name: Unique tenant name (used in the tenant queue names).
+    :ivar rate: Allowed requests per second (0 means unlimited).
+    :ivar burst: Max requests in a burst (defaults to the rate).
+    :ivar weight: Relative share of the worker capacity.
+    :ivar priority: Default priority lane (high, normal or bulk).
+    """
+    name: str
+    rate: float = 0.0
+    burst: int = 0
+    weight: int = Field(1, ge=1)
+    priority: Priority = 'normal'
 
 
 # -----------------------------------------------------------------------------
@@ -59,12 +81,150 @@ class CommonConfig(BaseSettings):
 
     # External resource parameters.
     service_api_key: str = MISSING_SECRET
+    api_tenants: Dict[str, TenantConfig] = {}
     mongo_url: str = Field(MISSING_SECRET, alias=f'mongo_url_{ENVIRONMENT}')
     rabbit_url: str = Field(MISSING_SECRET, alias=f'rabbit_url_root_{ENVIRONMENT}')
 
     # Hardcoded REST methods (GET, POST) calling parameters.
     url_timeout: tuple = (1.0, 5.0)
 
+    # Pooled callback HTTP client (per worker process), HTTP/2
+    # needs the h2 package. Idle connections expire after seconds.
+    callback_http2: bool = False
+    callback_max_connections: int = 100
+    callback_host_connections: int = 10
+    callback_keepalive: float = 30.0
+
+    # Circuit breaker per callback URL destination, 'shared' (MongoDB, all
+    # worker processes see the same failures), 'local' (per process, each
+    # process has to detect a failing destination itself) or 'off'. The
+    # circuit opens when the failure rate within the window (seconds) is
+    # reached, and is tried again after breaker_open_seconds. A closed
+    # state is cached per process for breaker_state_ttl seconds.
+    circuit_breaker: str = 'shared'
+    breaker_failure_rate: float = 0.5
+    breaker_min_requests: int = 5
+    breaker_window: float = 30.0
+    breaker_open_seconds: float = 30.0
+    breaker_state_ttl: float = 1.0
+
+    # Batched callbacks (opt-in per task, needs the 'outbox' callback
+    # delivery, since the delivery service sees the responses of all
+    # workers) are sent when a destination has buffered this many
+    # responses, or the window (seconds) has passed.
+    callback_batch_size: int = 50
+    callback_batch_window: float = 0.5
+
+    # Content encoding of callback POST bodies and published RabbitMQ
+    # messages, 'off', 'gzip' or 'zstd' (needs the zstandard package).
+    # Only bodies of at least compression_threshold bytes are compressed.
+    callback_compression: str = 'off'
+    compression_threshold: int = 65536
+
+    # Callback delivery, 'inline' (in the processing worker) or 'outbox'
+    # (durable outbox queue, sent by the delivery service with retries).
+    # The retry delay (seconds) is doubled for each failed attempt.
+    callback_delivery: str = 'inline'
+    delivery_concurrency: int = 50
+    delivery_max_attempts: int = 6
+    delivery_backoff: float = 2.0
+
+    # Maximum number of payloads accepted in one batch submission.
+    max_batch_size: int = 1000
+
+    # Maximum number of task IDs accepted in one bulk status query.
+    max_status_ids: int = 1000
+
+    # In-process cache for terminal task states (0 disables the cache).
+    status_cache_ttl: float = 300.0
+    status_cache_max_bytes: int = 16 * 1024 * 1024
+
+    # Keep an in-process task state view updated by Celery task
+    # events (the worker must be started with --task-events). The
+    # 'async' task submission mode sends no task-sent events.
+    task_events: bool = False
+    task_state_max_items: int = 100_000
+    task_state_max_age: float = 60.0
+
+    # Task status event stream parameters ('auto' uses a MongoDB change
+    # stream when available and falls back to polling, 'poll' only polls).
+    status_stream_source: str = 'auto'
+    status_poll_interval: float = 1.0
+    status_stream_keepalive: float = 15.0
+
+    # Bulk retry parameters (max selected tasks, tasks
+    # per publish batch and resubmitted tasks per second).
+    max_retry_count: int = 10_000
+    retry_batch_size: int = 100
+    retry_rate: float = 500.0
+
+    # Seconds that an Idempotency-Key header value is remembered.
+    idempotency_window: float = 3600.0
+    idempotency_cache_size: int = 10_000
+
+    # Payloads and results above this JSON size (bytes) are stored once
+    # in a blob store ('gridfs' or 'filesystem'), 0 disables it. Blobs
+    # older than the Celery result_expires time are purged by the API
+    # every purge interval (seconds).
+    claim_check_threshold: int = 0
+    claim_check_store: str = 'gridfs'
+    claim_check_path: str = 'claims'
+    claim_check_purge_interval: float = 3600.0
+
+    # Admission control, reject new tasks when the queue backlog or the
+    # estimated wait (seconds) is above the limit (0 disables a limit).
+    # Queue depth and drain rate are read from the RabbitMQ management
+    # API (rabbit_url host and credentials, on the management port).
+    admission_max_backlog: int = 0
+    admission_max_wait: float = 0.0
+    admission_interval: float = 2.0
+    rabbit_management_port: int = 15672
+
+    # Route tasks to the short queue when the recorded runtime percentile
+    # (seconds) for the task and payload size is below the threshold.
+    duration_routing: bool = False
+    short_task_threshold: float = 1.0
+    duration_window: int = 100
+    duration_refresh: float = 30.0
+
+    # Task submission mode, 'celery' (blocking kombu publish) or 'async'
+    # (non-blocking aio-pika publish). Channels per process in the shared
+    # RabbitMQ publisher (also used for queue callback responses).
+    task_submission: str = 'celery'
+    publisher_pool_size: int = 4
+
+    # Serialization of Celery task messages and results, and of published
+    # RabbitMQ messages: 'json', 'orjson' or 'msgpack' (needs the package,
+    # falls back to json). orjson is published as application/json, so it
+    # can be enabled during a rolling deploy, msgpack must only be enabled
+    # when all consumers accept it. Results are only filtered on error type
+    # (bulk retry) with a text serializer (json or orjson).
+    task_serializer: str = 'json'
+    message_codec: str = 'json'
+
+    # RabbitMQ subscriptions (RabbitClient), messages handled concurrently
+    # per consumer, and unacknowledged messages (0 means the concurrency).
+    # Batch mode (batch size > 0) passes up to batch size messages, collected
+    # for at most the window (seconds), to the handler in one call.
+    consumer_concurrency: int = 10
+    consumer_prefetch: int = 0
+    consumer_batch_size: int = 0
+    consumer_batch_window: float = 0.1
+
+    @field_validator('api_tenants')
+    @classmethod
+    def unique_tenant_names(cls, tenants: Dict[str, TenantConfig]) -> Dict[str, TenantConfig]:
+        """ Verify that tenant names are unique, and not the reserved default name. """
+        names = [tenant.name for tenant in tenants.values()]
+
+        if DEFAULT_TENANT_NAME in names:
+            raise ValueError(f"Tenant name '{DEFAULT_TENANT_NAME}' is reserved")
+
+        if len(set(names)) != len(names):
+            raise ValueError('Tenant names must be unique')
+
+        return tenants
+
     @computed_field
     @property
     def hdr_data(self) -> dict:
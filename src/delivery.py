@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 20:19:14
+     $Rev: 12
+"""
+
+# BUILTIN modules
+import signal
+import asyncio
+import argparse
+
+# local modules
+from src import config
+from .tools.callback_outbox import OUTBOX
+from .tools.callback_client import CALLBACKS
+from .tools.custom_logging import create_unified_logger
+
+# Constants
+logger = create_unified_logger()
+""" Unified logger instance. """
+
+
+# ---------------------------------------------------------
+#
+async def serve():
+    """ Deliver callback responses from the outbox until SIGINT/SIGTERM. """
+    loop = asyncio.get_running_loop()
+
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, OUTBOX.stop)
+
+    CALLBACKS.open()
+
+    try:
+        await OUTBOX.consume()
+
+    finally:
+        await CALLBACKS.aclose()
+
+
+# ---------------------------------------------------------
+#
+async def replay(limit: int):
+    """ Move dead-lettered callback responses back to the outbox.
+
+    :param limit: Max number of replayed responses (0 means all).
+    """
+
+    try:
+        count = await OUTBOX.replay(limit)
+        logger.info(f'Replayed {count} dead-lettered callback responses')
+
+    finally:
+        await OUTBOX.publisher.close()
+
+
+# ---------------------------------------------------------
+#
+def main():
+    """ Run the callback delivery service, or the replay tool. """
+    parser = argparse.ArgumentParser(description=f'{config.name} callback delivery')
+    commands = parser.add_subparsers(dest='command')
+    commands.add_parser('serve', help='deliver outbox responses (default)')
+    replayer = commands.add_parser('replay', help='replay dead-lettered responses')
+    replayer.add_argument('--limit', type=int, default=0,
+                          help='max number of replayed responses (0 means all)')
+    args = parser.parse_args()
+
+    if args.command == 'replay':
+        asyncio.run(replay(args.limit))
+
+    else:
+        asyncio.run(serve())
+
+
+if __name__ == '__main__':
+    main()
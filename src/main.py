@@ -13,8 +13,11 @@ VERSION INFO::
 
 # BUILTIN modules
 import json
+import asyncio
+import contextlib
 from typing import Any
 from pathlib import Path
+from contextlib import asynccontextmanager
 
 # Third party modules
 from fastapi import FastAPI
@@ -22,7 +25,10 @@ from fastapi.staticfiles import StaticFiles
 
 # local modules
 from src import config
+from .tasks import WORKER, CLAIMS
 from .api import process_routes, health_route
+from .tools.task_status import STATE_INDEX
+from .tools.task_events import TaskEventConsumer
 from .tools.custom_logging import create_unified_logger
 from .api.documentation import (license_info, tags_metadata, description)
 
@@ -63,10 +69,40 @@ class Service(FastAPI):
         self.logger = create_unified_logger()
 
 
+# ---------------------------------------------------------
+#
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    """ Start background consumers and release long-lived service resources. """
+    consumer = TaskEventConsumer(WORKER, STATE_INDEX, process_routes.HUB.publish)
+
+    if config.task_events:
+        consumer.start()
+
+    # Claim check blobs expire together with the task results.
+    purger = (asyncio.create_task(CLAIMS.run_purge(
+        WORKER.conf.result_expires.total_seconds(), config.claim_check_purge_interval))
+        if CLAIMS.threshold > 0 else None)
+
+    yield
+
+    if purger is not None:
+        purger.cancel()
+
+        with contextlib.suppress(asyncio.CancelledError):
+            await purger
+
+    consumer.stop()
+    await process_routes.PUBLISHER.close()
+    await process_routes.HUB.close()
+    await process_routes.ADMISSION.close()
+
+
 # ---------------------------------------------------------
 
 # Instantiate the service.
 app = Service(
+    lifespan=lifespan,
     redoc_url=None,
     title=config.name,
     version=config.version,
@@ -15,24 +15,47 @@ VERSION INFO::
 import json
 import time
 import random
-import asyncio
-from typing import Any
+from typing import Any, Dict, Optional, Tuple
 from traceback import format_exception
 
 # Third party modules
-from celery import Celery
+from celery import Celery, Task, states
+from celery.exceptions import Ignore
+from celery.signals import (task_prerun, task_postrun,
+                            worker_process_init, worker_process_shutdown)
+from celery.utils.time import maybe_iso8601, maybe_make_aware
+from celery.worker.request import Request
 from celery.utils.log import get_task_logger
-from httpx import AsyncClient, ConnectTimeout, ConnectError
+from aio_pika.exceptions import AMQPError
 
 # Local modules
 from src import config
 from .core import celery_config
-from .tools.rabbit_client import RabbitClient
+from .tools.claim_check import ClaimCheck, CLAIM_PARAM
+from .tools.task_routing import LANE_QUEUES
+from .tools.callback_outbox import OUTBOX
+from .tools.callback_client import CALLBACKS, send_response as deliver
+from .tools.task_durations import TaskDurations, payload_size
 from .tools.custom_logging import create_unified_logger
 
 # Constants
+EXPIRED = 'EXPIRED'
+""" Reported task state for a task that was dropped because its deadline had passed. """
+EXPIRED_REASON = 'expired'
+""" Revoke reason of a task that is stored as REVOKED because it had expired. """
+EXPIRED_RESULT = {'message': 'Task deadline has passed'}
+""" Response result of an expired task. """
 WORKER = Celery(__name__)
 """ Celery worker instance. """
+CLAIMS = ClaimCheck(config.claim_check_store, config.claim_check_threshold,
+                    config.claim_check_path, lambda: WORKER.backend.database)
+""" Claim check handling of large payloads and results. """
+DURATIONS = TaskDurations(lambda: WORKER.backend.database, config.duration_window,
+                          config.short_task_threshold, config.duration_refresh)
+""" Recorded task runtimes (used for short/long task routing). """
+
+_started: Dict[str, Tuple[float, int]] = {}
+""" Start time and payload size per running task (in this worker process). """
 
 # ---------------------------------------------------------
 
@@ -46,46 +69,98 @@ logger = create_unified_logger()
 
 # ---------------------------------------------------------
 #
-async def send_restful_response(url: str, result: dict):
-    """ Send a processing result to calling service using a RESTful URL call.
+@worker_process_init.connect
+def start_callback_client(**_):
+    """ Start the callback event loop and HTTP client in a new worker process.
+
+    Resources that were copied from the parent process by the fork
+    are dropped first, so the child never uses the parent's loop,
+    thread or connections.
+    """
+    CALLBACKS.reset()
+    CALLBACKS.start()
+
+
+# ---------------------------------------------------------
+#
+@worker_process_shutdown.connect
+def close_callback_client(**_):
+    """ Close the callback HTTP client and event loop of a worker process. """
+    CALLBACKS.close()
+
+
+# ---------------------------------------------------------
+#
+@task_prerun.connect
+def task_started(task_id: str, task: callable, args: tuple, **_):
+    """ Register the start time of a task with a payload.
+
+    :param task_id: Unique id of the task.
+    :param task: Current task.
+    :param args: Task arguments (the payload is the first one).
+    """
+
+    if config.duration_routing and task.name == processor.name:
+        _started[task_id] = (time.monotonic(), payload_size(args[0]))
+
+
+# ---------------------------------------------------------
+#
+@task_postrun.connect
+def task_finished(task_id: str, task: callable, state: str, **_):
+    """ Record the runtime of a successful task.
 
-    :param url: External service callback URL.
-    :param result: Processing result.
+    :param task_id: Unique id of the task.
+    :param task: Current task.
+    :param state: Task end state.
     """
 
-    try:
-        async with AsyncClient() as client:
-            resp = await client.post(url=url, timeout=config.url_timeout,
-                                     json=result, headers=config.hdr_data)
+    if (started := _started.pop(task_id, None)) and state == states.SUCCESS:
+        began, size = started
+
+        try:
+            DURATIONS.record(task.name, size, time.monotonic() - began)
+
+        except Exception as why:
+            logger.error(f"Failed to record runtime for task '{task.name}': {why}")
 
-        if resp.status_code == 202:
-            logger.success(f"Sent POST response to URL {url} - "
-                           f"[{resp.status_code}: {resp.json()}].")
 
-        else:
-            logger.error(f"Failed POST response to URL {url} - "
-                         f"[{resp.status_code}: {resp.json()}].")
+# ---------------------------------------------------------
+#
+def _has_callback(params: dict) -> bool:
+    """ Return True when the caller has requested a callback response.
 
-    except (ConnectError, ConnectTimeout):
-        logger.error(f"No connection with response URL: {url}")
+    :param params: Task callback parameters.
+    """
+    return bool(params['callbackUrl'] or params['callbackQueue'])
 
 
 # ---------------------------------------------------------
 #
-async def send_rabbit_response(queue_name: str, result: dict):
-    """ Send processing result to calling service using a RabbitMQ queue.
+def send_response(task_id: str, status: str, result: Any, params: dict):
+    """ Send the task response to the caller, when the caller has requested it.
 
-    :param queue_name: External service response queue name.
-    :param result: processing result.
+    In 'outbox' delivery mode the response is only stored in the outbox
+    queue, and the delivery service sends it to the caller (batched when
+    requested). A response that is sent directly by the worker process
+    is never batched, since the process only holds its own responses.
+
+    :param task_id: Unique id of the task.
+    :param status: Task end state.
+    :param result: Task result (or error message).
+    :param params: Task callback parameters.
     """
+    response = {'job_id': task_id, 'status': status, 'result': result}
+
+    if config.callback_delivery == 'outbox':
+        try:
+            CALLBACKS.run(OUTBOX.put(params, response))
+            return
 
-    try:
-        client = RabbitClient(config.rabbit_url)
-        await client.publish_message(queue_name, result)
-        logger.success(f"Sent response to RabbitMQ queue {queue_name}.")
+        except (AMQPError, ConnectionError) as why:
+            logger.error(f'Outbox unavailable, sending response directly: {why}')
 
-    except Exception as why:
-        logger.error(f"No connection with RabbitMQ queue {queue_name}: {why}")
+    CALLBACKS.run(deliver({**params, 'callbackBatch': False}, response))
 
 
 # ---------------------------------------------------------
@@ -104,6 +179,8 @@ def response_handler(task: callable, status: str, retval: Any,
     the processing result is returned to the caller by publishing it
     on the specified RabbitMQ queue.
 
+    An ignored (expired) task has already sent its EXPIRED response.
+
     :param task: Current task.
     :param status: Current task state.
     :param retval: Task return value/exception.
@@ -115,29 +192,137 @@ def response_handler(task: callable, status: str, retval: Any,
     params: dict = args[1]
 
     # Check if any more work needs to be done here.
-    if all(info is None for info in params.values()):
+    if status == states.IGNORED or not _has_callback(params):
         return
 
     if status == 'SUCCESS':
-        result = retval
+        result = CLAIMS.resolve(retval)
 
     else:
         logger.error(f"Task '{task.name}' retry processing failed")
         result = {'message': format_exception(retval)}
 
-    response = {'job_id': task_id, 'status': status, 'result': result}
+    send_response(task_id, status, result, params)
+
+
+# ---------------------------------------------------------
+#
+def deadline_passed(expires: Optional[Any]) -> bool:
+    """ Return True when the task deadline has passed.
+
+    :param expires: Task expires value (datetime, ISO 8601 string or None).
+    """
+
+    if expires is None:
+        return False
+
+    return WORKER.now() >= maybe_make_aware(maybe_iso8601(expires))
+
+
+# ---------------------------------------------------------
+#
+def send_expired_response(task_id: str, params: dict):
+    """ Send the EXPIRED response, when the caller has requested it.
+
+    :param task_id: Unique id of the task.
+    :param params: Task callback parameters.
+    """
+
+    if _has_callback(params):
+        send_response(task_id, EXPIRED, EXPIRED_RESULT, params)
+
+
+# ---------------------------------------------------------
+#
+@WORKER.task(name='tasks.expired_response', ignore_result=True)
+def expired_response(task_id: str, params: dict):
+    """ Send the EXPIRED response for a task that was dropped by the worker.
+
+    The worker main process drops expired tasks, and it must not block
+    on (or create the resources for) a callback, so the response is sent
+    by a worker process instead (the task is published on the high lane).
+
+    :param task_id: Unique id of the expired task.
+    :param params: Task callback parameters.
+    """
+    send_expired_response(task_id, params)
+
 
-    if params['callbackUrl']:
-        asyncio.run(send_restful_response(params['callbackUrl'], response))
+# -----------------------------------------------------------------------------
+#
+class DeadlineRequest(Request):
+    """ This class reports tasks that are dropped by the worker as EXPIRED.
+
+    Celery drops a task with a passed expires time when it's received
+    and again before it's executed, and stores it as REVOKED with the
+    'expired' reason (reported as EXPIRED by the API).
+    """
+
+    # ---------------------------------------------------------
+    #
+    def _announce_revoked(self, reason, terminated, signum, expired):
+        """ Announce a revoked task (the task args are available here).
+
+        This runs in the worker main process. In 'outbox' delivery mode
+        the EXPIRED response is published to the outbox directly, otherwise
+        it's handed over to a worker process on the high lane, so it isn't
+        queued behind the task's own (possibly long) backlog.
+        """
+        super()._announce_revoked(reason, terminated, signum, expired)
+
+        if not expired:
+            return
+
+        logger.warning(f'Task [{self.id}] deadline has passed, it is dropped')
+        params = self.args[1]
+
+        if not _has_callback(params):
+            return
+
+        if config.callback_delivery == 'outbox':
+            response = {'job_id': self.id, 'status': EXPIRED, 'result': EXPIRED_RESULT}
+
+            try:
+                with WORKER.producer_or_acquire() as producer:
+                    OUTBOX.publish(producer, params, response)
+                return
 
-    elif params['callbackQueue']:
-        asyncio.run(send_rabbit_response(params['callbackQueue'], response))
+            except Exception as why:
+                logger.error(f'Outbox unavailable, sending EXPIRED response '
+                             f'from a worker process: {why}')
+
+        expired_response.apply_async((self.id, params), queue=LANE_QUEUES['high'])
+
+
+# -----------------------------------------------------------------------------
+#
+class DeadlineTask(Task):
+    """ This class drops a failed task instead of retrying it after its deadline. """
+    Request = DeadlineRequest
+
+    # ---------------------------------------------------------
+    #
+    def retry(self, *args, **kwargs):
+        """ Retry the task, unless the task deadline has passed.
+
+        :raise Ignore: When the task deadline has passed.
+        """
+
+        if deadline_passed(self.request.expires):
+            logger.warning(f'Task [{self.request.id}] deadline has passed, it is dropped')
+            self.backend.mark_as_revoked(self.request.id, EXPIRED_REASON,
+                                         request=self.request)
+            send_expired_response(self.request.id, self.request.args[1])
+            raise Ignore()
+
+        return super().retry(*args, **kwargs)
 
 
 # ---------------------------------------------------------
 #
 @WORKER.task(
     name='tasks.processor',
+    base=DeadlineTask,
     after_return=response_handler,
     autoretry_for=(BaseException,),
     bind=True, default_retry_delay=10, max_retries=2
@@ -148,11 +333,17 @@ def processor(task: callable, payload: dict, params: dict) -> dict:
     Using the random module to generate errors now and
     then to be able to test the retry functionality.
 
+    Large payloads arrive, and large results are returned, as claim
+    check references. Only a payload that the API has offloaded (marked
+    in the params) is resolved, a client payload is never trusted as one.
+
     :param task: Current task.
     :param payload: Process the received payload.
     :param params: Optional query arguments (used in response_handler).
     :return: Processing response.
     """
+    if params.get(CLAIM_PARAM):
+        payload = CLAIMS.resolve(payload)
 
     logger.trace(f'config: {json.dumps(config.model_dump(), indent=2)}')
     logger.debug(f"Task '{task.name}' is processing received payload: {payload}")
@@ -165,4 +356,4 @@ def processor(task: callable, payload: dict, params: dict) -> dict:
     time.sleep(15)
 
     # Return the processing result of the lengthy task.
-    return {'message': 'Lots of work was done here'}
+    return CLAIMS.offload({'message': 'Lots of work was done here'})
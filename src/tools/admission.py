@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 20:53:40
+     $Rev: 12
+"""
+
+# BUILTIN modules
+import math
+import asyncio
+import contextlib
+from typing import Callable, List, Optional, Tuple
+
+# Third party modules
+from loguru import logger
+from httpx import AsyncClient, HTTPError, URL
+from fastapi import HTTPException, status
+
+# Constants
+EWMA_WEIGHT = 0.3
+""" Weight of the latest drain rate sample. """
+QUEUE_COLUMNS = 'name,messages_ready,consumers,message_stats.ack_details.rate'
+""" Queue fields that are read from the RabbitMQ management API. """
+
+
+# ---------------------------------------------------------
+#
+def management_url(rabbit_url: str, port: int) -> Tuple[str, Tuple[str, str]]:
+    """ Return the management API queues URL for the broker's vhost.
+
+    :param rabbit_url: RabbitMQ's (AMQP) connection URL.
+    :param port: Management API port.
+    :return: Queues URL and basic auth credentials.
+    """
+    url = URL(rabbit_url)
+    vhost = url.raw_path.decode().lstrip('/') or '%2F'
+    return (f'http://{url.host}:{port}/api/queues/{vhost}',
+            (url.username or 'guest', url.password or 'guest'))
+
+
+# -----------------------------------------------------------------------------
+#
+class AdmissionController:
+    """ This class implements queue depth aware admission control.
+
+    The depth, consumer count and acknowledge rate of the Celery queues are
+    sampled in the background from the RabbitMQ management API. The drain
+    rate (tasks per second) is the broker's acknowledge rate for the queues,
+    so it counts the tasks finished by all workers, no matter which API
+    process (or other publisher) submitted them.
+
+    New work is rejected when the backlog or the estimated wait time is
+    above the configured limits, and the Retry-After value is the time it
+    takes to drain the backlog down to the limit at the observed rate.
+
+    :ivar depth: Latest total queue depth.
+    :ivar consumers: Latest total number of queue consumers.
+    :ivar rate: Estimated drain rate (None until it has been measured).
+    """
+
+    # ---------------------------------------------------------
+    #
+    def __init__(self, rabbit_url: str, queues: Callable[[], List[str]],
+                 max_backlog: int, max_wait: float, interval: float,
+                 management_port: int = 15672):
+        """ The class initializer.
+
+        :param rabbit_url: RabbitMQ's connection URL.
+        :param queues: Returns the names of the monitored queues.
+        :param max_backlog: Max queued tasks (0 disables the check).
+        :param max_wait: Max estimated wait in seconds (0 disables the check).
+        :param interval: Queue sampling interval in seconds.
+        :param management_port: RabbitMQ management API port.
+        """
+
+        # Unique parameters.
+        self.queues = queues
+        self.interval = interval
+        self.max_wait = max_wait
+        self.max_backlog = max_backlog
+        self.url, self.auth = management_url(rabbit_url, management_port)
+
+        # Sampling state.
+        self.depth = 0
+        self.consumers = 0
+        self.rate: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._client: Optional[AsyncClient] = None
+
+    # ---------------------------------------------------------
+    #
+    @property
+    def enabled(self) -> bool:
+        """ Return admission control enabled status. """
+        return self.max_backlog > 0 or self.max_wait > 0
+
+    # ---------------------------------------------------------
+    #
+    def update(self, depth: int, consumers: int, rate: float):
+        """ Update the queue state with a new sample.
+
+        :param depth: Total queue depth.
+        :param consumers: Total number of queue consumers.
+        :param rate: Total acknowledge rate (tasks per second).
+        """
+        self.rate = (rate if self.rate is None else
+                     EWMA_WEIGHT * rate + (1 - EWMA_WEIGHT) * self.rate)
+        self.depth = depth
+        self.consumers = consumers
+
+    # ---------------------------------------------------------
+    #
+    def retry_after(self) -> Optional[int]:
+        """ Return seconds to wait when new work should be rejected, or None.
+
+        :return: Retry-After seconds.
+        """
+        allowed = []
+
+        # An empty queue is never overloaded.
+        if self.depth <= 0:
+            return None
+
+        if self.max_backlog > 0:
+            allowed.append(self.max_backlog)
+
+        # Without a measured drain rate (idle workers, no acks yet),
+        # the wait time can't be estimated.
+        if self.max_wait > 0 and self.rate:
+            allowed.append(self.max_wait * self.rate)
+
+        if not allowed or self.depth < min(allowed):
+            return None
+
+        excess = self.depth - min(allowed)
+
+        if not self.rate:
+            return max(math.ceil(self.max_wait or self.interval), 1)
+
+        return max(math.ceil(excess / self.rate), 1)
+
+    # ---------------------------------------------------------
+    #
+    async def _sample(self):
+        """ Sample depth, consumers and drain rate for the monitored queues. """
+
+        if self._client is None:
+            self._client = AsyncClient(auth=self.auth, timeout=self.interval)
+
+        resp = await self._client.get(self.url, params={'columns': QUEUE_COLUMNS})
+        resp.raise_for_status()
+        names = set(self.queues())
+        depth = consumers = 0
+        rate = 0.0
+
+        for queue in resp.json():
+            if queue['name'] in names:
+                depth += queue.get('messages_ready', 0)
+                consumers += queue.get('consumers', 0)
+                rate += (queue.get('message_stats', {})
+                         .get('ack_details', {}).get('rate', 0.0))
+
+        self.update(depth, consumers, rate)
+
+    # ---------------------------------------------------------
+    #
+    async def _run(self):
+        """ Sample the queues until cancelled. """
+
+        while True:
+            try:
+                await self._sample()
+
+            except (HTTPError, ValueError) as why:
+                logger.error(f'ADMISSION: {why}')
+
+            await asyncio.sleep(self.interval)
+
+    # ---------------------------------------------------------
+    #
+    def check(self):
+        """ Reject new work when the queues are overloaded.
+
+        :raise HTTPException(429): When the backlog is above the limits.
+        :raise HTTPException(503): When there are no consumers for the backlog.
+        """
+
+        if not self.enabled:
+            return
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+        if (seconds := self.retry_after()) is None:
+            return
+
+        code, errmsg = (
+            (status.HTTP_503_SERVICE_UNAVAILABLE, 'No workers available')
+            if self.consumers == 0 else
+            (status.HTTP_429_TOO_MANY_REQUESTS, 'Processing backlog is full'))
+        raise HTTPException(status_code=code, headers={'Retry-After': str(seconds)},
+                            detail=f'{errmsg} ({self.depth} queued tasks)')
+
+    # ---------------------------------------------------------
+    #
+    async def close(self):
+        """ Stop queue sampling and close the management API client. """
+
+        if self._task is not None:
+            self._task.cancel()
+
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+
+            self._task = None
+
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
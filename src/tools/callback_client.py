@@ -0,0 +1,441 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 20:56:03
+     $Rev: 12
+"""
+
+# BUILTIN modules
+import json
+import asyncio
+import threading
+from importlib.util import find_spec
+from typing import Any, Coroutine, Dict, List, Optional, Set, Tuple
+
+# Third party modules
+from loguru import logger
+from aio_pika.exceptions import AMQPError
+from httpx import (AsyncClient, Limits, URL, Response,
+                   ConnectTimeout, ConnectError, HTTPError)
+
+# local modules
+from src import config
+from .rabbit_client import PUBLISHER, RabbitPublisher
+from .content_encoding import compress, select_encoding
+from .circuit_breaker import CircuitBreaker, LocalBreakerStore, MongoBreakerStore
+
+# Constants
+RETRY_CODES = {408, 425, 429}
+""" Client error status codes that may succeed when retried. """
+
+
+# -----------------------------------------------------------------------------
+#
+class CallbackClient:
+    """ This class sends task callback responses from a worker process.
+
+    The worker process keeps one event loop running in a background thread,
+    one pooled HTTP client and one RabbitMQ publisher, so consecutive
+    callbacks reuse keep-alive (TCP + TLS) and broker connections. The number of concurrent
+    connections per callback host is limited with a semaphore. Large request
+    bodies can be compressed (announced with a Content-Encoding header).
+
+    Everything is created lazily in the process that uses it (after the
+    worker has forked), and released by close().
+    """
+
+    # ---------------------------------------------------------
+    #
+    def __init__(self, publisher: RabbitPublisher, timeout: Any, http2: bool,
+                 max_connections: int, host_connections: int, keepalive: float,
+                 compression: str = 'off', threshold: int = 65536):
+        """ The class initializer.
+
+        :param publisher: RabbitMQ publisher (used on the loop).
+        :param timeout: HTTP request timeout (httpx format).
+        :param http2: Use HTTP/2 when the callback host supports it.
+        :param max_connections: Max number of pooled connections.
+        :param host_connections: Max concurrent connections per host.
+        :param keepalive: Idle keep-alive connection expiry in seconds.
+        :param compression: Request body compression ('off', 'gzip' or 'zstd').
+        :param threshold: Min request body size in bytes that is compressed.
+        """
+
+        # Unique parameters.
+        self.timeout = timeout
+        self.threshold = threshold
+        self.publisher = publisher
+        self.keepalive = keepalive
+        self.max_connections = max_connections
+        self.host_connections = host_connections
+        self.encoding = select_encoding(compression)
+
+        # HTTP/2 needs the optional h2 package.
+        self.http2 = http2 and find_spec('h2') is not None
+
+        if http2 and not self.http2:
+            logger.warning('HTTP/2 callbacks need the h2 package, using HTTP/1.1')
+
+        # Process resources.
+        self._lock = threading.Lock()
+        self.client: Optional[AsyncClient] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+
+    # ---------------------------------------------------------
+    #
+    def reset(self):
+        """ Forget the resources that were copied from a parent process.
+
+        Used in a forked worker process, where the parent's event loop
+        thread doesn't exist and its connections must not be shared.
+        """
+        self._lock = threading.Lock()
+        self.client = None
+        self._thread = None
+        self._loop = None
+        self._hosts = {}
+        self.publisher.reset()
+
+    # ---------------------------------------------------------
+    #
+    def start(self):
+        """ Start the event loop thread and create the HTTP client. """
+
+        with self._lock:
+            if self._loop is not None:
+                return
+
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever,
+                                            name='callback-loop', daemon=True)
+            self._thread.start()
+            self.open()
+
+    # ---------------------------------------------------------
+    #
+    def open(self):
+        """ Create the pooled HTTP client.
+
+        Used directly (without start) by a service that already
+        runs in its own event loop, like the delivery service.
+        """
+        self.client = AsyncClient(
+            http2=self.http2, timeout=self.timeout,
+            limits=Limits(max_connections=self.max_connections,
+                          max_keepalive_connections=self.max_connections,
+                          keepalive_expiry=self.keepalive))
+
+    # ---------------------------------------------------------
+    #
+    def run(self, coro: Coroutine) -> Any:
+        """ Run a coroutine on the event loop and wait for the result.
+
+        :param coro: Coroutine to run.
+        :return: Coroutine result.
+        """
+
+        if self._loop is None:
+            self.start()
+
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    # ---------------------------------------------------------
+    #
+    async def post(self, url: str, body: Any, headers: dict) -> Response:
+        """ Send a POST request with a JSON body (limited per host).
+
+        :param url: Request URL.
+        :param body: JSON serializable request body.
+        :param headers: Request headers.
+        :return: HTTP response.
+        """
+        host = URL(url).host
+        content, encoding = compress(json.dumps(body, ensure_ascii=False).encode(),
+                                     self.encoding, self.threshold)
+
+        if encoding:
+            headers = {**headers, 'Content-Encoding': encoding}
+
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.host_connections)
+
+        async with self._hosts[host]:
+            return await self.client.post(url=url, content=content, headers=headers)
+
+    # ---------------------------------------------------------
+    #
+    async def aclose(self):
+        """ Close the HTTP client and the publisher. """
+
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+        await self.publisher.close()
+        self._hosts.clear()
+
+    # ---------------------------------------------------------
+    #
+    def close(self):
+        """ Close the HTTP client, the publisher and stop the event loop thread. """
+
+        with self._lock:
+            if self._loop is None:
+                return
+
+            loop, self._loop = self._loop, None
+
+        asyncio.run_coroutine_threadsafe(self.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join()
+        loop.close()
+
+
+CALLBACKS = CallbackClient(PUBLISHER, config.url_timeout,
+                           config.callback_http2, config.callback_max_connections,
+                           config.callback_host_connections,
+                           config.callback_keepalive,
+                           config.callback_compression,
+                           config.compression_threshold)
+""" Callback client for this (worker) process. """
+
+
+BREAKER = CircuitBreaker(
+    MongoBreakerStore(config.mongo_url, 'service_results')
+    if config.circuit_breaker == 'shared' else LocalBreakerStore(),
+    config.breaker_failure_rate, config.breaker_min_requests,
+    config.breaker_window, config.breaker_open_seconds,
+    config.breaker_state_ttl)
+""" Circuit breaker per callback URL destination. """
+
+
+# -----------------------------------------------------------------------------
+#
+class CallbackError(Exception):
+    """ A callback response could not be delivered.
+
+    :ivar retry: The delivery may succeed when it's retried later.
+    """
+
+    def __init__(self, message: str, retry: bool = True):
+        super().__init__(message)
+        self.retry = retry
+
+
+# ---------------------------------------------------------
+#
+async def post_response(url: str, result: Any):
+    """ Send a processing result to calling service using a RESTful URL call.
+
+    :param url: External service callback URL.
+    :param result: Processing result (or a list of results).
+    :raise CallbackError: When the response isn't accepted, or when the
+        destination's circuit is open (without waiting for timeouts).
+    """
+
+    destination = str(URL(url).copy_with(path='/', query=None, fragment=None))
+    breaker = config.circuit_breaker != 'off'
+
+    if breaker and not await BREAKER.allow(destination):
+        raise CallbackError(f"Circuit open for response URL {url}, not sent")
+
+    try:
+        resp = await CALLBACKS.post(url, result, config.hdr_data)
+
+    except HTTPError as why:
+        if breaker:
+            await BREAKER.record(destination, False)
+
+        if isinstance(why, (ConnectError, ConnectTimeout)):
+            raise CallbackError(f"No connection with response URL: {url}")
+
+        raise CallbackError(f"Failed POST response to URL {url} - {why!r}")
+
+    # The destination is healthy when it answers (even with a client error).
+    if breaker:
+        await BREAKER.record(destination, not resp.is_server_error)
+
+    if not resp.is_success:
+        retry = resp.status_code in RETRY_CODES or resp.is_server_error
+        raise CallbackError(f"Failed POST response to URL {url} - "
+                            f"[{resp.status_code}: {resp.text}].", retry)
+
+
+# ---------------------------------------------------------
+#
+async def publish_response(queue_name: str, *results: dict):
+    """ Send processing results to calling service using a RabbitMQ queue.
+
+    Several results are published as separate messages in one pipelined
+    (multi-message) publish.
+
+    :param queue_name: External service response queue name.
+    :param results: processing results.
+    :raise CallbackError: When the responses aren't confirmed by RabbitMQ.
+    """
+
+    try:
+        await CALLBACKS.publisher.publish_messages(queue_name, list(results))
+
+    except (AMQPError, ConnectionError) as why:
+        raise CallbackError(f"No connection with RabbitMQ queue {queue_name}: {why}")
+
+
+# -----------------------------------------------------------------------------
+#
+class CallbackBatcher:
+    """ This class coalesces callback responses to the same destination.
+
+    Responses are buffered per destination (callback URL or queue) until
+    the buffer holds max_items responses, or the window has passed since
+    the first buffered response. The buffer is then sent as one JSON array
+    POST request, or as one multi-message publish. Every sender waits for
+    its batch, so a failed batch is reported to all its senders.
+    """
+
+    # ---------------------------------------------------------
+    #
+    def __init__(self, max_items: int, window: float):
+        """ The class initializer.
+
+        :param max_items: Max number of responses in one batch.
+        :param window: Max seconds a response is buffered.
+        """
+
+        # Unique parameters.
+        self.window = window
+        self.max_items = max_items
+
+        # Buffered responses and sender futures per destination.
+        self._batches: Dict[Tuple[str, str], Tuple[list, List[asyncio.Future]]] = {}
+        self._timers: Dict[Tuple[str, str], asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    # ---------------------------------------------------------
+    #
+    async def send(self, method: str, target: str, response: dict):
+        """ Buffer a response and wait until its batch has been sent.
+
+        :param method: Callback method ('url' or 'queue').
+        :param target: Callback URL or queue name.
+        :param response: Task response.
+        :raise CallbackError: When the batch can't be delivered.
+        """
+        key = (method, target)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        responses, futures = self._batches.setdefault(key, ([], []))
+        responses.append(response)
+        futures.append(future)
+
+        if len(responses) >= self.max_items:
+            self._flush(key)
+
+        elif len(responses) == 1:
+            self._timers[key] = loop.call_later(self.window, self._flush, key)
+
+        await future
+
+    # ---------------------------------------------------------
+    #
+    def _flush(self, key: Tuple[str, str]):
+        """ Start sending the buffered responses for a destination.
+
+        :param key: Callback method and target.
+        """
+
+        if timer := self._timers.pop(key, None):
+            timer.cancel()
+
+        if batch := self._batches.pop(key, None):
+            task = asyncio.create_task(self._deliver(key, *batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    # ---------------------------------------------------------
+    #
+    @staticmethod
+    async def _deliver(key: Tuple[str, str], responses: list,
+                       futures: List[asyncio.Future]):
+        """ Send a batch and report the outcome to its senders.
+
+        :param key: Callback method and target.
+        :param responses: Buffered responses.
+        :param futures: Sender futures.
+        """
+        method, target = key
+
+        try:
+            if method == 'url':
+                await post_response(target, responses)
+
+            else:
+                await publish_response(target, *responses)
+
+            logger.success(f'Sent batch of {len(responses)} responses to {target}.')
+
+        except Exception as why:
+            if not isinstance(why, CallbackError):
+                logger.exception(f'Batch delivery to {target} failed unexpectedly: {why}')
+
+            for future in futures:
+                if not future.done():
+                    future.set_exception(why)
+
+        else:
+            for future in futures:
+                future.set_result(None)
+
+
+BATCHER = CallbackBatcher(config.callback_batch_size, config.callback_batch_window)
+""" Callback response batching for this process. """
+
+
+# ---------------------------------------------------------
+#
+async def deliver_response(params: dict, response: dict):
+    """ Deliver the task response using the requested callback method.
+
+    Batched responses are sent together with other responses
+    to the same destination (when the caller has requested it).
+
+    :param params: Task callback parameters.
+    :param response: Task response.
+    :raise CallbackError: When the response can't be delivered.
+    """
+
+    if params.get('callbackBatch'):
+        method = 'url' if params['callbackUrl'] else 'queue'
+        await BATCHER.send(method, params['callbackUrl'] or params['callbackQueue'],
+                           response)
+
+    elif params['callbackUrl']:
+        await post_response(params['callbackUrl'], response)
+        logger.success(f"Sent POST response to URL {params['callbackUrl']}.")
+
+    elif params['callbackQueue']:
+        await publish_response(params['callbackQueue'], response)
+        logger.success(f"Sent response to RabbitMQ queue {params['callbackQueue']}.")
+
+
+# ---------------------------------------------------------
+#
+async def send_response(params: dict, response: dict):
+    """ Deliver the task response once, a failure is only logged.
+
+    :param params: Task callback parameters.
+    :param response: Task response.
+    """
+
+    try:
+        await deliver_response(params, response)
+
+    except CallbackError as why:
+        logger.error(str(why))
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 21:01:27
+     $Rev: 12
+"""
+
+# BUILTIN modules
+import json
+import asyncio
+from typing import Optional, Set
+
+# Third party modules
+from loguru import logger
+from kombu import Producer, Queue
+from aio_pika import connect_robust, Message, DeliveryMode
+from aio_pika.abc import AbstractIncomingMessage
+
+# local modules
+from src import config
+from .rabbit_client import PUBLISHER, RabbitPublisher
+from .callback_client import CallbackError, deliver_response
+
+# Constants
+OUTBOX_QUEUE = 'callbacks.outbox'
+""" Durable queue with task responses waiting for delivery. """
+DEAD_QUEUE = 'callbacks.dead'
+""" Responses that could not be delivered (dead-letter queue). """
+RETRY_QUEUE = 'callbacks.retry.{}ms'
+""" Delay queue per retry delay (expired messages return to the outbox). """
+
+
+# -----------------------------------------------------------------------------
+#
+class CallbackOutbox:
+    """ This class implements a durable outbox for task callback responses.
+
+    The processing workers only publish (confirmed) the response to the
+    outbox queue, and a separate delivery service sends them to the callers
+    with limited concurrency. A failed delivery is retried with exponential
+    backoff using one delay queue per delay (with a queue message TTL,
+    expired messages are dead-lettered back to the outbox). The delay is
+    part of the queue name, so a changed backoff never redeclares an
+    existing queue with other arguments. Responses that
+    still fail, or fail permanently, end up in the dead-letter queue, from
+    where they can be replayed.
+    """
+
+    # ---------------------------------------------------------
+    #
+    def __init__(self, publisher: RabbitPublisher, rabbit_url: str,
+                 concurrency: int, max_attempts: int, backoff: float):
+        """ The class initializer.
+
+        :param publisher: RabbitMQ publisher.
+        :param rabbit_url: RabbitMQ's connection URL (delivery consumer).
+        :param concurrency: Max number of concurrent deliveries.
+        :param max_attempts: Max delivery attempts per response.
+        :param backoff: First retry delay in seconds (doubled per attempt).
+        """
+
+        # Unique parameters.
+        self.backoff = backoff
+        self.publisher = publisher
+        self.rabbit_url = rabbit_url
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+
+        # Delivery service state.
+        self._tasks: Set[asyncio.Task] = set()
+        self._stopping: Optional[asyncio.Event] = None
+
+    # ---------------------------------------------------------
+    #
+    @staticmethod
+    def _message(body: dict, attempt: int, error: Optional[str] = None) -> Message:
+        """ Return an outbox message.
+
+        :param body: Callback parameters and task response.
+        :param attempt: Number of failed delivery attempts.
+        :param error: Latest delivery error.
+        :return: Persistent JSON message.
+        """
+        headers = {'x-attempt': attempt}
+
+        if error:
+            headers['x-error'] = error
+
+        return Message(headers=headers,
+                       content_type='application/json',
+                       delivery_mode=DeliveryMode.PERSISTENT,
+                       body=json.dumps(body, ensure_ascii=False).encode())
+
+    # ---------------------------------------------------------
+    #
+    async def _send(self, queue: str, message: Message, **arguments):
+        """ Declare the queue (once) and publish the message on it.
+
+        :param queue: Queue name.
+        :param message: Outbox message.
+        :param arguments: Queue declaration arguments.
+        """
+        await self.publisher.declare_queue(queue, durable=True, arguments=arguments)
+        await self.publisher.publish_many([(queue, message)])
+
+    # ---------------------------------------------------------
+    #
+    async def put(self, params: dict, response: dict):
+        """ Store a task response in the outbox.
+
+        :param params: Task callback parameters.
+        :param response: Task response.
+        :raise AMQPError: When the response isn't confirmed by RabbitMQ.
+        """
+        message = self._message({'params': params, 'response': response}, 0)
+        await self._send(OUTBOX_QUEUE, message)
+
+    # ---------------------------------------------------------
+    #
+    def publish(self, producer: Producer, params: dict, response: dict):
+        """ Store a task response in the outbox, using a (blocking) kombu producer.
+
+        Used by the Celery worker main process, which has no event loop
+        for the aio-pika publisher.
+
+        :param producer: Celery broker producer.
+        :param params: Task callback parameters.
+        :param response: Task response.
+        :raise OperationalError: When the broker is unavailable.
+        """
+        message = self._message({'params': params, 'response': response}, 0)
+        producer.publish(message.body, exchange='', routing_key=OUTBOX_QUEUE,
+                         content_type=message.content_type, content_encoding='utf-8',
+                         headers=message.headers, delivery_mode=message.delivery_mode,
+                         declare=[Queue(OUTBOX_QUEUE, durable=True)], retry=True)
+
+    # ---------------------------------------------------------
+    #
+    async def _retry(self, body: dict, attempt: int, why: CallbackError):
+        """ Schedule a new delivery attempt, or dead-letter the response.
+
+        :param body: Callback parameters and task response.
+        :param attempt: Number of failed delivery attempts.
+        :param why: Latest delivery error.
+        """
+
+        if not why.retry or attempt >= self.max_attempts:
+            logger.error(f'Callback delivery gave up after {attempt} attempts: {why}')
+            await self._send(DEAD_QUEUE, self._message(body, attempt, str(why)))
+            return
+
+        delay = int(self.backoff * 2 ** (attempt - 1) * 1000)
+        logger.warning(f'Callback delivery attempt {attempt} failed, '
+                       f'retry in {delay / 1000} seconds: {why}')
+        await self._send(RETRY_QUEUE.format(delay),
+                         self._message(body, attempt, str(why)),
+                         **{'x-message-ttl': delay,
+                            'x-dead-letter-exchange': '',
+                            'x-dead-letter-routing-key': OUTBOX_QUEUE})
+
+    # ---------------------------------------------------------
+    #
+    async def _handle(self, message: AbstractIncomingMessage):
+        """ Deliver one outbox message.
+
+        The message is acknowledged when it's delivered, or when it has
+        been moved to a retry (or the dead-letter) queue. A message that
+        can't be decoded is logged and rejected, and an unexpected delivery
+        error dead-letters the response, so no message is left unsettled.
+        It only stays in the outbox when it can't be moved, and then it's
+        requeued after the first retry delay (not immediately, which would
+        redeliver it in a busy loop while RabbitMQ is failing).
+
+        :param message: Outbox message.
+        """
+        attempt = (message.headers or {}).get('x-attempt', 0) + 1
+
+        try:
+            body = json.loads(message.body)
+            params, response = body['params'], body['response']
+
+        except (ValueError, TypeError, KeyError) as why:
+            logger.error(f'Rejected malformed outbox message: {why} - {message.body!r}')
+            await message.reject(requeue=False)
+            return
+
+        try:
+            await deliver_response(params, response)
+
+        except Exception as why:
+            if not isinstance(why, CallbackError):
+                logger.exception(f'Callback delivery failed unexpectedly: {why}')
+                why = CallbackError(f'Unexpected error: {why}', retry=False)
+
+            try:
+                await self._retry(body, attempt, why)
+
+            except Exception as error:
+                logger.error(f'Callback retry scheduling failed, requeued in '
+                             f'{self.backoff} seconds: {error}')
+                await asyncio.sleep(self.backoff)
+                await message.nack(requeue=True)
+                return
+
+        await message.ack()
+
+    # ---------------------------------------------------------
+    #
+    async def consume(self):
+        """ Deliver outbox messages until stop() is called.
+
+        In-flight deliveries are finished before the method returns.
+        """
+        self._stopping = asyncio.Event()
+        connection = await connect_robust(url=self.rabbit_url)
+        channel = await connection.channel()
+        await channel.set_qos(prefetch_count=self.concurrency)
+        queue = await channel.declare_queue(OUTBOX_QUEUE, durable=True)
+
+        async def on_message(message: AbstractIncomingMessage):
+            task = asyncio.create_task(self._handle(message))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        tag = await queue.consume(on_message)
+        logger.info(f'Delivering callbacks from {OUTBOX_QUEUE} '
+                    f'(concurrency {self.concurrency})')
+
+        try:
+            await self._stopping.wait()
+
+        finally:
+            await queue.cancel(tag)
+
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+
+            await connection.close()
+
+    # ---------------------------------------------------------
+    #
+    def stop(self):
+        """ Stop consuming new outbox messages. """
+
+        if self._stopping is not None:
+            self._stopping.set()
+
+    # ---------------------------------------------------------
+    #
+    async def replay(self, limit: int = 0) -> int:
+        """ Move dead-lettered responses back to the outbox.
+
+        :param limit: Max number of replayed responses (0 means all).
+        :return: Number of replayed responses.
+        """
+        count = 0
+        connection = await connect_robust(url=self.rabbit_url)
+
+        try:
+            channel = await connection.channel()
+            queue = await channel.declare_queue(DEAD_QUEUE, durable=True)
+
+            while not limit or count < limit:
+                if (message := await queue.get(no_ack=False, fail=False)) is None:
+                    break
+
+                body = json.loads(message.body)
+                await self._send(OUTBOX_QUEUE, self._message(body, 0))
+                await message.ack()
+                count += 1
+
+        finally:
+            await connection.close()
+
+        return count
+
+
+OUTBOX = CallbackOutbox(PUBLISHER, config.rabbit_url, config.delivery_concurrency,
+                        config.delivery_max_attempts, config.delivery_backoff)
+""" Callback response outbox for this process. """
@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 20:56:03
+     $Rev: 12
+"""
+
+# BUILTIN modules
+import time
+import asyncio
+from typing import Dict, Optional, Tuple
+
+# Third party modules
+from loguru import logger
+from pymongo import MongoClient, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+# Constants
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+""" Circuit states. """
+
+
+# -----------------------------------------------------------------------------
+#
+class LocalBreakerStore:
+    """ This class keeps circuit states in this process only (used for tests). """
+
+    # ---------------------------------------------------------
+    #
+    def __init__(self):
+        """ The class initializer. """
+        self._circuits: Dict[str, dict] = {}
+
+    # ---------------------------------------------------------
+    #
+    def _circuit(self, key: str) -> dict:
+        """ Return the circuit document for a destination. """
+        return self._circuits.setdefault(
+            key, {'state': CLOSED, 'since': 0.0,
+                  'window_start': 0.0, 'requests': 0, 'failures': 0})
+
+    # ---------------------------------------------------------
+    #
+    async def get_state(self, key: str) -> Tuple[str, float]:
+        """ Return the circuit state, and when it was entered.
+
+        :param key: Destination key.
+        :return: Circuit state and state change time.
+        """
+        circuit = self._circuit(key)
+        return circuit['state'], circuit['since']
+
+    # ---------------------------------------------------------
+    #
+    async def set_state(self, key: str, state: str, since: float,
+                        expected: Tuple[str, float]) -> bool:
+        """ Change the circuit state if it hasn't been changed meanwhile.
+
+        Closing a circuit resets its request counters.
+
+        :param key: Destination key.
+        :param state: New circuit state.
+        :param since: State change time.
+        :param expected: Current circuit state and state change time.
+        :return: True when the state was changed.
+        """
+        circuit = self._circuit(key)
+
+        if (circuit['state'], circuit['since']) != expected:
+            return False
+
+        circuit.update(state=state, since=since)
+
+        if state == CLOSED:
+            circuit.update(window_start=since, requests=0, failures=0)
+
+        return True
+
+    # ---------------------------------------------------------
+    #
+    async def count(self, key: str, failed: bool,
+                    now: float, window: float) -> Tuple[int, int]:
+        """ Count a request in the current window.
+
+        :param key: Destination key.
+        :param failed: The request failed.
+        :param now: Request time.
+        :param window: Counting window in seconds.
+        :return: Requests and failures in the current window.
+        """
+        circuit = self._circuit(key)
+
+        if circuit['window_start'] < now - window:
+            circuit.update(window_start=now, requests=0, failures=0)
+
+        circuit['requests'] += 1
+        circuit['failures'] += int(failed)
+        return circuit['requests'], circuit['failures']
+
+
+# -----------------------------------------------------------------------------
+#
+class MongoBreakerStore:
+    """ This class keeps circuit states in MongoDB (shared by all processes).
+
+    State changes are compare-and-set updates, so only one process at a
+    time gets the half-open trial request for a destination.
+    """
+
+    # ---------------------------------------------------------
+    #
+    def __init__(self, mongo_url: str, database: str):
+        """ The class initializer.
+
+        :param mongo_url: MongoDB connection URL.
+        :param database: Database name.
+        """
+
+        # Unique parameters.
+        self.database = database
+        self.mongo_url = mongo_url
+
+        # Lazily created (after the worker has forked).
+        self._collection = None
+
+    # ---------------------------------------------------------
+    #
+    @property
+    def collection(self):
+        """ Return the circuit collection. """
+
+        if self._collection is None:
+            client = MongoClient(self.mongo_url)
+            self._collection = client[self.database]['circuit_breakers']
+
+        return self._collection
+
+    # ---------------------------------------------------------
+    #
+    def _get_state(self, key: str) -> Tuple[str, float]:
+        """ Return the circuit state, and when it was entered (blocking). """
+        circuit = self.collection.find_one({'_id': key}, {'state': 1, 'since': 1})
+
+        if circuit is None:
+            return CLOSED, 0.0
+
+        return circuit['state'], circuit['since']
+
+    # ---------------------------------------------------------
+    #
+    def _set_state(self, key: str, state: str, since: float,
+                   expected: Tuple[str, float]) -> bool:
+        """ Change the circuit state if it hasn't been changed (blocking). """
+        changes = {'state': state, 'since': since}
+
+        if state == CLOSED:
+            changes.update(window_start=since, requests=0, failures=0)
+
+        # A missing circuit is closed, so it's created by the upsert.
+        try:
+            result = self.collection.update_one(
+                {'_id': key, 'state': expected[0], 'since': expected[1]},
+                {'$set': changes}, upsert=expected == (CLOSED, 0.0))
+
+        except DuplicateKeyError:
+            return False
+
+        return bool(result.modified_count or result.upserted_id)
+
+    # ---------------------------------------------------------
+    #
+    def _count(self, key: str, failed: bool,
+               now: float, window: float) -> Tuple[int, int]:
+        """ Count a request in the current window (blocking). """
+        circuit = self.collection.find_one_and_update(
+            {'_id': key, 'window_start': {'$gte': now - window}},
+            {'$inc': {'requests': 1, 'failures': int(failed)}},
+            return_document=ReturnDocument.AFTER)
+
+        # Start a new window (a concurrent request may be lost here).
+        if circuit is None:
+            circuit = self.collection.find_one_and_update(
+                {'_id': key},
+                {'$set': {'window_start': now, 'requests': 1, 'failures': int(failed)},
+                 '$setOnInsert': {'state': CLOSED, 'since': 0.0}},
+                upsert=True, return_document=ReturnDocument.AFTER)
+
+        return circuit['requests'], circuit['failures']
+
+    # ---------------------------------------------------------
+    #
+    async def get_state(self, key: str) -> Tuple[str, float]:
+        """ Return the circuit state, and when it was entered.
+
+        :param key: Destination key.
+        :return: Circuit state and state change time.
+        """
+        return await asyncio.to_thread(self._get_state, key)
+
+    # ---------------------------------------------------------
+    #
+    async def set_state(self, key: str, state: str, since: float,
+                        expected: Tuple[str, float]) -> bool:
+        """ Change the circuit state if it hasn't been changed meanwhile.
+
+        :param key: Destination key.
+        :param state: New circuit state.
+        :param since: State change time.
+        :param expected: Current circuit state and state change time.
+        :return: True when the state was changed.
+        """
+        return await asyncio.to_thread(self._set_state, key, state, since, expected)
+
+    # ---------------------------------------------------------
+    #
+    async def count(self, key: str, failed: bool,
+                    now: float, window: float) -> Tuple[int, int]:
+        """ Count a request in the current window.
+
+        :param key: Destination key.
+        :param failed: The request failed.
+        :param now: Request time.
+        :param window: Counting window in seconds.
+        :return: Requests and failures in the current window.
+        """
+        return await asyncio.to_thread(self._count, key, failed, now, window)
+
+
+# -----------------------------------------------------------------------------
+#
+class CircuitBreaker:
+    """ This class implements a circuit breaker per destination.
+
+    A closed circuit counts requests and failures in a time window, and
+    opens when the failure rate is too high. An open circuit rejects all
+    requests, until the open period has passed. Then one trial request is
+    allowed (half-open): a success closes the circuit, a failure opens it
+    again. A trial that never reports back is replaced after the open
+    period.
+
+    A closed state is cached in the process for state_ttl seconds, so a
+    healthy destination doesn't cost a store round trip per request. A
+    store failure never fails a request: it's allowed, and its outcome
+    isn't recorded.
+    """
+
+    # ---------------------------------------------------------
+    #
+    def __init__(self, store, failure_rate: float, min_requests: int,
+                 window: float, open_seconds: float, state_ttl: float = 0.0):
+        """ The class initializer.
+
+        :param store: Circuit state store (LocalBreakerStore or MongoBreakerStore).
+        :param failure_rate: Failure rate (0-1) that opens the circuit.
+        :param min_requests: Min requests in the window before it can open.
+        :param window: Failure counting window in seconds.
+        :param open_seconds: Seconds before an open circuit is tried again.
+        :param state_ttl: Seconds that a closed state is cached (0 disables it).
+        """
+
+        # Unique parameters.
+        self.store = store
+        self.window = window
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.state_ttl = state_ttl
+        self.open_seconds = open_seconds
+
+        # Cached closed states (expiry time and state start time).
+        self._closed: Dict[str, Tuple[float, float]] = {}
+
+    # ---------------------------------------------------------
+    #
+    async def _get_state(self, key: str, now: float) -> Tuple[str, float]:
+        """ Return the circuit state, and when it was entered.
+
+        :param key: Destination key.
+        :param now: Current time.
+        :return: Circuit state and start time.
+        """
+
+        if (cached := self._closed.get(key)) and cached[0] > now:
+            return CLOSED, cached[1]
+
+        state, since = await self.store.get_state(key)
+
+        if state == CLOSED and self.state_ttl > 0:
+            self._closed[key] = (now + self.state_ttl, since)
+
+        else:
+            self._closed.pop(key, None)
+
+        return state, since
+
+    # ---------------------------------------------------------
+    #
+    async def allow(self, key: str, now: Optional[float] = None) -> bool:
+        """ Return True when a request to the destination may be sent.
+
+        :param key: Destination key.
+        :param now: Current time (defaults to the wall clock).
+        """
+        now = time.time() if now is None else now
+
+        try:
+            state, since = await self._get_state(key, now)
+
+            if state == CLOSED:
+                return True
+
+            if now - since < self.open_seconds:
+                return False
+
+            return await self.store.set_state(key, HALF_OPEN, now, (state, since))
+
+        except Exception as why:
+            logger.warning(f'Circuit breaker store failed, request allowed: {why}')
+            return True
+
+    # ---------------------------------------------------------
+    #
+    async def record(self, key: str, success: bool, now: Optional[float] = None):
+        """ Register the outcome of a request to the destination.
+
+        :param key: Destination key.
+        :param success: The request succeeded.
+        :param now: Current time (defaults to the wall clock).
+        """
+        now = time.time() if now is None else now
+
+        try:
+            await self._record(key, success, now)
+
+        except Exception as why:
+            logger.warning(f'Circuit breaker store failed, outcome not recorded: {why}')
+
+    # ---------------------------------------------------------
+    #
+    async def _record(self, key: str, success: bool, now: float):
+        """ Register the outcome of a request in the store.
+
+        :param key: Destination key.
+        :param success: The request succeeded.
+        :param now: Current time.
+        """
+        state, since = await self._get_state(key, now)
+
+        if state == HALF_OPEN:
+            await self.store.set_state(key, CLOSED if success else OPEN,
+                                       now, (state, since))
+            return
+
+        requests, failures = await self.store.count(key, not success,
+                                                    now, self.window)
+
+        if state == CLOSED and requests >= self.min_requests and \
+                failures / requests >= self.failure_rate:
+            self._closed.pop(key, None)
+            await self.store.set_state(key, OPEN, now, (state, since))
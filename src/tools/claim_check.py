@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 20:54:24
+     $Rev: 12
+"""
+
+# BUILTIN modules
+import re
+import json
+import asyncio
+from uuid import uuid4
+from pathlib import Path
+from typing import Any, Callable
+from datetime import datetime, timedelta, timezone
+
+# Third party modules
+from bson import ObjectId
+from gridfs import GridFS
+from loguru import logger
+from pymongo import ASCENDING
+from pymongo.database import Database
+
+# Constants
+CLAIM_KEY = '$claim'
+""" Dictionary key that identifies a claim check reference. """
+CLAIM_PARAM = 'payloadClaim'
+""" Task parameter that marks a payload as a claim check reference (set by the API). """
+FILE_REF = re.compile('[0-9a-f]{32}')
+""" Blob reference format of the filesystem store (generated file names). """
+
+
+# -----------------------------------------------------------------------------
+#
+class GridFsBlobStore:
+    """ This class stores blobs in MongoDB GridFS (in the result database). """
+
+    # ---------------------------------------------------------
+    #
+    def __init__(self, database: Callable[[], Database]):
+        """ The class initializer.
+
+        :param database: Returns the MongoDB database (called when needed).
+        """
+        self._fs = None
+        self._database = database
+
+    # ---------------------------------------------------------
+    #
+    @property
+    def fs(self) -> GridFS:
+        """ Return the GridFS instance. """
+
+        if self._fs is None:
+            database = self._database()
+            database['claims.files'].create_index([('uploadDate', ASCENDING)])
+            self._fs = GridFS(database, collection='claims')
+
+        return self._fs
+
+    # ---------------------------------------------------------
+    #
+    def put(self, data: bytes) -> str:
+        """ Store the blob.
+
+        :param data: Blob content.
+        :return: Blob reference.
+        """
+        return str(self.fs.put(data))
+
+    # ---------------------------------------------------------
+    #
+    def get(self, ref: str) -> bytes:
+        """ Return the blob content.
+
+        :param ref: Blob reference.
+        :return: Blob content.
+        """
+        return self.fs.get(ObjectId(ref)).read()
+
+    # ---------------------------------------------------------
+    #
+    def purge(self, before: datetime) -> int:
+        """ Delete blobs (files and chunks) stored before the time.
+
+        :param before: Oldest upload time that is kept.
+        :return: Number of deleted blobs.
+        """
+        count = 0
+
+        for blob in self.fs.find({'uploadDate': {'$lt': before}}):
+            self.fs.delete(blob._id)
+            count += 1
+
+        return count
+
+
+# -----------------------------------------------------------------------------
+#
+class FileBlobStore:
+    """ This class stores blobs in a (shared) local directory. """
+
+    # ---------------------------------------------------------
+    #
+    def __init__(self, path: str):
+        """ The class initializer.
+
+        :param path: Blob directory.
+        """
+        self.path = Path(path)
+
+    # ---------------------------------------------------------
+    #
+    def put(self, data: bytes) -> str:
+        """ Store the blob.
+
+        :param data: Blob content.
+        :return: Blob reference.
+        """
+        ref = uuid4().hex
+        self.path.mkdir(parents=True, exist_ok=True)
+        (self.path / ref).write_bytes(data)
+        return ref
+
+    # ---------------------------------------------------------
+    #
+    def get(self, ref: str) -> bytes:
+        """ Return the blob content.
+
+        Only generated references are accepted, so a reference can never
+        point to a file outside the blob directory.
+
+        :param ref: Blob reference.
+        :return: Blob content.
+        :raise ValueError: When the reference isn't a generated one.
+        """
+        path = (self.path / ref).resolve() if isinstance(ref, str) else None
+
+        if (path is None or not FILE_REF.fullmatch(ref)
+                or path.parent != self.path.resolve()):
+            raise ValueError(f'Invalid blob reference: {ref!r}')
+
+        return path.read_bytes()
+
+    # ---------------------------------------------------------
+    #
+    def purge(self, before: datetime) -> int:
+        """ Delete blobs stored before the time.
+
+        :param before: Oldest store time that is kept.
+        :return: Number of deleted blobs.
+        """
+        count = 0
+
+        if not self.path.is_dir():
+            return count
+
+        for blob in self.path.iterdir():
+            if blob.stat().st_mtime < before.timestamp():
+                blob.unlink(missing_ok=True)
+                count += 1
+
+        return count
+
+
+# -----------------------------------------------------------------------------
+#
+class ClaimCheck:
+    """ This class implements the claim check pattern for large values.
+
+    Values above the size threshold are stored once in a blob store, and
+    only a small reference travels through the broker and the result
+    backend. The reference is resolved when the value is actually needed.
+
+    Blobs are kept as long as the task results (result_expires), and
+    are purged at a regular interval.
+    """
+
+    # ---------------------------------------------------------
+    #
+    def __init__(self, store: str, threshold: int, path: str,
+                 database: Callable[[], Database]):
+        """ The class initializer.
+
+        :param store: Blob store type, 'gridfs' or 'filesystem'.
+        :param threshold: Min JSON size in bytes to offload (0 disables it).
+        :param path: Blob directory (filesystem store).
+        :param database: Returns the MongoDB database (gridfs store).
+        """
+
+        # Unique parameters.
+        self.threshold = threshold
+        self.store = (FileBlobStore(path) if store == 'filesystem'
+                      else GridFsBlobStore(database))
+
+    # ---------------------------------------------------------
+    #
+    @staticmethod
+    def is_claim(value: Any) -> bool:
+        """ Return True if the value is a claim check reference.
+
+        :param value: Value to check.
+        """
+        return isinstance(value, dict) and CLAIM_KEY in value
+
+    # ---------------------------------------------------------
+    #
+    def offload(self, value: Any) -> Any:
+        """ Return a reference to the stored value when it's large.
+
+        :param value: JSON serializable value.
+        :return: The value itself, or a claim check reference.
+        """
+
+        if self.threshold <= 0:
+            return value
+
+        data = json.dumps(value, ensure_ascii=False).encode()
+
+        if len(data) < self.threshold:
+            return value
+
+        return {CLAIM_KEY: self.store.put(data), 'size': len(data)}
+
+    # ---------------------------------------------------------
+    #
+    def resolve(self, value: Any) -> Any:
+        """ Return the stored value when the value is a reference.
+
+        :param value: Value or claim check reference.
+        :return: The original value.
+        """
+
+        if not self.is_claim(value):
+            return value
+
+        return json.loads(self.store.get(value[CLAIM_KEY]))
+
+    # ---------------------------------------------------------
+    #
+    def purge(self, max_age: float) -> int:
+        """ Delete stored values that are older than max_age (blocking).
+
+        :param max_age: Seconds that a stored value is kept.
+        :return: Number of deleted values.
+        """
+        return self.store.purge(datetime.now(timezone.utc) - timedelta(seconds=max_age))
+
+    # ---------------------------------------------------------
+    #
+    async def run_purge(self, max_age: float, interval: float):
+        """ Purge expired values at a regular interval (until cancelled).
+
+        :param max_age: Seconds that a stored value is kept.
+        :param interval: Seconds between purges.
+        """
+
+        while True:
+            try:
+                if count := await asyncio.to_thread(self.purge, max_age):
+                    logger.info(f'CLAIM CHECK: purged {count} expired values')
+
+            except Exception as why:
+                logger.error(f'CLAIM CHECK: purge failed: {why}')
+
+            await asyncio.sleep(interval)
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 20:23:40
+     $Rev: 12
+"""
+
+# BUILTIN modules
+import gzip
+from typing import Callable, Dict, Optional, Tuple
+
+# Third party modules
+from loguru import logger
+
+# Optional third party modules
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Constants
+GZIP_LEVEL = 6
+""" Compression level for gzip (speed versus size). """
+
+ENCODINGS: Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    'gzip': (lambda data: gzip.compress(data, GZIP_LEVEL), gzip.decompress),
+}
+""" Compress and decompress function per content encoding. """
+
+if zstandard is not None:
+    ENCODINGS['zstd'] = (zstandard.ZstdCompressor().compress,
+                         zstandard.ZstdDecompressor().decompress)
+
+
+# ---------------------------------------------------------
+#
+def select_encoding(encoding: str) -> Optional[str]:
+    """ Return the configured content encoding, if it's available.
+
+    zstd needs the optional zstandard package, gzip is used without it.
+
+    :param encoding: Configured encoding ('off', 'gzip' or 'zstd').
+    :return: Content encoding, or None when compression is off.
+    """
+
+    if encoding == 'off':
+        return None
+
+    if encoding not in ENCODINGS:
+        logger.warning(f'{encoding} compression is not available, using gzip')
+        return 'gzip'
+
+    return encoding
+
+
+# ---------------------------------------------------------
+#
+def compress(data: bytes, encoding: Optional[str],
+             threshold: int) -> Tuple[bytes, Optional[str]]:
+    """ Compress data that is at least threshold bytes long.
+
+    :param data: Encoded body.
+    :param encoding: Content encoding (None disables compression).
+    :param threshold: Min body size in bytes that is compressed.
+    :return: Body and its content encoding (None when not compressed).
+    """
+
+    if encoding is None or len(data) < threshold:
+        return data, None
+
+    return ENCODINGS[encoding][0](data), encoding
+
+
+# ---------------------------------------------------------
+#
+def decompress(data: bytes, encoding: Optional[str]) -> bytes:
+    """ Decompress data with a known content encoding.
+
+    Other content encodings (like utf-8, set by some
+    publishers) are not compressed, the data is returned.
+
+    :param data: Received body.
+    :param encoding: Content encoding of the body.
+    :return: Decompressed body.
+    """
+
+    if encoding in ENCODINGS:
+        return ENCODINGS[encoding][1](data)
+
+    return data
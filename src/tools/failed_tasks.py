@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 21:00:08
+     $Rev: 12
+"""
+
+# BUILTIN modules
+from uuid import uuid4
+from datetime import datetime
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+# Third party modules
+from celery import states
+from pymongo import ASCENDING, UpdateOne
+from fastapi.concurrency import run_in_threadpool
+
+# local modules
+from ..tasks import WORKER
+
+# Constants
+RETRY_INDEX = [('status', ASCENDING), ('date_done', ASCENDING)]
+""" Backend index used when selecting failed tasks. """
+FIELDS = ('_id', 'name', 'args')
+""" Returned fields of a failed task document. """
+
+_index_created = False
+""" The failed task index has been created in this process. """
+
+
+# ---------------------------------------------------------
+#
+def _collection():
+    """ Return the backend collection (the index is created once). """
+    global _index_created
+    collection = WORKER.backend.collection
+
+    if not _index_created:
+        collection.create_index(RETRY_INDEX, background=True)
+        _index_created = True
+
+    return collection
+
+
+# ---------------------------------------------------------
+#
+def _exc_type(document: dict) -> Optional[str]:
+    """ Return the exception type of a failed task document.
+
+    The exception info is stored encoded (with the result serializer),
+    so it can't be queried and is checked after decoding.
+
+    :param document: Failed task document (with the result).
+    :return: Exception type name (None when the result can't be decoded).
+    """
+
+    try:
+        result = WORKER.backend.decode(document['result'])
+
+    except Exception:
+        return None
+
+    return result.get('exc_type') if isinstance(result, dict) else None
+
+
+# ---------------------------------------------------------
+#
+def _find_failed_tasks(date_from: Optional[datetime],
+                       date_to: Optional[datetime],
+                       task_name: Optional[str],
+                       error_type: Optional[str],
+                       max_count: int,
+                       tenant: Optional[str]) -> List[dict]:
+    """ Return failed tasks that haven't been retried yet (blocking).
+
+    :param date_from: Only tasks that failed at, or after this time.
+    :param date_to: Only tasks that failed at, or before this time.
+    :param task_name: Only tasks with this name.
+    :param error_type: Only tasks that failed with this exception type.
+    :param max_count: Max number of returned tasks (oldest first).
+    :param tenant: Only tasks owned by this tenant (None selects all tenants).
+    :return: Failed task documents (_id, name and args).
+    """
+    query = {'status': states.FAILURE, 'retried_by': {'$exists': False}}
+
+    if date_from or date_to:
+        query['date_done'] = {key: value for key, value in
+                              (('$gte', date_from), ('$lte', date_to)) if value}
+
+    if task_name:
+        query['name'] = task_name
+
+    # The owner tenant is recorded in the task parameters (second argument).
+    if tenant:
+        query['args.1.tenant'] = tenant
+
+    projection = dict.fromkeys(FIELDS + (('result',) if error_type else ()), 1)
+    cursor = _collection().find(query, projection).sort('date_done', ASCENDING)
+
+    if not error_type:
+        return list(cursor.limit(max_count))
+
+    documents = (document for document in cursor
+                 if _exc_type(document) == error_type)
+    return [{key: document[key] for key in FIELDS}
+            for document in islice(documents, max_count)]
+
+
+# ---------------------------------------------------------
+#
+async def find_failed_tasks(date_from: Optional[datetime] = None,
+                            date_to: Optional[datetime] = None,
+                            task_name: Optional[str] = None,
+                            error_type: Optional[str] = None,
+                            max_count: int = 1000,
+                            tenant: Optional[str] = None) -> List[dict]:
+    """ Return failed tasks that haven't been retried yet.
+
+    All matching tasks are selected with one indexed query.
+
+    :param date_from: Only tasks that failed at, or after this time.
+    :param date_to: Only tasks that failed at, or before this time.
+    :param task_name: Only tasks with this name.
+    :param error_type: Only tasks that failed with this exception type.
+    :param max_count: Max number of returned tasks (oldest first).
+    :param tenant: Only tasks owned by this tenant (None selects all tenants).
+    :return: Failed task documents (_id, name and args).
+    """
+    return await run_in_threadpool(_find_failed_tasks, date_from, date_to,
+                                   task_name, error_type, max_count, tenant)
+
+
+# ---------------------------------------------------------
+#
+def _claim_failed_tasks(failed_ids: List[str], claim: str) -> List[str]:
+    """ Claim failed tasks that haven't been retried yet (blocking).
+
+    :param failed_ids: Failed task IDs.
+    :param claim: Unique claim marker.
+    :return: Failed task IDs that were claimed.
+    """
+    collection = WORKER.backend.collection
+    collection.update_many({'_id': {'$in': failed_ids}, 'retried_by': {'$exists': False}},
+                           {'$set': {'retried_by': claim}})
+    cursor = collection.find({'_id': {'$in': failed_ids}, 'retried_by': claim}, {'_id': 1})
+    return [document['_id'] for document in cursor]
+
+
+# ---------------------------------------------------------
+#
+async def claim_failed_tasks(failed_ids: List[str]) -> Tuple[str, List[str]]:
+    """ Claim failed tasks for a retry, before they are resubmitted.
+
+    The tasks are marked atomically (per task), so concurrent bulk
+    retries that selected the same failed tasks never resubmit them
+    twice. A claimed task is no longer selected by find_failed_tasks.
+
+    :param failed_ids: Failed task IDs.
+    :return: Claim marker, and the failed task IDs that this call claimed.
+    """
+    claim = f'claim-{uuid4()}'
+    return claim, await run_in_threadpool(_claim_failed_tasks, failed_ids, claim)
+
+
+# ---------------------------------------------------------
+#
+async def release_failed_tasks(claim: str):
+    """ Release claimed failed tasks that couldn't be resubmitted.
+
+    :param claim: Claim marker returned by claim_failed_tasks.
+    """
+    await run_in_threadpool(WORKER.backend.collection.update_many,
+                            {'retried_by': claim}, {'$unset': {'retried_by': ''}})
+
+
+# ---------------------------------------------------------
+#
+async def mark_retried(retries: Dict[str, str]):
+    """ Mark failed tasks as retried, so they aren't selected again.
+
+    :param retries: New task ID per failed task ID.
+    """
+
+    if retries:
+        requests = [UpdateOne({'_id': failed_id}, {'$set': {'retried_by': task_id}})
+                    for failed_id, task_id in retries.items()]
+        await run_in_threadpool(WORKER.backend.collection.bulk_write,
+                                requests, ordered=False)
@@ -23,7 +23,8 @@ from loguru import logger
 # local modules
 from src import config
 from ..tasks import WORKER
-from ..api.models import ResourceModel, HealthResponseModel
+from .task_status import CACHE
+from ..api.models import ResourceModel, HealthResponseModel, StatusCacheModel
 
 # Constants
 CERT_EXPIRE_FILE = (
@@ -144,4 +145,5 @@ async def get_health_status() -> HealthResponseModel:
                                version=config.version,
                                name=config.service_name,
                                resources=resource_items,
-                               cert_remaining_days=days)
+                               cert_remaining_days=days,
+                               status_cache=StatusCacheModel(**CACHE.stats()))
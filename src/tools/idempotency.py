@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 21:00:57
+     $Rev: 12
+"""
+
+# BUILTIN modules
+import time
+from collections import OrderedDict
+from typing import Optional
+from datetime import datetime, timedelta, timezone
+
+# Third party modules
+from celery import Celery
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError
+from fastapi.concurrency import run_in_threadpool
+
+
+# -----------------------------------------------------------------------------
+#
+class IdempotencyStore:
+    """ This class maps idempotency keys to task IDs.
+
+    The keys are stored in the result backend database, where the unique
+    _id index makes sure that only one request can claim a key, and a TTL
+    index removes keys when they expire (the expiry time is stored per key,
+    so the window can be changed without rebuilding the index). Recently
+    seen keys are kept in memory so that repeated retries don't reach the
+    DB, but only when their task has been sent (a claimed key can be
+    released by another process).
+    """
+
+    # ---------------------------------------------------------
+    #
+    def __init__(self, worker: Celery, window: float, cache_size: int,
+                 collection: str = 'idempotency_keys'):
+        """ The class initializer.
+
+        :param worker: Celery app with the MongoDB result backend.
+        :param window: Seconds that a key is remembered.
+        :param cache_size: Max number of keys in the memory front cache.
+        :param collection: MongoDB collection name.
+        """
+
+        # Unique parameters.
+        self.worker = worker
+        self.window = window
+        self.cache_size = cache_size
+        self.collection_name = collection
+
+        # Store state.
+        self._collection = None
+        self._recent = OrderedDict()
+
+    # ---------------------------------------------------------
+    #
+    @property
+    def collection(self):
+        """ Return the key collection (the indexes are created once). """
+
+        if self._collection is None:
+            collection = self.worker.backend.database[self.collection_name]
+            collection.create_index([('expires', ASCENDING)],
+                                    expireAfterSeconds=0)
+            self._collection = collection
+
+        return self._collection
+
+    # ---------------------------------------------------------
+    #
+    def _remember(self, key: str, task_id: str):
+        """ Add the key to the memory front cache.
+
+        :param key: Idempotency key.
+        :param task_id: Task ID that the key belongs to.
+        """
+        self._recent.pop(key, None)
+        self._recent[key] = (task_id, time.monotonic() + self.window)
+
+        if len(self._recent) > self.cache_size:
+            self._recent.popitem(last=False)
+
+    # ---------------------------------------------------------
+    #
+    def _claim(self, key: str, task_id: str) -> Optional[dict]:
+        """ Claim the key for the task in the DB (blocking).
+
+        The TTL monitor only runs once a minute, so an expired key that
+        still exists is taken over by the new task. A key that is released
+        (or removed) meanwhile is claimed again.
+
+        :param key: Idempotency key.
+        :param task_id: Task ID that wants to claim the key.
+        :return: Key document of the task that already owns the key, or None.
+        """
+
+        while True:
+            now = datetime.now(timezone.utc)
+            document = {'_id': key, 'task_id': task_id, 'sent': False,
+                        'expires': now + timedelta(seconds=self.window)}
+
+            try:
+                self.collection.insert_one(document)
+                return None
+
+            except DuplicateKeyError:
+                if self.collection.find_one_and_update(
+                        {'_id': key, 'expires': {'$lte': now}},
+                        {'$set': document}) is not None:
+                    return None
+
+                if document := self.collection.find_one({'_id': key}):
+                    return document
+
+    # ---------------------------------------------------------
+    #
+    async def claim(self, key: str, task_id: str) -> Optional[str]:
+        """ Claim the key for the task.
+
+        :param key: Idempotency key.
+        :param task_id: Task ID that wants to claim the key.
+        :return: Task ID that already owns the key, or None.
+        """
+
+        if item := self._recent.get(key):
+            owner, expires = item
+
+            if expires > time.monotonic():
+                return owner
+
+        if document := await run_in_threadpool(self._claim, key, task_id):
+            if document.get('sent'):
+                self._remember(key, document['task_id'])
+
+            return document['task_id']
+
+        return None
+
+    # ---------------------------------------------------------
+    #
+    async def confirm(self, key: str, task_id: str):
+        """ Confirm a claimed key (when the task has been sent).
+
+        :param key: Idempotency key.
+        :param task_id: Task ID that owns the key.
+        """
+        await run_in_threadpool(self.collection.update_one,
+                                {'_id': key, 'task_id': task_id},
+                                {'$set': {'sent': True}})
+        self._remember(key, task_id)
+
+    # ---------------------------------------------------------
+    #
+    async def release(self, key: str, task_id: str):
+        """ Release a claimed key (when the task couldn't be submitted).
+
+        :param key: Idempotency key.
+        :param task_id: Task ID that owns the key.
+        """
+        await run_in_threadpool(self.collection.delete_one,
+                                {'_id': key, 'task_id': task_id})
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 21:03:16
+     $Rev: 12
+"""
+
+# BUILTIN modules
+import json
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+# Third party modules
+from loguru import logger
+from kombu.serialization import registry
+
+# Optional third party modules
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+# -----------------------------------------------------------------------------
+#
+class Codec(NamedTuple):
+    """ Message body serialization.
+
+    :ivar content_type: Message content type.
+    :ivar dumps: Return the encoded body of a message.
+    :ivar loads: Return the message of an encoded body.
+    """
+    content_type: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes], Any]
+
+
+# Constants
+CODECS: Dict[str, Codec] = {
+    'json': Codec('application/json',
+                  lambda data: json.dumps(data, ensure_ascii=False).encode(),
+                  json.loads),
+}
+""" Available codecs (the ones with optional packages are only added when installed). """
+
+# orjson output is plain JSON, so it's published as application/json and
+# consumers that only accept json (like older workers) still decode it.
+if orjson is not None:
+    CODECS['orjson'] = Codec('application/json', orjson.dumps, orjson.loads)
+
+    # Celery (kombu) serializer, only the encoding is accelerated. Without
+    # a decoder of its own, received application/json content is decoded
+    # by kombu's json decoder, which also restores the kombu encoded types
+    # (like datetime and UUID) of messages from json producers.
+    registry.register('orjson', lambda data: orjson.dumps(data).decode(), None,
+                      content_type='application/json', content_encoding='utf-8')
+
+# kombu registers its own msgpack serializer (same content type).
+if msgpack is not None:
+    CODECS['msgpack'] = Codec('application/x-msgpack',
+                              lambda data: msgpack.packb(data, use_bin_type=True),
+                              lambda data: msgpack.unpackb(data, raw=False))
+
+CONTENT_TYPES = {codec.content_type: codec for codec in CODECS.values()}
+""" Available codecs per content type (JSON is decoded by orjson when it's installed). """
+
+
+# ---------------------------------------------------------
+#
+def select_codec(name: str) -> str:
+    """ Return the configured codec name, if it's available.
+
+    orjson and msgpack need their optional packages, json is used without them.
+
+    :param name: Configured codec ('json', 'orjson' or 'msgpack').
+    :return: Available codec name.
+    """
+
+    if name not in CODECS:
+        logger.warning(f'{name} codec is not available, using json')
+        return 'json'
+
+    return name
+
+
+# ---------------------------------------------------------
+#
+def encode(message: Any, name: str) -> Tuple[bytes, str]:
+    """ Return the encoded message body and its content type.
+
+    :param message: Message content.
+    :param name: Codec name.
+    :return: Message body and content type.
+    """
+    codec = CODECS[name]
+    return codec.dumps(message), codec.content_type
+
+
+# ---------------------------------------------------------
+#
+def decode(body: bytes, content_type: Optional[str]) -> Any:
+    """ Return the message content of an encoded body.
+
+    Bodies without a (known) content type are decoded as JSON,
+    like the ones published by older publishers.
+
+    :param body: Message body.
+    :param content_type: Message content type.
+    :return: Message content.
+    """
+    return CONTENT_TYPES.get(content_type, CODECS['json']).loads(body)
@@ -11,13 +11,20 @@ VERSION INFO::
 """
 
 # BUILTIN modules
-import json
 import asyncio
-from typing import Callable, Optional
+from typing import Any, Callable, List, Optional, Set, Tuple
 
 # Third party modules
+from loguru import logger
+from aio_pika.pool import Pool
 from aio_pika import connect, connect_robust, Message, DeliveryMode
-from aio_pika.abc import AbstractIncomingMessage, AbstractRobustConnection
+from aio_pika.abc import (AbstractChannel, AbstractIncomingMessage,
+                          AbstractQueue, AbstractRobustConnection)
+
+# local modules
+from src import config
+from .message_codecs import decode, encode, select_codec
+from .content_encoding import compress, decompress, select_encoding
 
 
 # -----------------------------------------------------------------------------
@@ -27,41 +34,197 @@ class RabbitClient:
 
     The RabbitMQ queue mechanism is used so that we can take advantage of
     good horizontal message scaling when needed.
+
+    Up to concurrency received messages are handled at the same time, and
+    each message is acknowledged when its handler has finished (so the
+    acknowledgements may arrive in another order than the messages).
+
+    In batch mode (batch_size > 0) the handler is called with a list of
+    up to batch_size messages, collected for at most batch_window seconds.
+    The handler returns the list indexes of the messages it failed to
+    handle (or None). Failed messages are requeued once, and rejected when
+    they fail again (dead-lettered, when the queue has a dead-letter
+    exchange). The rest of the batch is acknowledged with one multiple
+    acknowledgement. Batches are handled one at a time, so that the
+    multiple acknowledgement never includes messages of another batch.
     """
 
     # ---------------------------------------------------------
     #
     def __init__(self, rabbit_url: str, service: Optional[str] = None,
-                 incoming_message_handler: Optional[Callable] = None):
+                 incoming_message_handler: Optional[Callable] = None,
+                 concurrency: int = 1, prefetch: int = 0,
+                 batch_size: int = 0, batch_window: float = 0.1,
+                 codec: str = 'json'):
         """ The class initializer.
 
         :param rabbit_url: RabbitMQ's connection URL.
         :param service: Name of message subscription queue.
         :param incoming_message_handler: Received message callback method.
+        :param concurrency: Max number of concurrently handled messages.
+        :param prefetch: Max number of unacknowledged messages (0 means the
+            same as concurrency, or two batches in batch mode).
+        :param batch_size: Max messages per handler call (0 disables batch mode).
+        :param batch_window: Max seconds a message waits for its batch.
+        :param codec: Published message codec ('json', 'orjson' or 'msgpack').
         """
 
         # Unique parameters.
         self.rabbit_url = rabbit_url
+        self.codec = select_codec(codec)
         self.service_name = service
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.batch_window = batch_window
+        self.prefetch = prefetch or (2 * batch_size if batch_size else concurrency)
         self.message_handler = incoming_message_handler
 
+        # Subscription state.
+        self._tag: Optional[str] = None
+        self._batch: List[AbstractIncomingMessage] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._batch_lock: Optional[asyncio.Lock] = None
+        self._queue: Optional[AbstractQueue] = None
+        self._inflight: Set[asyncio.Task] = set()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._connection: Optional[AbstractRobustConnection] = None
+
     # ---------------------------------------------------------
     #
     async def _process_incoming_message(self, message: AbstractIncomingMessage):
         """ Processing an incoming message from RabbitMQ.
 
+        Compressed message bodies (gzip or zstd content
+        encoding) are decompressed before they are decoded.
+
         :param message: The received message.
         """
-        if body := message.body:
-            await self.message_handler(json.loads(body))
+        if message.body:
+            await self.message_handler(self._decode(message))
 
         await message.ack()
 
+    # ---------------------------------------------------------
+    #
+    @staticmethod
+    def _decode(message: AbstractIncomingMessage) -> Any:
+        """ Return the content of a received message.
+
+        The codec is selected by the content type (JSON when it's missing).
+
+        :param message: The received message.
+        :return: Decoded message content.
+        """
+        return decode(decompress(message.body, message.content_encoding),
+                      message.content_type)
+
+    # ---------------------------------------------------------
+    #
+    async def _dispatch(self, message: AbstractIncomingMessage):
+        """ Handle a delivered message when a handling slot is free.
+
+        Every delivered message runs in its own task, the
+        semaphore limits how many of them are handled at once.
+
+        :param message: The received message.
+        """
+        task = asyncio.current_task()
+        self._inflight.add(task)
+
+        try:
+            async with self._slots:
+                await self._process_incoming_message(message)
+
+        finally:
+            self._inflight.discard(task)
+
+    # ---------------------------------------------------------
+    #
+    async def _collect(self, message: AbstractIncomingMessage):
+        """ Add a delivered message to the current batch (batch mode).
+
+        :param message: The received message.
+        """
+        self._batch.append(message)
+
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+
+        elif len(self._batch) == 1:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(self.batch_window, self._flush)
+
+    # ---------------------------------------------------------
+    #
+    def _flush(self):
+        """ Start handling the current batch. """
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if self._batch:
+            batch, self._batch = self._batch, []
+            task = asyncio.create_task(self._process_incoming_batch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    # ---------------------------------------------------------
+    #
+    async def _process_incoming_batch(self, batch: List[AbstractIncomingMessage]):
+        """ Processing a batch of incoming messages from RabbitMQ.
+
+        Messages that can't be decoded are rejected, and not
+        passed to the handler. When the handler fails, all
+        messages are handled as failed messages.
+
+        The lock is taken before the first await. The batch tasks start
+        in _flush order, so the batches run one at a time in delivery
+        order, and a multiple acknowledgement never includes messages
+        of an earlier batch that is still being handled.
+
+        :param batch: The received messages (in delivery order).
+        """
+        async with self._batch_lock:
+            messages, contents, failed = [], [], []
+
+            for message in batch:
+                if not message.body:
+                    continue
+
+                try:
+                    contents.append(self._decode(message))
+                    messages.append(message)
+
+                except Exception as why:
+                    logger.error(f'Rejected undecodable message on '
+                                 f'{self.service_name}: {why}')
+                    await message.reject(requeue=False)
+
+            try:
+                if messages:
+                    failed = [messages[idx] for idx in
+                              await self.message_handler(contents) or []]
+
+            except Exception as why:
+                logger.opt(exception=why).error(
+                    f'Batch handler failed on {self.service_name}')
+                failed = messages
+
+            for message in failed:
+                await message.nack(requeue=not message.redelivered)
+
+            # Acknowledge the rest, up to the last unsettled message.
+            if done := [message for message in batch if not message.processed]:
+                await done[-1].ack(multiple=True)
+
     # ---------------------------------------------------------
     #
     async def start_subscription(self) -> AbstractRobustConnection:
         """ Setup message listener with the current running asyncio loop. """
         loop = asyncio.get_running_loop()
+        self._batch_lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(self.concurrency)
 
         # Perform receive connection.
         connection = await connect_robust(loop=loop, url=self.rabbit_url)
@@ -69,17 +232,43 @@ class RabbitClient:
         # Creating a receiver channel and setting quality of service.
         channel = await connection.channel()
 
-        # To make sure the load is evenly distributed between the workers.
-        await channel.set_qos(1)
+        # Limit unacknowledged messages, so the load is evenly
+        # distributed between the workers.
+        await channel.set_qos(prefetch_count=self.prefetch)
 
         # Creating a receive queue.
         queue = await channel.declare_queue(name=self.service_name, durable=True)
 
         # Start consuming existing and future messages.
-        await queue.consume(self._process_incoming_message, no_ack=False)
+        self._tag = await queue.consume(
+            self._collect if self.batch_size else self._dispatch, no_ack=False)
+        self._queue, self._connection = queue, connection
 
         return connection
 
+    # ---------------------------------------------------------
+    #
+    async def stop_subscription(self, timeout: Optional[float] = None):
+        """ Stop consuming, finish in-flight messages and close the connection.
+
+        Messages that are still unacknowledged when the timeout
+        has passed are returned to the queue by RabbitMQ.
+
+        :param timeout: Max seconds to wait for in-flight messages (None waits).
+        """
+
+        if self._connection is None:
+            return
+
+        await self._queue.cancel(self._tag)
+        self._flush()
+
+        if self._inflight:
+            await asyncio.wait(set(self._inflight), timeout=timeout)
+
+        await self._connection.close()
+        self._queue = self._connection = self._tag = None
+
     # ---------------------------------------------------------
     #
     async def publish_message(self, queue: str, message: dict):
@@ -92,12 +281,181 @@ class RabbitClient:
         channel = await connection.channel()
 
         # Create a message and publish it.
+        body, content_type = encode(message, self.codec)
         message_body = Message(
-            content_type='application/json',
-            delivery_mode=DeliveryMode.PERSISTENT,
-            body=json.dumps(message, ensure_ascii=False).encode())
+            body=body,
+            content_type=content_type,
+            delivery_mode=DeliveryMode.PERSISTENT)
         await channel.default_exchange.publish(
             routing_key=queue, message=message_body)
 
         # Close the connection properly.
         await connection.close()
+
+
+# -----------------------------------------------------------------------------
+#
+class RabbitPublisher:
+    """ This class implements pooled, confirmed RabbitMQ publishing.
+
+    One robust connection (reconnected automatically) and a pool of
+    channels are shared by all publishers in the process. Publisher
+    confirms are enabled on the channels, so a publish only succeeds
+    when the broker has taken responsibility for the message. Several
+    messages are pipelined on one channel and their confirms awaited
+    together, instead of one broker round-trip per message.
+
+    Messages are encoded with the configured codec (content type message
+    property). Large messages can be compressed, the content encoding
+    message property tells the consumer how to decompress them.
+
+    The publisher belongs to the event loop that first uses it.
+    """
+
+    # ---------------------------------------------------------
+    #
+    def __init__(self, rabbit_url: str, pool_size: int = 4,
+                 compression: str = 'off', threshold: int = 65536,
+                 codec: str = 'json'):
+        """ The class initializer.
+
+        :param rabbit_url: RabbitMQ's connection URL.
+        :param pool_size: Maximum number of pooled publishing channels.
+        :param compression: Message compression ('off', 'gzip' or 'zstd').
+        :param threshold: Min message size in bytes that is compressed.
+        :param codec: Message codec ('json', 'orjson' or 'msgpack').
+        """
+
+        # Unique parameters.
+        self.threshold = threshold
+        self.pool_size = pool_size
+        self.rabbit_url = rabbit_url
+        self.codec = select_codec(codec)
+        self.encoding = select_encoding(compression)
+
+        # Lazily created broker resources.
+        self._declared = set()
+        self._lock: Optional[asyncio.Lock] = None
+        self._channels: Optional[Pool] = None
+        self._connection: Optional[AbstractRobustConnection] = None
+
+    # ---------------------------------------------------------
+    #
+    def reset(self):
+        """ Forget the broker resources that were copied from a parent process. """
+        self._declared = set()
+        self._lock = None
+        self._channels = None
+        self._connection = None
+
+    # ---------------------------------------------------------
+    #
+    async def _create_channel(self) -> AbstractChannel:
+        """ Return a new publishing channel (with publisher confirms). """
+        return await self._connection.channel(publisher_confirms=True)
+
+    # ---------------------------------------------------------
+    #
+    async def _get_channels(self) -> Pool:
+        """ Return the channel pool, connect to RabbitMQ when needed. """
+
+        if self._channels is None:
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+
+            async with self._lock:
+
+                if self._channels is None:
+                    self._connection = await connect_robust(url=self.rabbit_url)
+                    self._channels = Pool(self._create_channel,
+                                          max_size=self.pool_size)
+
+        return self._channels
+
+    # ---------------------------------------------------------
+    #
+    async def declare_queue(self, name: str, **arguments):
+        """ Declare a queue once per connection.
+
+        :param name: Queue name.
+        :param arguments: Queue declaration arguments (durable...).
+        """
+
+        if name not in self._declared:
+            channels = await self._get_channels()
+
+            async with channels.acquire() as channel:
+                await channel.declare_queue(name=name, **arguments)
+
+            self._declared.add(name)
+
+    # ---------------------------------------------------------
+    #
+    async def publish_many(self, messages: List[Tuple[str, Message]]):
+        """ Publish messages on the default exchange (pipelined, confirmed).
+
+        :param messages: Routing key (queue name) and message per message.
+        :raise AMQPError: When a message can't be published or isn't confirmed.
+        """
+        channels = await self._get_channels()
+
+        async with channels.acquire() as channel:
+            await asyncio.gather(*[
+                channel.default_exchange.publish(message, routing_key=routing_key)
+                for routing_key, message in messages])
+
+    # ---------------------------------------------------------
+    #
+    def create_message(self, message: dict) -> Message:
+        """ Return a persistent encoded message (compressed when it's large).
+
+        :param message: Message content.
+        :return: Message ready to publish.
+        """
+        body, content_type = encode(message, self.codec)
+        body, encoding = compress(body, self.encoding, self.threshold)
+        return Message(body=body,
+                       content_type=content_type,
+                       content_encoding=encoding,
+                       delivery_mode=DeliveryMode.PERSISTENT)
+
+    # ---------------------------------------------------------
+    #
+    async def publish_messages(self, queue: str, messages: List[dict]):
+        """ Publish encoded messages on specified RabbitMQ queue (pipelined).
+
+        :param queue: Publishing queue.
+        :param messages: Messages to be published.
+        :raise AMQPError: When a message can't be published or isn't confirmed.
+        """
+        await self.publish_many([(queue, self.create_message(message))
+                                 for message in messages])
+
+    # ---------------------------------------------------------
+    #
+    async def publish_message(self, queue: str, message: dict):
+        """ Publish an encoded message on specified RabbitMQ queue.
+
+        :param queue: Publishing queue.
+        :param message: Message to be published.
+        :raise AMQPError: When the message can't be published or isn't confirmed.
+        """
+        await self.publish_messages(queue, [message])
+
+    # ---------------------------------------------------------
+    #
+    async def close(self):
+        """ Close pooled channels and the broker connection. """
+
+        if self._channels is not None:
+            await self._channels.close()
+            await self._connection.close()
+            self._channels = self._connection = None
+            self._declared.clear()
+
+
+PUBLISHER = RabbitPublisher(config.rabbit_url, config.publisher_pool_size,
+                            config.callback_compression,
+                            config.compression_threshold,
+                            config.message_codec)
+""" Shared RabbitMQ publisher for this process. """
@@ -10,30 +10,157 @@ VERSION INFO::
      $Rev: 7
 """
 
+# BUILTIN modules
+import math
+import time
+from typing import Dict, Optional, Sequence
+
 # Third party modules
 from fastapi.security import APIKeyHeader
 from fastapi import HTTPException, Security, status
 
 # local modules
 from src import config
+from ..core.setup import DEFAULT_TENANT_NAME, TenantConfig
 
 # Constants
 API_KEY_HEADER = APIKeyHeader(name="X-API-Key")
 """ Using API key authentication. """
+DEFAULT_TENANT = TenantConfig(name=DEFAULT_TENANT_NAME)
+""" Tenant for the shared service API key (no rate limit, default queue). """
+
+
+# -----------------------------------------------------------------------------
+#
+class TokenBucket:
+    """ This class implements a token bucket rate limiter.
+
+    The bucket is refilled with rate tokens per second, up to burst tokens.
+    """
+
+    # ---------------------------------------------------------
+    #
+    def __init__(self, rate: float, burst: int):
+        """ The class initializer.
+
+        :param rate: Refill rate in tokens per second.
+        :param burst: Bucket capacity.
+        """
+
+        # Unique parameters.
+        self.rate = rate
+        self.capacity = max(burst, 1)
+
+        # Bucket state.
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    # ---------------------------------------------------------
+    #
+    def take(self, count: int = 1) -> Optional[int]:
+        """ Take count tokens from the bucket.
+
+        A count above the bucket capacity is taken from a full bucket,
+        and the bucket stays in debt until the extra tokens are refilled.
+
+        :param count: Number of tokens to take.
+        :return: None when the tokens were available, otherwise
+            seconds until the tokens are available.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity,
+                          self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        needed = min(count, self.capacity)
+
+        if self.tokens >= needed:
+            self.tokens -= count
+            return None
+
+        return max(math.ceil((needed - self.tokens) / self.rate), 1)
+
+
+_buckets: Dict[str, TokenBucket] = {
+    tenant.name: TokenBucket(tenant.rate, tenant.burst or math.ceil(tenant.rate))
+    for tenant in config.api_tenants.values() if tenant.rate > 0
+}
+""" Rate limit per tenant name (in this process). """
+
+
+# ---------------------------------------------------------
+#
+def tenant_by_name(name: str) -> TenantConfig:
+    """ Return the tenant configuration for a tenant name.
+
+    :param name: Tenant name (recorded in the task parameters).
+    :return: Tenant configuration (the default tenant when it's unknown).
+    """
+    return next((tenant for tenant in config.api_tenants.values()
+                 if tenant.name == name), DEFAULT_TENANT)
+
+
+# ---------------------------------------------------------
+#
+def owns_task(tenant: TenantConfig, args: Sequence) -> bool:
+    """ Return True when the tenant owns a task.
+
+    The service API key (default tenant) owns all tasks.
+
+    :param tenant: Tenant configuration for the request API key.
+    :param args: Task positional arguments (payload and parameters).
+    :return: Task ownership status.
+    """
+
+    if tenant is DEFAULT_TENANT:
+        return True
+
+    params = args[1] if len(args) > 1 and isinstance(args[1], dict) else {}
+    return params.get('tenant', DEFAULT_TENANT.name) == tenant.name
+
+
+# ---------------------------------------------------------
+#
+def charge_tokens(tenant: TenantConfig, count: int = 1):
+    """ Take count tokens from the tenant's rate limit.
+
+    :param tenant: Tenant configuration for the request API key.
+    :param count: Number of tokens (submitted tasks) to take.
+    :raise HTTPException(429): When the tenant's rate limit is exceeded.
+    """
+
+    if count > 0 and (bucket := _buckets.get(tenant.name)) and (seconds := bucket.take(count)):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Rate limit exceeded for tenant {tenant.name}",
+            headers={"Retry-After": str(seconds)}
+        )
 
 
 # ---------------------------------------------------------
 #
-def validate_authentication(api_key: str = Security(API_KEY_HEADER)):
-    """ Validate API key authentication.
+async def validate_authentication(
+        api_key: str = Security(API_KEY_HEADER)
+) -> TenantConfig:
+    """ Validate API key authentication and the API key's rate limit.
+
+    Runs in the event loop (not in the threadpool), so
+    the token buckets are never updated concurrently.
 
     :param api_key: Authentication credentials.
+    :return: Tenant configuration for the API key.
     :raise HTTPException(401): When incorrect API key is supplied.
+    :raise HTTPException(429): When the API key's rate limit is exceeded.
     """
 
-    if api_key != config.service_api_key:
+    if api_key == config.service_api_key:
+        return DEFAULT_TENANT
+
+    if (tenant := config.api_tenants.get(api_key)) is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or missing API Key",
             headers={"WWW-Authenticate": "X-API-Key"}
         )
+
+    charge_tokens(tenant)
+    return tenant
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 20:02:34
+     $Rev: 12
+"""
+
+# BUILTIN modules
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+# Third party modules
+from pydantic import BaseModel
+
+
+# -----------------------------------------------------------------------------
+#
+class StatusCache:
+    """ This class implements a size-aware LRU cache with a TTL.
+
+    It's used for terminal task states, since a backend record never
+    changes after a task has reached SUCCESS or FAILURE. The size of an
+    entry is the length of its JSON representation.
+
+    :ivar hits: Number of cache hits.
+    :ivar misses: Number of cache misses.
+    """
+
+    # ---------------------------------------------------------
+    #
+    def __init__(self, ttl: float, max_bytes: int):
+        """ The class initializer.
+
+        :param ttl: Seconds that an entry is valid (0 disables the cache).
+        :param max_bytes: Max total size of cached entries (0 disables the cache).
+        """
+
+        # Unique parameters.
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        # Cache state.
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+        self._items = OrderedDict()
+
+    # ---------------------------------------------------------
+    #
+    @property
+    def enabled(self) -> bool:
+        """ Return cache enabled status. """
+        return self.ttl > 0 and self.max_bytes > 0
+
+    # ---------------------------------------------------------
+    #
+    def _remove(self, key: Hashable):
+        """ Remove the entry for the key (if it exists).
+
+        :param key: Cache key.
+        """
+
+        if item := self._items.pop(key, None):
+            self.size -= item[1]
+
+    # ---------------------------------------------------------
+    #
+    def get(self, key: Hashable) -> Optional[BaseModel]:
+        """ Return the cached value for the key, or None.
+
+        :param key: Cache key.
+        :return: Cached value.
+        """
+
+        if item := self._items.get(key):
+            expires, _, value = item
+
+            if expires > time.monotonic():
+                self._items.move_to_end(key)
+                self.hits += 1
+                return value
+
+            self._remove(key)
+
+        self.misses += 1
+        return None
+
+    # ---------------------------------------------------------
+    #
+    def put(self, key: Hashable, value: BaseModel):
+        """ Store the value and evict the least recently used entries.
+
+        Values that are larger than the cache are not stored.
+
+        :param key: Cache key.
+        :param value: Value to cache.
+        """
+
+        if not self.enabled:
+            return
+
+        self._remove(key)
+        size = len(value.model_dump_json())
+
+        if size > self.max_bytes:
+            return
+
+        while self._items and self.size + size > self.max_bytes:
+            self._remove(next(iter(self._items)))
+
+        self._items[key] = (time.monotonic() + self.ttl, size, value)
+        self.size += size
+
+    # ---------------------------------------------------------
+    #
+    def invalidate(self, *keys: Hashable):
+        """ Remove the entries for the keys.
+
+        :param keys: Cache keys.
+        """
+
+        for key in keys:
+            self._remove(key)
+
+    # ---------------------------------------------------------
+    #
+    def stats(self) -> dict:
+        """ Return cache statistics. """
+        return {'hits': self.hits, 'misses': self.misses,
+                'items': len(self._items), 'bytes': self.size}
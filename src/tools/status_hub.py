@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 20:34:46
+     $Rev: 12
+"""
+
+# BUILTIN modules
+import asyncio
+import contextlib
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+# Third party modules
+from loguru import logger
+from pymongo.errors import PyMongoError
+
+# local modules
+from ..tasks import WORKER
+from ..api.models import StatusResponseModel
+from .task_status import document_to_status, get_task_statuses
+
+# Constants
+CHANGE_PIPELINE = [
+    {'$match': {'operationType': {'$in': ['insert', 'replace', 'update']}}},
+    {'$project': {'fullDocument.args': 0, 'fullDocument.kwargs': 0}},
+]
+""" Backend change stream filter (skip the large extended result fields). """
+
+StatusEvent = Tuple[str, StatusResponseModel]
+""" Task ID and its current status. """
+
+
+# -----------------------------------------------------------------------------
+#
+class StatusHub:
+    """ This class fans out task status changes to many subscribers.
+
+    All subscribers in the API process share one upstream source, so the
+    cost of N subscribers is one subscription and not N polls. The source
+    is a MongoDB change stream on the result backend collection. When the
+    DB doesn't support change streams (a standalone server), the hub falls
+    back to one $in query per interval for all subscribed task IDs.
+
+    The upstream source only runs while there are subscribers, and
+    changes of unsubscribed tasks are skipped before they are decoded.
+    """
+
+    # ---------------------------------------------------------
+    #
+    def __init__(self, source: str = 'auto', interval: float = 1.0):
+        """ The class initializer.
+
+        :param source: Upstream source, 'auto' (change stream with polling
+            fallback) or 'poll' (polling only).
+        :param interval: Polling interval in seconds.
+        """
+
+        # Unique parameters.
+        self.source = source
+        self.interval = interval
+
+        # Subscription state.
+        self._stopped = False
+        self._last: Dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+
+    # ---------------------------------------------------------
+    #
+    def subscribe(self, task_ids: Iterable[str]) -> asyncio.Queue:
+        """ Return a queue that receives status events for the task IDs.
+
+        :param task_ids: Task IDs to receive status events for.
+        :return: Subscriber event queue.
+        """
+        queue = asyncio.Queue()
+
+        for task_id in task_ids:
+            self._subscribers[task_id].add(queue)
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+        return queue
+
+    # ---------------------------------------------------------
+    #
+    def unsubscribe(self, task_ids: Iterable[str], queue: asyncio.Queue):
+        """ Stop sending status events for the task IDs to the queue.
+
+        :param task_ids: Subscribed task IDs.
+        :param queue: Subscriber event queue.
+        """
+
+        for task_id in task_ids:
+            if subscribers := self._subscribers.get(task_id):
+                subscribers.discard(queue)
+
+                if not subscribers:
+                    del self._subscribers[task_id]
+                    self._last.pop(task_id, None)
+
+    # ---------------------------------------------------------
+    #
+    def publish(self, task_id: str, status: StatusResponseModel):
+        """ Send a status event to all subscribers of the task ID.
+
+        Unchanged states are not sent again.
+
+        :param task_id: Task ID.
+        :param status: Current task status.
+        """
+
+        if (subscribers := self._subscribers.get(task_id)) and \
+                self._last.get(task_id) != status.status:
+            self._last[task_id] = status.status
+
+            for queue in subscribers:
+                queue.put_nowait((task_id, status))
+
+    # ---------------------------------------------------------
+    #
+    def _watch(self, loop: asyncio.AbstractEventLoop):
+        """ Forward backend change stream events to the hub (blocking).
+
+        :param loop: Event loop that the hub is running in.
+        """
+        collection = WORKER.backend.collection
+
+        # Update events only contain the full document when it's looked up.
+        with collection.watch(CHANGE_PIPELINE, full_document='updateLookup',
+                              max_await_time_ms=500) as stream:
+            while not self._stopped and self._subscribers and stream.alive:
+
+                if not (change := stream.try_next()):
+                    continue
+
+                # Deleted meanwhile (no full document), or not subscribed.
+                document = change.get('fullDocument')
+
+                if document is None or document['_id'] not in self._subscribers:
+                    continue
+
+                status = document_to_status(document, False)
+                loop.call_soon_threadsafe(self.publish, document['_id'], status)
+
+    # ---------------------------------------------------------
+    #
+    async def _poll(self):
+        """ Poll the backend with one query for all subscribed task IDs. """
+
+        while not self._stopped and (task_ids := list(self._subscribers)):
+            try:
+                result = await get_task_statuses(task_ids, False)
+
+                for task_id, status in result.items():
+                    self.publish(task_id, status)
+
+            except Exception as why:
+                logger.error(f'STATUS HUB: {why}')
+
+            await asyncio.sleep(self.interval)
+
+    # ---------------------------------------------------------
+    #
+    async def _run(self):
+        """ Run the upstream status source while there are subscribers.
+
+        When the change stream fails, for any reason, the hub polls.
+        The source is restarted when a subscriber arrived just when
+        it stopped.
+        """
+
+        try:
+            if self.source == 'auto':
+                try:
+                    await asyncio.to_thread(self._watch, asyncio.get_running_loop())
+                    return
+
+                except PyMongoError as why:
+                    logger.info(f'STATUS HUB: change stream unavailable, '
+                                f'polling every {self.interval}s ({why})')
+
+                except Exception as why:
+                    logger.opt(exception=why).error(
+                        f'STATUS HUB: change stream failed, '
+                        f'polling every {self.interval}s')
+
+            await self._poll()
+
+        finally:
+            self._task = None
+
+            if self._subscribers and not self._stopped:
+                self._task = asyncio.create_task(self._run())
+
+    # ---------------------------------------------------------
+    #
+    async def close(self):
+        """ Stop the upstream status source. """
+        self._stopped = True
+
+        if self._task is not None:
+            self._task.cancel()
+
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+
+            self._task = None
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 20:54:24
+     $Rev: 12
+"""
+
+# BUILTIN modules
+import json
+import time
+from typing import Any, Callable, Dict, Optional
+
+# Third party modules
+from loguru import logger
+from pymongo.database import Database
+from pymongo.errors import PyMongoError
+from fastapi.concurrency import run_in_threadpool
+
+# local modules
+from .claim_check import ClaimCheck
+
+# Constants
+MIN_SAMPLES = 5
+""" Min number of recorded runs before a task's duration is trusted. """
+PERCENTILE = 0.9
+""" Duration percentile used for the routing decision. """
+
+
+# ---------------------------------------------------------
+#
+def payload_size(payload: Any) -> int:
+    """ Return the JSON size of a task payload.
+
+    :param payload: Task payload (or claim check reference).
+    :return: Payload size in bytes.
+    """
+
+    if ClaimCheck.is_claim(payload) and isinstance(payload.get('size'), int):
+        return payload['size']
+
+    return len(json.dumps(payload, ensure_ascii=False).encode())
+
+
+# ---------------------------------------------------------
+#
+def size_bucket(size: int) -> int:
+    """ Return the payload size bucket (powers of two).
+
+    :param size: Payload size in bytes.
+    :return: Size bucket.
+    """
+    return max(size, 1).bit_length()
+
+
+# -----------------------------------------------------------------------------
+#
+class TaskDurations:
+    """ This class records task runtimes and predicts short or long tasks.
+
+    The workers push each successful runtime to a rolling window (the
+    latest N runs) per task name and payload size bucket, stored in the
+    result database. The API loads the windows at a regular interval and
+    routes a task to the short queue when the chosen percentile of its
+    recorded runtimes is below the threshold. Tasks without enough
+    history are treated as long, since that is always safe.
+    """
+
+    # ---------------------------------------------------------
+    #
+    def __init__(self, database: Callable[[], Database], window: int,
+                 threshold: float, refresh: float):
+        """ The class initializer.
+
+        :param database: Returns the MongoDB database (called when needed).
+        :param window: Number of recorded runs per task and size bucket.
+        :param threshold: Max runtime in seconds for a short task.
+        :param refresh: Statistics reload interval in seconds (API side).
+        """
+
+        # Unique parameters.
+        self.window = window
+        self.refresh = refresh
+        self.threshold = threshold
+        self._database = database
+
+        # Loaded statistics (API side).
+        self._loaded: Optional[float] = None
+        self.durations: Dict[str, float] = {}
+
+    # ---------------------------------------------------------
+    #
+    @staticmethod
+    def _key(name: str, size: int) -> str:
+        """ Return statistics document ID for a task name and payload size. """
+        return f'{name}:{size_bucket(size)}'
+
+    # ---------------------------------------------------------
+    #
+    @property
+    def collection(self):
+        """ Return the statistics collection. """
+        return self._database()['task_durations']
+
+    # ---------------------------------------------------------
+    #
+    def record(self, name: str, size: int, seconds: float):
+        """ Record a task runtime (worker side, blocking).
+
+        :param name: Task name.
+        :param size: Payload size in bytes.
+        :param seconds: Task runtime.
+        """
+        runtime = {'$each': [round(seconds, 3)], '$slice': -self.window}
+        self.collection.update_one({'_id': self._key(name, size)},
+                                   {'$push': {'durations': runtime}}, upsert=True)
+
+    # ---------------------------------------------------------
+    #
+    def _load(self):
+        """ Load the runtime percentile per task and size bucket (blocking). """
+        durations = {}
+
+        for document in self.collection.find():
+            if len(runs := sorted(document['durations'])) >= MIN_SAMPLES:
+                durations[document['_id']] = runs[int(PERCENTILE * (len(runs) - 1))]
+
+        self.durations = durations
+
+    # ---------------------------------------------------------
+    #
+    def expected(self, name: str, size: int) -> Optional[float]:
+        """ Return the expected runtime, or None when it's not known.
+
+        :param name: Task name.
+        :param size: Payload size in bytes.
+        :return: Expected runtime in seconds.
+        """
+        return self.durations.get(self._key(name, size))
+
+    # ---------------------------------------------------------
+    #
+    async def is_short(self, name: str, size: int) -> bool:
+        """ Return True when the task is expected to finish quickly.
+
+        The statistics are reloaded by the first call after the refresh
+        interval, other calls use the previous statistics meanwhile.
+
+        :param name: Task name.
+        :param size: Payload size in bytes.
+        """
+        now = time.monotonic()
+
+        if self._loaded is None or now - self._loaded > self.refresh:
+            self._loaded = now
+
+            try:
+                await run_in_threadpool(self._load)
+
+            except PyMongoError as why:
+                logger.error(f'DURATIONS: {why}')
+
+        expected = self.expected(name, size)
+        return expected is not None and expected < self.threshold
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 21:04:05
+     $Rev: 12
+"""
+
+# BUILTIN modules
+import time
+import socket
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+# Third party modules
+from celery import Celery, states
+from loguru import logger
+
+# local modules
+from ..api.models import StatusResponseModel
+
+# Constants
+EVENT_STATES = {
+    'task-sent': states.PENDING,
+    'task-received': states.RECEIVED,
+    'task-started': states.STARTED,
+    'task-retried': states.RETRY,
+    'task-succeeded': states.SUCCESS,
+    'task-failed': states.FAILURE,
+    'task-revoked': states.REVOKED,
+    'task-rejected': states.REJECTED,
+}
+""" Translation between Celery task event types and task states. """
+CAPTURE_TIMEOUT = 5.0
+""" Seconds without events before the capture re-checks the stop flag. """
+
+
+# -----------------------------------------------------------------------------
+#
+class TaskStateIndex:
+    """ This class implements a memory-bounded task ID to state index.
+
+    Only in-flight (non-terminal) states are kept, since a terminal state
+    needs the task result that is only available in the backend. When the
+    index is full, the least recently updated task is dropped, and a state
+    that hasn't been updated within max_age seconds is ignored (in case an
+    event was lost). Those tasks are read from the backend instead.
+    """
+
+    # ---------------------------------------------------------
+    #
+    def __init__(self, max_items: int, max_age: float):
+        """ The class initializer.
+
+        :param max_items: Max number of tasks in the index.
+        :param max_age: Seconds that a task state is trusted.
+        """
+
+        # Unique parameters.
+        self.max_age = max_age
+        self.max_items = max_items
+
+        # Index state.
+        self._states = OrderedDict()
+
+    # ---------------------------------------------------------
+    #
+    def __len__(self) -> int:
+        """ Return number of tasks in the index. """
+        return len(self._states)
+
+    # ---------------------------------------------------------
+    #
+    def get(self, task_id: str) -> Optional[str]:
+        """ Return the in-flight state for the task, or None.
+
+        :param task_id: Task ID.
+        :return: Current task state.
+        """
+
+        if item := self._states.get(task_id):
+            state, updated = item
+
+            if time.monotonic() - updated < self.max_age:
+                return state
+
+        return None
+
+    # ---------------------------------------------------------
+    #
+    def update(self, task_id: str, state: str):
+        """ Update the task state (terminal states remove the task).
+
+        :param task_id: Task ID.
+        :param state: Current task state.
+        """
+        self._states.pop(task_id, None)
+
+        if state in states.READY_STATES or self.max_items <= 0:
+            return
+
+        if len(self._states) >= self.max_items:
+            self._states.popitem(last=False)
+
+        self._states[task_id] = (state, time.monotonic())
+
+
+# -----------------------------------------------------------------------------
+#
+class TaskEventConsumer:
+    """ This class consumes Celery task events in a background thread.
+
+    Every event updates the task state index (and an optional listener)
+    in the event loop thread, so the index is never shared between threads.
+
+    Tasks that are submitted in 'async' mode (aio-pika) send no task-sent
+    event, so they are missing from the index (and read from the backend)
+    until a worker has received them.
+    """
+
+    # ---------------------------------------------------------
+    #
+    def __init__(self, worker: Celery, index: TaskStateIndex,
+                 listener: Optional[Callable] = None):
+        """ The class initializer.
+
+        :param worker: Celery app that the events are received from.
+        :param index: Task state index to update.
+        :param listener: Optional callback for status changes (task_id, status).
+        """
+
+        # Unique parameters.
+        self.index = index
+        self.worker = worker
+        self.listener = listener
+
+        # Consumer state.
+        self._receiver = None
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # ---------------------------------------------------------
+    #
+    def _apply(self, task_id: str, state: str):
+        """ Update index and listener with a new task state.
+
+        :param task_id: Task ID.
+        :param state: Current task state.
+        """
+        self.index.update(task_id, state)
+
+        if self.listener and state not in states.READY_STATES:
+            self.listener(task_id, StatusResponseModel(status=state))
+
+    # ---------------------------------------------------------
+    #
+    def _on_event(self, event: dict):
+        """ Forward a received task event to the event loop.
+
+        :param event: Celery event.
+        """
+
+        if state := EVENT_STATES.get(event['type']):
+            self._loop.call_soon_threadsafe(self._apply, event['uuid'], state)
+
+    # ---------------------------------------------------------
+    #
+    def _capture(self):
+        """ Capture task events until stopped (reconnect on failures). """
+
+        while not self._stopped:
+            try:
+                with self.worker.connection_for_read() as connection:
+                    self._receiver = self.worker.events.Receiver(
+                        connection, handlers={'*': self._on_event})
+
+                    # The capture stops when stop() sets should_stop (checked
+                    # for every event), or times out when no events arrive.
+                    while not self._stopped:
+                        try:
+                            self._receiver.capture(limit=None, wakeup=False,
+                                                   timeout=CAPTURE_TIMEOUT)
+
+                        except socket.timeout:
+                            pass
+
+            except Exception as why:
+                logger.error(f'TASK EVENTS: {why}')
+                time.sleep(5)
+
+    # ---------------------------------------------------------
+    #
+    def start(self):
+        """ Start consuming task events (call from the running event loop). """
+        self._loop = asyncio.get_running_loop()
+        self._thread = threading.Thread(target=self._capture,
+                                        name='task-events', daemon=True)
+        self._thread.start()
+
+    # ---------------------------------------------------------
+    #
+    def stop(self):
+        """ Stop consuming task events. """
+        self._stopped = True
+
+        if self._receiver is not None:
+            self._receiver.should_stop = True
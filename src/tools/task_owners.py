@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 21:02:29
+     $Rev: 12
+"""
+
+# BUILTIN modules
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+# Third party modules
+from celery import Celery
+from pymongo import ASCENDING
+from fastapi.concurrency import run_in_threadpool
+
+
+# -----------------------------------------------------------------------------
+#
+class TaskOwners:
+    """ This class records the tenant that submitted each task.
+
+    A queued task has no result document yet, so the owner is recorded
+    when the task is submitted. The records are stored in the result
+    backend database, and a TTL index removes them together with the
+    task results (result_expires).
+    """
+
+    # ---------------------------------------------------------
+    #
+    def __init__(self, worker: Celery, collection: str = 'task_owners'):
+        """ The class initializer.
+
+        :param worker: Celery app with the MongoDB result backend.
+        :param collection: MongoDB collection name.
+        """
+
+        # Unique parameters.
+        self.worker = worker
+        self.collection_name = collection
+
+        # Store state.
+        self._collection = None
+
+    # ---------------------------------------------------------
+    #
+    @property
+    def collection(self):
+        """ Return the owner collection (the TTL index is created once). """
+
+        if self._collection is None:
+            expires = self.worker.conf.result_expires
+            collection = self.worker.backend.database[self.collection_name]
+            collection.create_index([('created', ASCENDING)],
+                                    expireAfterSeconds=int(expires.total_seconds()))
+            self._collection = collection
+
+        return self._collection
+
+    # ---------------------------------------------------------
+    #
+    async def record(self, task_ids: List[str], tenant: str, name: str):
+        """ Record the owner of submitted tasks.
+
+        :param task_ids: Submitted task IDs.
+        :param tenant: Name of the tenant that submitted the tasks.
+        :param name: Task name.
+        """
+        now = datetime.now(timezone.utc)
+        documents = [{'_id': task_id, 'tenant': tenant, 'name': name, 'created': now}
+                     for task_id in task_ids]
+
+        if documents:
+            await run_in_threadpool(self.collection.insert_many,
+                                    documents, ordered=False)
+
+    # ---------------------------------------------------------
+    #
+    def _owned(self, task_ids: List[str], tenant: Optional[str]) -> Dict[str, dict]:
+        """ Return the owner records of the tenant's tasks (blocking).
+
+        :param task_ids: Task IDs to look up.
+        :param tenant: Tenant name (None returns the tasks of all tenants).
+        :return: Owner record per known (and owned) task ID.
+        """
+        query = {'_id': {'$in': task_ids}}
+
+        if tenant is not None:
+            query['tenant'] = tenant
+
+        owned = {document['_id']: document for document in self.collection.find(query)}
+
+        # Tasks without an owner record (submitted before the records were
+        # introduced, or when the record write failed) are only found in the
+        # result backend, and only the tasks of all tenants include them.
+        if tenant is None and (missing := [task_id for task_id in task_ids
+                                           if task_id not in owned]):
+            documents = self.worker.backend.collection.find(
+                {'_id': {'$in': missing}, 'name': {'$ne': None}}, {'name': 1})
+            owned.update((document['_id'], document) for document in documents)
+
+        return owned
+
+    # ---------------------------------------------------------
+    #
+    async def owned(self, task_ids: List[str],
+                    tenant: Optional[str]) -> Dict[str, dict]:
+        """ Return the owner records of the tenant's tasks.
+
+        :param task_ids: Task IDs to look up.
+        :param tenant: Tenant name (None returns the tasks of all tenants).
+        :return: Owner record (or result backend document) per known,
+            and owned, task ID.
+        """
+        return await run_in_threadpool(self._owned, task_ids, tenant)
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 21:05:06
+     $Rev: 12
+"""
+
+# BUILTIN modules
+from typing import List, Optional, Sequence, Tuple
+
+# Third party modules
+from celery import Celery
+from celery.utils import uuid
+from kombu import Queue
+from kombu.serialization import dumps
+from kombu.exceptions import OperationalError
+from aio_pika import Message, DeliveryMode
+from aio_pika.exceptions import AMQPError
+
+# local modules
+from .rabbit_client import RabbitPublisher
+
+
+# -----------------------------------------------------------------------------
+#
+class TaskPublisher:
+    """ This class implements non-blocking Celery task publishing.
+
+    Task messages are created by Celery itself (protocol v2), so they are
+    wire compatible with the existing workers, but they are published
+    with the shared aio-pika publisher (long-lived connection, pool of
+    confirmed channels), so the asyncio event loop is never blocked by
+    broker I/O.
+    """
+
+    # ---------------------------------------------------------
+    #
+    def __init__(self, worker: Celery, publisher: RabbitPublisher):
+        """ The class initializer.
+
+        :param worker: Celery app used for message creation and routing.
+        :param publisher: Shared RabbitMQ publisher.
+        """
+
+        # Unique parameters.
+        self.worker = worker
+        self.publisher = publisher
+
+    # ---------------------------------------------------------
+    #
+    def _create_message(self, name: str, args: Sequence, task_id: Optional[str],
+                        options: dict) -> Tuple[Queue, Message]:
+        """ Return destination queue and Celery protocol v2 task message.
+
+        :param name: Registered Celery task name.
+        :param args: Task positional arguments.
+        :param task_id: Task ID (a new one is created when it's None).
+        :param options: Task execution options (queue, expires...).
+        :return: Destination queue and message.
+        """
+        task_id = task_id or uuid()
+        route = self.worker.amqp.router.route(options, name, args, {})
+        headers, properties, body, _ = self.worker.amqp.as_task_v2(
+            task_id, name, args, {}, expires=route.get('expires'))
+
+        content_type, content_encoding, data = dumps(
+            body, serializer=self.worker.conf.task_serializer)
+
+        # Text serializers (like json) return str, not bytes.
+        if isinstance(data, str):
+            data = data.encode(content_encoding)
+
+        message = Message(
+            body=data,
+            headers=headers,
+            correlation_id=task_id,
+            content_type=content_type,
+            priority=route.get('priority'),
+            content_encoding=content_encoding,
+            delivery_mode=DeliveryMode.PERSISTENT,
+            reply_to=properties['reply_to'] or None)
+
+        return route['queue'], message
+
+    # ---------------------------------------------------------
+    #
+    async def apply_async(self, name: str, args: Sequence,
+                          task_id: Optional[str] = None, **options) -> str:
+        """ Publish one task message asynchronously.
+
+        :param name: Registered Celery task name.
+        :param args: Task positional arguments.
+        :param task_id: Optional task ID (a new one is created by default).
+        :param options: Task execution options (queue, expires...).
+        :return: Published task ID.
+        :raise OperationalError: When the message can't be published.
+        """
+        return (await self._publish([self._create_message(name, args, task_id,
+                                                          options)]))[0]
+
+    # ---------------------------------------------------------
+    #
+    async def apply_many(self, name: str, args_list: List[Sequence],
+                         **options) -> List[str]:
+        """ Publish several task messages on one channel asynchronously.
+
+        Every task gets a new task ID, so a shared task_id option is rejected.
+
+        :param name: Registered Celery task name.
+        :param args_list: Task positional arguments, one item per task.
+        :param options: Task execution options shared by all tasks.
+        :return: Published task IDs, in the same order as args_list.
+        :raise ValueError: When the options contain a task_id.
+        :raise OperationalError: When the messages can't be published.
+        """
+
+        if 'task_id' in options:
+            raise ValueError('A shared task_id option would give every task the same ID')
+
+        return await self._publish([self._create_message(name, args, None, options)
+                                    for args in args_list])
+
+    # ---------------------------------------------------------
+    #
+    async def _publish(self, messages: List[Tuple[Queue, Message]]) -> List[str]:
+        """ Publish task messages on one channel.
+
+        :param messages: Destination queue and message per task.
+        :return: Published task IDs, in the same order as the messages.
+        :raise OperationalError: When the messages can't be published.
+        """
+
+        # Celery only uses direct exchanges here, and they are published
+        # through the default exchange using the queue name as routing key.
+        try:
+            for queue in {queue.name: queue for queue, _ in messages}.values():
+                await self.publisher.declare_queue(
+                    queue.name, durable=queue.durable, exclusive=queue.exclusive,
+                    auto_delete=queue.auto_delete, arguments=queue.queue_arguments)
+
+            await self.publisher.publish_many([(queue.name, message)
+                                               for queue, message in messages])
+
+        except (AMQPError, ConnectionError) as why:
+            raise OperationalError(why) from why
+
+        return [message.correlation_id for _, message in messages]
+
+    # ---------------------------------------------------------
+    #
+    async def close(self):
+        """ Close the shared RabbitMQ publisher. """
+        await self.publisher.close()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 20:42:17
+     $Rev: 12
+"""
+
+# BUILTIN modules
+from typing import Dict
+
+# Third party modules
+from celery import states
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from celery.exceptions import TaskRevokedError
+from fastapi.concurrency import run_in_threadpool
+
+# local modules
+from ..tasks import WORKER
+from .task_status import (STATE_INDEX, TERMINAL_STATES,
+                          get_task_statuses, invalidate_task_status)
+
+# Constants
+DUPLICATE_KEY = 11000
+""" MongoDB duplicate key error code. """
+REQUEST_FIELDS = ('args', 'kwargs', 'queue', 'worker', 'retries', 'children')
+""" Extended result fields that are read by the backend (besides the name). """
+
+
+# ---------------------------------------------------------
+#
+def _mark_revoked(tasks: Dict[str, str], reason: str):
+    """ Store the REVOKED state for unfinished tasks in the backend (blocking).
+
+    Tasks that have reached a terminal state meanwhile are not changed
+    (the upsert then fails with a duplicate key error, which is ignored).
+    A new document gets all the extended result fields that the backend
+    reads, the request fields that are unknown for a queued task are None.
+
+    :param tasks: Task name per revoked task ID.
+    :param reason: Revoke reason.
+    """
+    backend = WORKER.backend
+    result = backend.encode(backend.prepare_exception(TaskRevokedError(reason)))
+    fields = {'status': states.REVOKED, 'result': result,
+              'traceback': None, 'date_done': WORKER.now()}
+    requests = [UpdateOne({'_id': task_id, 'status': {'$nin': list(TERMINAL_STATES)}},
+                          {'$set': fields,
+                           '$setOnInsert': {**dict.fromkeys(REQUEST_FIELDS), 'name': name}},
+                          upsert=True)
+                for task_id, name in tasks.items()]
+
+    try:
+        backend.collection.bulk_write(requests, ordered=False)
+
+    except BulkWriteError as why:
+        if any(error['code'] != DUPLICATE_KEY
+               for error in why.details['writeErrors']):
+            raise
+
+
+# ---------------------------------------------------------
+#
+async def revoke_tasks(tasks: Dict[str, str], terminate: bool) -> Dict[str, str]:
+    """ Revoke unfinished tasks.
+
+    All revocations are sent to the workers in one broadcast message. A
+    worker drops a revoked task when it's received (including prefetched
+    tasks and pending retries), and with terminate the process executing
+    a running task is killed, which frees the worker slot immediately.
+
+    :param tasks: Task name per task ID to revoke (known submitted tasks).
+    :param terminate: Terminate running tasks as well.
+    :return: Task state per task ID (REVOKED, or the terminal state
+        for a task that has already finished).
+    :raise OperationalError: When the broadcast can't be sent.
+    """
+    current = await get_task_statuses(list(tasks), False)
+    result = {task_id: status.status for task_id, status in current.items()}
+
+    if revoked := [task_id for task_id, state in result.items()
+                   if state not in TERMINAL_STATES]:
+        await run_in_threadpool(WORKER.control.revoke, revoked,
+                                terminate=terminate, signal='SIGTERM')
+        await run_in_threadpool(_mark_revoked, {task_id: tasks[task_id]
+                                                for task_id in revoked},
+                                'revoked by client')
+
+        for task_id in revoked:
+            result[task_id] = states.REVOKED
+            STATE_INDEX.update(task_id, states.REVOKED)
+            invalidate_task_status(task_id)
+
+    return result
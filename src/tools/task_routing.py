@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 20:57:28
+     $Rev: 12
+"""
+
+# BUILTIN modules
+from itertools import count
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+# local modules
+from ..core.setup import DEFAULT_TENANT_NAME, TenantConfig
+
+# Constants
+LANE_QUEUES = {'high': 'processor.high', 'normal': None, 'bulk': 'processor.bulk'}
+""" Queue per priority lane (the normal lane uses the default/tenant queues). """
+SHORT_QUEUE = 'processor.short'
+""" Normal lane queue for tasks with a short expected runtime. """
+
+_shard_counters = defaultdict(count)
+""" Round-robin counter per tenant. """
+
+
+# ---------------------------------------------------------
+#
+def tenant_queue_names(tenant: TenantConfig) -> List[str]:
+    """ Return the queue names that belong to a tenant.
+
+    Each tenant gets one queue per weight unit. The workers consume all
+    queues round-robin, so a tenant with weight 3 gets three times the
+    worker capacity of a tenant with weight 1 when both have a backlog,
+    and one tenant can't starve the others by filling a shared queue.
+
+    :param tenant: Tenant configuration.
+    :return: Tenant queue names.
+    """
+    return [f'tenant.{tenant.name}.{idx}' for idx in range(tenant.weight)]
+
+
+# ---------------------------------------------------------
+#
+def all_tenant_queue_names(tenants: Dict[str, TenantConfig]) -> List[str]:
+    """ Return the queue names for all tenants.
+
+    :param tenants: Tenant configuration per API key.
+    :return: Tenant queue names.
+    """
+    return [name for tenant in tenants.values()
+            for name in tenant_queue_names(tenant)]
+
+
+# ---------------------------------------------------------
+#
+def tenant_queue(tenant: TenantConfig) -> Optional[str]:
+    """ Return the next queue (round-robin) for a tenant's task.
+
+    The default tenant (the shared service API key) uses the default queue.
+
+    :param tenant: Tenant configuration.
+    :return: Queue name, or None for the default queue.
+    """
+
+    if tenant.name == DEFAULT_TENANT_NAME:
+        return None
+
+    names = tenant_queue_names(tenant)
+    return names[next(_shard_counters[tenant.name]) % len(names)]
+
+
+# ---------------------------------------------------------
+#
+def lane_queue_names() -> List[str]:
+    """ Return the dedicated priority lane queue names.
+
+    :return: Priority lane queue names.
+    """
+    return [name for name in LANE_QUEUES.values() if name]
+
+
+# ---------------------------------------------------------
+#
+def select_queue(tenant: TenantConfig, priority: Optional[str] = None,
+                 short: bool = False) -> Optional[str]:
+    """ Return the queue for a task.
+
+    The high and bulk priority lanes are shared by all tenants, the
+    normal lane uses the short queue for short tasks, and the tenant
+    queues (or the default queue) for long tasks.
+
+    :param tenant: Tenant configuration.
+    :param priority: Requested priority lane (defaults to the tenant's).
+    :param short: The task is expected to finish quickly.
+    :return: Queue name, or None for the default queue.
+    """
+
+    if queue := LANE_QUEUES[priority or tenant.priority]:
+        return queue
+
+    if short:
+        return SHORT_QUEUE
+
+    return tenant_queue(tenant)
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 21:04:35
+     $Rev: 12
+"""
+
+# BUILTIN modules
+from typing import Any, Dict, List, Optional
+
+# Third party modules
+from celery import states
+from fastapi.concurrency import run_in_threadpool
+
+# local modules
+from src import config
+from ..tasks import WORKER, CLAIMS, EXPIRED, EXPIRED_REASON
+from .status_cache import StatusCache
+from .task_events import TaskStateIndex
+from ..api.models import StatusResponseModel
+
+# Constants
+TERMINAL_STATES = states.READY_STATES | {EXPIRED}
+""" Task states that never change again. """
+CACHE = StatusCache(config.status_cache_ttl, config.status_cache_max_bytes)
+""" In-process cache for terminal task states (key: task ID, traceback). """
+STATE_INDEX = TaskStateIndex(config.task_state_max_items,
+                             config.task_state_max_age)
+""" In-flight task states, updated by Celery task events (when enabled). """
+
+
+# ---------------------------------------------------------
+#
+def _cached_status(task_id: str,
+                   include_traceback: bool) -> Optional[StatusResponseModel]:
+    """ Return the task status from memory, or None when it's unknown.
+
+    :param task_id: Task ID.
+    :param include_traceback: Return the traceback for failed tasks.
+    :return: Task status response.
+    """
+
+    if state := STATE_INDEX.get(task_id):
+        return StatusResponseModel(status=state)
+
+    return CACHE.get((task_id, include_traceback))
+
+
+# ---------------------------------------------------------
+#
+def _cache_result(task_id: str, include_traceback: bool,
+                  status: StatusResponseModel):
+    """ Cache the task status when it has reached a terminal state.
+
+    :param task_id: Task ID.
+    :param include_traceback: The status includes the traceback.
+    :param status: Task status response.
+    """
+
+    if status.status in TERMINAL_STATES:
+        STATE_INDEX.update(task_id, status.status)
+        CACHE.put((task_id, include_traceback), status)
+
+
+# ---------------------------------------------------------
+#
+def invalidate_task_status(task_id: str):
+    """ Remove cached statuses for the task (used when it's resubmitted).
+
+    :param task_id: Task ID.
+    """
+    CACHE.invalidate((task_id, True), (task_id, False))
+
+
+# ---------------------------------------------------------
+#
+def _projection(include_traceback: bool) -> dict:
+    """ Return the MongoDB field projection for a status lookup.
+
+    The extended result fields (args, kwargs...) can be large, so only
+    the fields that are needed for a status response are fetched. The
+    result (and traceback) are only fetched for terminal states, using
+    a conditional projection (needs MongoDB 4.4 or later).
+
+    :param include_traceback: Fetch the traceback field as well.
+    :return: MongoDB projection.
+    """
+    terminal = {'$in': ['$status', sorted(TERMINAL_STATES)]}
+    fields = {'_id': 0, 'status': 1,
+              'result': {'$cond': [terminal, '$result', '$$REMOVE']}}
+
+    if include_traceback:
+        fields['traceback'] = {'$cond': [terminal, '$traceback', '$$REMOVE']}
+
+    return fields
+
+
+# ---------------------------------------------------------
+#
+def _expired(result: Any) -> bool:
+    """ Return True when a REVOKED task was dropped because it had expired.
+
+    :param result: Decoded task result (the revoke exception info).
+    """
+    message = result.get('exc_message') if isinstance(result, dict) else None
+    return message in (EXPIRED_REASON, [EXPIRED_REASON], (EXPIRED_REASON,))
+
+
+# ---------------------------------------------------------
+#
+def document_to_status(document: dict,
+                       include_traceback: bool) -> StatusResponseModel:
+    """ Return the status response for a projected backend document.
+
+    A SUCCESS state returns the task result (resolving a claim check
+    reference), other terminal states return the traceback, or the (small)
+    exception info when the traceback is excluded. Non-terminal states
+    only return the status. A task that Celery has stored as REVOKED
+    because it had expired is reported as EXPIRED.
+
+    :param document: Projected backend document.
+    :param include_traceback: Return the traceback for failed tasks.
+    :return: Task status response.
+    """
+    status = document['status']
+
+    if status not in TERMINAL_STATES:
+        return StatusResponseModel(status=status)
+
+    result = WORKER.backend.decode(document['result'])
+
+    if status == states.SUCCESS:
+        return StatusResponseModel(status=status, result=CLAIMS.resolve(result))
+
+    if status == states.REVOKED and _expired(result):
+        status = EXPIRED
+
+    if not include_traceback:
+        return StatusResponseModel(status=status, result=result)
+
+    return StatusResponseModel(status=status, result=document['traceback'])
+
+
+# ---------------------------------------------------------
+#
+def _find_task_status(task_id: str,
+                      include_traceback: bool) -> StatusResponseModel:
+    """ Return task status using one projected backend query (blocking).
+
+    A task that is not found in the backend is PENDING (the Celery
+    semantics for a queued task that hasn't been processed yet).
+
+    :param task_id: Task ID to check status for.
+    :param include_traceback: Return the traceback for failed tasks.
+    :return: Task status response.
+    """
+    document = WORKER.backend.collection.find_one(
+        {'_id': task_id}, _projection(include_traceback))
+
+    if document is None:
+        return StatusResponseModel(status=states.PENDING)
+
+    return document_to_status(document, include_traceback)
+
+
+# ---------------------------------------------------------
+#
+async def get_task_status(task_id: str,
+                          include_traceback: bool = True) -> StatusResponseModel:
+    """ Return task status without blocking the event loop.
+
+    In-flight states are served from the task event index and terminal
+    states from the in-process cache when possible.
+
+    :param task_id: Task ID to check status for.
+    :param include_traceback: Return the traceback for failed tasks.
+    :return: Task status response.
+    """
+
+    if status := _cached_status(task_id, include_traceback):
+        return status
+
+    status = await run_in_threadpool(_find_task_status, task_id,
+                                     include_traceback)
+    _cache_result(task_id, include_traceback, status)
+
+    return status
+
+
+# ---------------------------------------------------------
+#
+def _find_task_statuses(task_ids: List[str],
+                        include_traceback: bool) -> Dict[str, StatusResponseModel]:
+    """ Return status for several tasks using one $in query (blocking).
+
+    The query uses the unique _id index of the backend collection.
+
+    :param task_ids: Task IDs to check status for.
+    :param include_traceback: Return the traceback for failed tasks.
+    :return: Task status response per task ID.
+    """
+    projection = {**_projection(include_traceback), '_id': 1}
+    cursor = WORKER.backend.collection.find(
+        {'_id': {'$in': task_ids}}, projection)
+    found = {document['_id']: document_to_status(document, include_traceback)
+             for document in cursor}
+
+    return {task_id: found.get(task_id, StatusResponseModel(status=states.PENDING))
+            for task_id in task_ids}
+
+
+# ---------------------------------------------------------
+#
+async def get_task_statuses(
+        task_ids: List[str],
+        include_traceback: bool = True
+) -> Dict[str, StatusResponseModel]:
+    """ Return status for several tasks without blocking the event loop.
+
+    In-flight states are served from the task event index and terminal
+    states from the in-process cache when possible, only the remaining
+    task IDs are queried.
+
+    :param task_ids: Task IDs to check status for.
+    :param include_traceback: Return the traceback for failed tasks.
+    :return: Task status response per task ID.
+    """
+    result = {task_id: _cached_status(task_id, include_traceback)
+              for task_id in task_ids}
+
+    if missing := [task_id for task_id, status in result.items() if status is None]:
+        found = await run_in_threadpool(_find_task_statuses, missing,
+                                        include_traceback)
+
+        for task_id, status in found.items():
+            _cache_result(task_id, include_traceback, status)
+            result[task_id] = status
+
+    return result
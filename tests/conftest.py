@@ -7,14 +7,23 @@ VERSION INFO::
 
     $Repo: fastapi_celery
   $Author: Anders Wiklund
-    $Date: 2024-05-01 15:39:55
-     $Rev: 11
+    $Date: 2026-10-17 21:08:02
+     $Rev: 12
 """
 
+# BUILTIN modules
+import json
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+from collections import defaultdict
+from typing import Optional
+
 # Third party modules
 import pytest
 from loguru import logger
 from httpx import AsyncClient
+from pymongo.errors import DuplicateKeyError
 
 # Local program modules
 from ..src.main import app
@@ -40,3 +49,179 @@ async def test_app():
 
     async with AsyncClient(app=app, base_url="http://test") as client:
         yield client
+
+
+# -----------------------------------------------------------------------------
+#
+class FakePublisher:
+    """ RabbitMQ publisher stand-in, records declared queues and published messages. """
+
+    def __init__(self):
+        self.queues = {}
+        self.published = []
+
+    async def declare_queue(self, name: str, **arguments):
+        self.queues[name] = arguments
+
+    async def publish_many(self, messages: list):
+        self.published += messages
+
+
+# -----------------------------------------------------------------------------
+#
+class FakeMessage(SimpleNamespace):
+    """ Received RabbitMQ message stand-in, records how it's settled.
+
+    Settling yields to the event loop, like the real channel calls.
+    """
+
+    def __init__(self, body: bytes, settled: Optional[list] = None,
+                 redelivered: bool = False, **properties):
+        super().__init__(body=body, headers={}, content_type=None,
+                         content_encoding=None, processed=False,
+                         redelivered=redelivered,
+                         settled=[] if settled is None else settled)
+        self.__dict__.update(properties)
+
+    async def _settle(self, how: str, flag: bool):
+        await asyncio.sleep(0)
+        self.processed = True
+        self.settled.append((how, self.body, flag))
+
+    async def ack(self, multiple: bool = False):
+        await self._settle('ack', multiple)
+
+    async def nack(self, requeue: bool = True):
+        await self._settle('nack', requeue)
+
+    async def reject(self, requeue: bool = False):
+        await self._settle('reject', requeue)
+
+
+# ---------------------------------------------------------
+#
+def _matches(document: dict, query: dict) -> bool:
+    """ Return True when the document matches the (simple) MongoDB query. """
+    operators = {'$in': lambda value, arg: value in arg,
+                 '$ne': lambda value, arg: value != arg,
+                 '$lt': lambda value, arg: value is not None and value < arg,
+                 '$lte': lambda value, arg: value is not None and value <= arg}
+
+    for key, condition in query.items():
+        value = document.get(key)
+
+        if not isinstance(condition, dict):
+            if value != condition:
+                return False
+
+        elif '$exists' in condition:
+            if (key in document) != condition['$exists']:
+                return False
+
+        elif not all(operators[name](value, arg) for name, arg in condition.items()):
+            return False
+
+    return True
+
+
+# -----------------------------------------------------------------------------
+#
+class FakeCursor(list):
+    """ MongoDB cursor stand-in. """
+
+    def sort(self, key: str, _):
+        return FakeCursor(sorted(self, key=lambda document: document[key]))
+
+    def limit(self, count: int):
+        return FakeCursor(self[:count])
+
+
+# -----------------------------------------------------------------------------
+#
+class FakeCollection:
+    """ MongoDB collection stand-in (projections are ignored). """
+
+    def __init__(self):
+        self.indexes = []
+        self.documents = {}
+
+    def _find(self, query: dict) -> list:
+        return [document for document in self.documents.values()
+                if _matches(document, query)]
+
+    @staticmethod
+    def _update(document: dict, update: dict):
+        document.update(update.get('$set', {}))
+
+        for key in update.get('$unset', {}):
+            document.pop(key, None)
+
+    def create_index(self, keys: list, **options):
+        self.indexes.append((keys, options))
+
+    def insert_one(self, document: dict):
+        if document['_id'] in self.documents:
+            raise DuplicateKeyError('duplicate key')
+
+        self.documents[document['_id']] = dict(document)
+
+    def insert_many(self, documents: list, ordered: bool = True):
+        for document in documents:
+            self.insert_one(document)
+
+    def find(self, query: Optional[dict] = None, _projection: Optional[dict] = None):
+        return FakeCursor(dict(document) for document in self._find(query or {}))
+
+    def find_one(self, query: dict) -> Optional[dict]:
+        return next(iter(self.find(query)), None)
+
+    def find_one_and_update(self, query: dict, update: dict) -> Optional[dict]:
+        if documents := self._find(query):
+            before = dict(documents[0])
+            self._update(documents[0], update)
+            return before
+
+        return None
+
+    def update_one(self, query: dict, update: dict):
+        for document in self._find(query)[:1]:
+            self._update(document, update)
+
+    def update_many(self, query: dict, update: dict):
+        for document in self._find(query):
+            self._update(document, update)
+
+    def delete_one(self, query: dict):
+        for document in self._find(query)[:1]:
+            del self.documents[document['_id']]
+
+
+# ---------------------------------------------------------
+#
+@pytest.fixture
+def fake_publisher() -> FakePublisher:
+    """ RabbitMQ publisher stand-in. """
+
+    return FakePublisher()
+
+
+# ---------------------------------------------------------
+#
+@pytest.fixture
+def fake_message() -> type:
+    """ Received RabbitMQ message stand-in class. """
+
+    return FakeMessage
+
+
+# ---------------------------------------------------------
+#
+@pytest.fixture
+def fake_worker() -> SimpleNamespace:
+    """ Celery app stand-in, with an in-memory MongoDB result backend (json). """
+    database = defaultdict(FakeCollection)
+    backend = SimpleNamespace(database=database, decode=json.loads,
+                              collection=database['celery_taskmeta'])
+
+    return SimpleNamespace(backend=backend,
+                           conf=SimpleNamespace(result_expires=timedelta(days=1)))
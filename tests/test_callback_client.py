@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 21:08:02
+     $Rev: 12
+"""
+
+# BUILTIN modules
+import asyncio
+
+# Third party modules
+import pytest
+
+# local modules
+from src.tools import callback_client
+from src.tools.rabbit_client import RabbitPublisher
+from src.tools.callback_client import CallbackBatcher, CallbackClient
+
+
+# ---------------------------------------------------------
+#
+def new_client() -> CallbackClient:
+    """ Return a callback client (HTTP/1.1, small connection pool). """
+    return CallbackClient(RabbitPublisher('amqp://localhost'), timeout=5.0,
+                          http2=False, max_connections=10,
+                          host_connections=2, keepalive=5.0)
+
+
+# ---------------------------------------------------------
+#
+def test_persistent_loop():
+    """ Test that all callbacks run on the same loop, until it's closed. """
+    client = new_client()
+
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    loop = client.run(current_loop())
+
+    assert client.run(current_loop()) is loop
+    assert not client.client.is_closed
+
+    http_client = client.client
+    client.close()
+
+    assert http_client.is_closed
+    assert loop.is_closed()
+
+
+# ---------------------------------------------------------
+#
+def test_reset_after_fork():
+    """ Test that a reset client starts its own loop instead of the parent's. """
+    client = new_client()
+    client.start()
+    parent_loop = client._loop
+    client.publisher._declared.add('callbacks')
+
+    # A forked child only has a copy of the parent's state, without its thread.
+    client.reset()
+
+    assert client._loop is None and client.client is None
+    assert not client.publisher._declared
+
+    client.start()
+
+    assert client._loop is not parent_loop
+    client.close()
+    parent_loop.call_soon_threadsafe(parent_loop.stop)
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_batched_responses(monkeypatch):
+    """ Test that responses are sent as batches per destination. """
+    sent = []
+
+    async def post_response(url: str, result: list):
+        sent.append((url, result))
+
+    monkeypatch.setattr(callback_client, 'post_response', post_response)
+    batcher = CallbackBatcher(max_items=2, window=0.05)
+    url = 'http://localhost/v1/response'
+
+    await asyncio.gather(*[batcher.send('url', url, {'job_id': idx})
+                           for idx in range(3)])
+
+    assert sent == [(url, [{'job_id': 0}, {'job_id': 1}]),
+                    (url, [{'job_id': 2}])]
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_batch_unexpected_error(monkeypatch):
+    """ Test that an unexpected batch error is reported to all senders. """
+
+    async def post_response(url: str, result: list):
+        raise TypeError('not serializable')
+
+    monkeypatch.setattr(callback_client, 'post_response', post_response)
+    batcher = CallbackBatcher(max_items=2, window=0.05)
+    results = await asyncio.wait_for(asyncio.gather(
+        *[batcher.send('url', 'http://localhost/cb', {'job_id': idx})
+          for idx in range(2)], return_exceptions=True), timeout=1.0)
+
+    assert all(isinstance(result, TypeError) for result in results)
+    assert not batcher._tasks
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 21:08:02
+     $Rev: 12
+"""
+
+# BUILTIN modules
+import json
+
+# Third party modules
+import pytest
+
+# local modules
+from src.tools import callback_outbox
+from src.tools.callback_client import CallbackError
+from src.tools.callback_outbox import CallbackOutbox, DEAD_QUEUE, OUTBOX_QUEUE
+
+# Constants
+BODY = {'params': {'callbackUrl': 'http://localhost/cb', 'callbackQueue': None},
+        'response': {'job_id': '1', 'status': 'SUCCESS', 'result': {}}}
+""" Outbox message body. """
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_retry_backoff_and_dead_letter(fake_publisher):
+    """ Test exponential retry delays and dead-lettering. """
+    outbox = CallbackOutbox(fake_publisher, 'amqp://localhost', concurrency=1,
+                            max_attempts=3, backoff=2.0)
+
+    await outbox._retry(BODY, 1, CallbackError('timeout'))
+    await outbox._retry(BODY, 2, CallbackError('timeout'))
+    await outbox._retry(BODY, 3, CallbackError('timeout'))
+    await outbox._retry(BODY, 1, CallbackError('not found', retry=False))
+
+    assert [queue for queue, _ in fake_publisher.published] == [
+        'callbacks.retry.2000ms', 'callbacks.retry.4000ms', DEAD_QUEUE, DEAD_QUEUE]
+    assert fake_publisher.queues['callbacks.retry.2000ms']['arguments'] == {
+        'x-message-ttl': 2000, 'x-dead-letter-exchange': '',
+        'x-dead-letter-routing-key': OUTBOX_QUEUE}
+    assert fake_publisher.queues['callbacks.retry.4000ms']['arguments']['x-message-ttl'] == 4000
+    assert fake_publisher.published[2][1].headers['x-attempt'] == 3
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_unexpected_errors_settle_the_message(monkeypatch, fake_publisher,
+                                                   fake_message):
+    """ Test that malformed messages and unexpected errors never stall the outbox. """
+    outbox = CallbackOutbox(fake_publisher, 'amqp://localhost', concurrency=1,
+                            max_attempts=3, backoff=2.0)
+
+    async def deliver_response(params: dict, response: dict):
+        raise RuntimeError('unexpected')
+
+    monkeypatch.setattr(callback_outbox, 'deliver_response', deliver_response)
+    malformed, failing = fake_message(b'{not json'), fake_message(json.dumps(BODY).encode())
+    await outbox._handle(malformed)
+    await outbox._handle(failing)
+
+    assert malformed.settled == [('reject', malformed.body, False)]
+    assert failing.settled == [('ack', failing.body, False)]
+    assert [queue for queue, _ in fake_publisher.published] == [DEAD_QUEUE]
+    assert 'unexpected' in fake_publisher.published[0][1].headers['x-error']
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_failed_retry_is_requeued_later(monkeypatch, fake_publisher, fake_message):
+    """ Test that a message that can't be moved is requeued after a delay. """
+    delays = []
+    outbox = CallbackOutbox(fake_publisher, 'amqp://localhost', concurrency=1,
+                            max_attempts=3, backoff=2.0)
+
+    async def deliver_response(params: dict, response: dict):
+        raise CallbackError('timeout')
+
+    async def publish_many(messages: list):
+        raise ConnectionError('broker is down')
+
+    async def sleep(delay: float):
+        delays.append(delay)
+
+    monkeypatch.setattr(callback_outbox, 'deliver_response', deliver_response)
+    monkeypatch.setattr(callback_outbox.asyncio, 'sleep', sleep)
+    monkeypatch.setattr(fake_publisher, 'publish_many', publish_many)
+    message = fake_message(json.dumps(BODY).encode())
+    await outbox._handle(message)
+
+    assert message.settled == [('nack', message.body, True)]
+    assert delays[0] == 2.0
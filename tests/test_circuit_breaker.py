@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 20:56:03
+     $Rev: 12
+"""
+
+# Third party modules
+import pytest
+
+# local modules
+from src.tools.circuit_breaker import CircuitBreaker, LocalBreakerStore
+
+# Constants
+HOST = 'http://localhost:8001/'
+""" Callback destination. """
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_circuit_opens_and_recovers():
+    """ Test open, half-open trial and close transitions. """
+    breaker = CircuitBreaker(LocalBreakerStore(), failure_rate=0.5,
+                             min_requests=4, window=30, open_seconds=10)
+
+    for now in (1, 2, 3):
+        assert await breaker.allow(HOST, now)
+        await breaker.record(HOST, False, now)
+
+    assert await breaker.allow(HOST, 4)
+    await breaker.record(HOST, True, 4)
+
+    # 3 failures of 4 requests opens the circuit.
+    assert not await breaker.allow(HOST, 5)
+    assert not await breaker.allow(HOST, 13)
+
+    # Only one half-open trial, a failed trial opens the circuit again.
+    assert await breaker.allow(HOST, 15)
+    assert not await breaker.allow(HOST, 15)
+    await breaker.record(HOST, False, 16)
+    assert not await breaker.allow(HOST, 20)
+
+    # A successful trial closes the circuit.
+    assert await breaker.allow(HOST, 27)
+    await breaker.record(HOST, True, 27)
+    assert await breaker.allow(HOST, 28)
+    assert await breaker.allow('http://other:8001/', 28)
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_cached_closed_state():
+    """ Test that a closed state is read from the store once per TTL. """
+    store = LocalBreakerStore()
+    reads = []
+    get_state = store.get_state
+
+    async def counted_get_state(key: str):
+        reads.append(key)
+        return await get_state(key)
+
+    store.get_state = counted_get_state
+    breaker = CircuitBreaker(store, failure_rate=0.5, min_requests=2,
+                             window=30, open_seconds=10, state_ttl=1.0)
+
+    assert await breaker.allow(HOST, 1)
+    await breaker.record(HOST, True, 1.5)
+    assert await breaker.allow(HOST, 1.9)
+    assert len(reads) == 1
+
+    # Opening the circuit drops the cached closed state.
+    await breaker.record(HOST, False, 2.5)
+    await breaker.record(HOST, False, 2.6)
+    assert not await breaker.allow(HOST, 2.7)
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_store_failure_allows_requests():
+    """ Test that a failing store never fails (or blocks) a request. """
+    store = LocalBreakerStore()
+
+    async def failing(*_):
+        raise ConnectionError('store down')
+
+    store.get_state = store.count = failing
+    breaker = CircuitBreaker(store, failure_rate=0.5, min_requests=1,
+                             window=30, open_seconds=10)
+
+    assert await breaker.allow(HOST, 1)
+    await breaker.record(HOST, False, 1)
+    assert await breaker.allow(HOST, 2)
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 20:54:24
+     $Rev: 12
+"""
+
+# BUILTIN modules
+import os
+import time
+
+# Third party modules
+import pytest
+
+# local modules
+from src.tools.claim_check import CLAIM_KEY, ClaimCheck
+
+
+# ---------------------------------------------------------
+#
+def test_offload_and_resolve(tmp_path):
+    """ Test that only large values are replaced by a reference. """
+    claims = ClaimCheck('filesystem', 100, str(tmp_path), None)
+    small, large = {'text': 'short'}, {'text': 'x' * 200}
+    reference = claims.offload(large)
+
+    assert claims.offload(small) == small
+    assert claims.is_claim(reference) and not claims.is_claim(large)
+    assert set(reference) == {CLAIM_KEY, 'size'}
+    assert claims.resolve(reference) == large
+    assert claims.resolve(small) == small
+
+
+# ---------------------------------------------------------
+#
+def test_disabled(tmp_path):
+    """ Test that a zero threshold never offloads values. """
+    claims = ClaimCheck('filesystem', 0, str(tmp_path), None)
+    value = {'text': 'x' * 200}
+
+    assert claims.offload(value) is value
+
+
+# ---------------------------------------------------------
+#
+def test_purge(tmp_path):
+    """ Test that only expired values are purged. """
+    claims = ClaimCheck('filesystem', 10, str(tmp_path), None)
+    old = claims.offload({'text': 'x' * 20})
+    new = claims.offload({'text': 'y' * 20})
+    stale = time.time() - 7200
+    os.utime(tmp_path / old[CLAIM_KEY], (stale, stale))
+
+    assert claims.purge(3600) == 1
+    assert claims.resolve(new) == {'text': 'y' * 20}
+    assert not (tmp_path / old[CLAIM_KEY]).exists()
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.parametrize('ref', ['../secret', '/etc/passwd', 'a' * 31, 'A' * 32, 42])
+def test_invalid_file_reference(tmp_path, ref):
+    """ Test that only generated references are read from the blob directory. """
+    claims = ClaimCheck('filesystem', 10, str(tmp_path / 'claims'), None)
+    (tmp_path / 'secret').write_text('{"secret": 1}')
+
+    with pytest.raises(ValueError):
+        claims.resolve({CLAIM_KEY: ref})
@@ -11,8 +11,13 @@ VERSION INFO::
      $Rev: 7
 """
 
+# Third party modules
+import pytest
+from pydantic import ValidationError
+
 # local modules
 from src import CommonConfig, DockerLocal, DockerProd
+from src.core import celery_config
 
 
 # ---------------------------------------------------------
@@ -49,3 +54,25 @@ def test_prod_config():
     assert conf.log_diagnose is False
     assert conf.flower_host == 'dashboard'
     assert conf.hdr_data['X-API-Key'] == conf.service_api_key
+
+
+# ---------------------------------------------------------
+#
+def test_worker_profiles():
+    """ Test that the high, normal and bulk profiles consume every queue. """
+    profiles = celery_config.WORKER_PROFILES
+    consumed = {queue for name in ('high', 'normal', 'bulk')
+                for queue in profiles[name]['queues']}
+
+    assert consumed == set(profiles['all']['queues'])
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.parametrize('names', [['acme', 'acme'], ['acme', 'default']])
+def test_invalid_tenant_names(names: list):
+    """ Test that duplicate and reserved tenant names are rejected. """
+    tenants = {f'key{idx}': {'name': name} for idx, name in enumerate(names)}
+
+    with pytest.raises(ValidationError):
+        CommonConfig(api_tenants=tenants)
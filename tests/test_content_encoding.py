@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 21:08:02
+     $Rev: 12
+"""
+
+# BUILTIN modules
+import json
+
+# Third party modules
+import pytest
+
+# local modules
+from src.tools.rabbit_client import RabbitClient, RabbitPublisher
+from src.tools.content_encoding import compress, decompress, select_encoding
+
+
+# ---------------------------------------------------------
+#
+def test_compress_threshold():
+    """ Test that only bodies above the threshold are compressed. """
+    small, large = b'{"a": 1}', json.dumps({'data': 'x' * 1000}).encode()
+
+    assert compress(small, 'gzip', 100) == (small, None)
+    assert compress(large, None, 100) == (large, None)
+
+    body, encoding = compress(large, 'gzip', 100)
+
+    assert encoding == 'gzip' and len(body) < len(large)
+    assert decompress(body, encoding) == large
+    assert decompress(large, 'utf-8') == large
+    assert select_encoding('off') is None
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_transparent_decompression(fake_message):
+    """ Test that a compressed RabbitMQ message is decompressed when received. """
+    received = []
+
+    async def handler(message: dict):
+        received.append(message)
+
+    content = {'status': 'SUCCESS', 'result': 'x' * 1000}
+    message = RabbitPublisher('amqp://localhost', compression='gzip',
+                              threshold=100).create_message(content)
+    incoming = fake_message(message.body, content_type=message.content_type,
+                            content_encoding=message.content_encoding)
+
+    await RabbitClient('amqp://localhost', 'test', handler) \
+        ._process_incoming_message(incoming)
+
+    assert message.content_encoding == 'gzip'
+    assert received == [content]
+    assert incoming.settled == [('ack', message.body, False)]
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 21:08:02
+     $Rev: 12
+"""
+
+# BUILTIN modules
+import json
+
+# Third party modules
+import pytest
+from celery import states
+
+# local modules
+from src.tools import failed_tasks
+from src.tools.failed_tasks import (find_failed_tasks, claim_failed_tasks,
+                                    release_failed_tasks)
+
+
+# ---------------------------------------------------------
+#
+@pytest.fixture
+def collection(monkeypatch, fake_worker):
+    """ Failed task documents in a fake result backend. """
+    collection = fake_worker.backend.collection
+    collection.insert_many(
+        [{'_id': f'id{idx}', 'status': states.FAILURE, 'name': 'tasks.processor',
+          'args': [{}, {}], 'date_done': idx,
+          'result': json.dumps({'exc_type': error, 'exc_message': ['x']})}
+         for idx, error in enumerate(['ValueError', 'KeyError', 'ValueError'])])
+    collection.documents['id1']['result'] = b'\x93not json'
+    monkeypatch.setattr(failed_tasks, 'WORKER', fake_worker)
+    return collection
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_error_type_filter(collection):
+    """ Test that the exception type is matched after decoding the result. """
+    failed = await find_failed_tasks(error_type='ValueError')
+
+    assert [document['_id'] for document in failed] == ['id0', 'id2']
+    assert 'result' not in failed[0]
+    assert len(await find_failed_tasks(error_type='ValueError', max_count=1)) == 1
+    assert len(await find_failed_tasks()) == 3
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_claim_failed_tasks(collection):
+    """ Test that concurrent retries never claim the same failed task. """
+    first, claimed = await claim_failed_tasks(['id0', 'id1'])
+    _, others = await claim_failed_tasks(['id0', 'id1', 'id2'])
+
+    assert claimed == ['id0', 'id1']
+    assert others == ['id2']
+    assert await find_failed_tasks() == []
+
+    await release_failed_tasks(first)
+
+    assert [document['_id'] for document in await find_failed_tasks()] == ['id0', 'id1']
@@ -33,3 +33,5 @@ async def test_health(test_app: AsyncClient):
     else:
         assert response.status_code == 500
         assert response.json()['status'] is False
+
+    assert set(response.json()['status_cache']) == {'hits', 'misses', 'items', 'bytes'}
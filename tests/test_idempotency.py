@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 21:08:02
+     $Rev: 12
+"""
+
+# BUILTIN modules
+from datetime import timedelta
+
+# Third party modules
+import pytest
+
+# local modules
+from src.tools.idempotency import IdempotencyStore
+
+
+# ---------------------------------------------------------
+#
+@pytest.fixture
+def keys(fake_worker) -> IdempotencyStore:
+    """ Idempotency store (60 second window) with a fake key collection. """
+
+    return IdempotencyStore(fake_worker, 60.0, cache_size=10)
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_claim_and_release(keys: IdempotencyStore):
+    """ Test that a key is owned by the first task until it's released. """
+
+    assert await keys.claim('t:k', 'task-1') is None
+    assert await keys.claim('t:k', 'task-2') == 'task-1'
+
+    await keys.release('t:k', 'task-1')
+
+    assert await keys.claim('t:k', 'task-2') is None
+    assert keys._claim('t:k', 'task-3')['task_id'] == 'task-2'
+    assert keys.collection.indexes == [([('expires', 1)], {'expireAfterSeconds': 0})]
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_only_sent_tasks_are_cached(keys: IdempotencyStore):
+    """ Test that a key is only cached when its task has been sent.
+
+    Another process can release a key that isn't confirmed yet.
+    """
+
+    assert await keys.claim('t:k', 'task-1') is None
+    assert await keys.claim('t:k', 'task-2') == 'task-1'
+    assert not keys._recent
+
+    await keys.release('t:k', 'task-1')
+
+    assert await keys.claim('t:k', 'task-2') is None
+
+    await keys.confirm('t:k', 'task-2')
+    keys.collection.documents.clear()
+
+    assert await keys.claim('t:k', 'task-3') == 'task-2'
+
+
+# ---------------------------------------------------------
+#
+def test_claim_expired_or_released_key(keys: IdempotencyStore, monkeypatch):
+    """ Test that expired, and concurrently released, keys are claimed again. """
+    collection = keys.collection
+    keys._claim('t:k', 'task-1')
+    collection.documents['t:k']['expires'] -= timedelta(seconds=61)
+
+    assert keys._claim('t:k', 'task-2') is None
+    assert collection.documents['t:k']['task_id'] == 'task-2'
+
+    # Simulate a key that is released between the insert and the read.
+    def released(query: dict):
+        collection.documents.pop(query['_id'], None)
+        monkeypatch.undo()
+
+    monkeypatch.setattr(collection, 'find_one', released)
+
+    assert keys._claim('t:k', 'task-3') is None
+    assert collection.documents['t:k']['task_id'] == 'task-3'
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 21:03:16
+     $Rev: 12
+"""
+
+# BUILTIN modules
+from datetime import datetime, timezone
+
+# Third party modules
+import pytest
+from kombu.serialization import dumps, loads
+
+# local modules
+from src.tools.message_codecs import CODECS, decode, encode, select_codec
+
+# Constants
+MESSAGE = {'job_id': 'a1', 'status': 'SUCCESS', 'result': {'text': 'åäö', 'n': [1, 2.5]}}
+""" Test message content. """
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.parametrize('name', list(CODECS))
+def test_codec_roundtrip(name: str):
+    """ Test that every available codec decodes what it encodes. """
+    body, content_type = encode(MESSAGE, name)
+
+    assert decode(body, content_type) == MESSAGE
+
+
+# ---------------------------------------------------------
+#
+def test_json_fallback():
+    """ Test that unknown codecs and content types fall back to json. """
+    body, content_type = encode(MESSAGE, select_codec('unknown'))
+
+    assert content_type == 'application/json'
+    assert decode(body, None) == MESSAGE
+
+
+# ---------------------------------------------------------
+#
+def test_kombu_serializer():
+    """ Test that orjson messages are accepted by json only consumers. """
+    pytest.importorskip('orjson')
+    content_type, content_encoding, data = dumps(MESSAGE, serializer='orjson')
+
+    assert content_type == CODECS['orjson'].content_type == 'application/json'
+    assert loads(data, content_type, content_encoding,
+                 accept=['application/json']) == MESSAGE
+
+    # Published json is still produced (and decoded) by kombu's json
+    # serializer, which restores the kombu encoded types.
+    stamp = {'at': datetime(2026, 10, 17, tzinfo=timezone.utc)}
+    assert dumps(MESSAGE, serializer='json')[0] == 'application/json'
+    assert loads(dumps(stamp, serializer='json')[2], 'application/json', 'utf-8') == stamp
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 20:57:28
+     $Rev: 12
+"""
+
+# BUILTIN modules
+from uuid import uuid4
+
+# Third party modules
+import pytest
+from httpx import AsyncClient
+
+# Local program modules
+from src import config
+
+# Constants
+HEADERS = {'X-API-Key': config.service_api_key}
+""" Valid authentication header. """
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_batch_both_callbacks(test_app: AsyncClient):
+    """ Test that a batch item can't have both callback arguments.
+
+    :param test_app: TestClient instance.
+    """
+    items = [{'payload': {'value': 1},
+              'callback_url': 'http://localhost:8001/v1/response',
+              'callback_queue': 'CallerService'}]
+    response = await test_app.post("/v1/process/batch",
+                                   json=items, headers=HEADERS)
+
+    assert response.status_code == 406
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_batched_callback_needs_outbox(test_app: AsyncClient, monkeypatch):
+    """ Test that batched callbacks are rejected with inline callback delivery.
+
+    :param test_app: TestClient instance.
+    """
+    monkeypatch.setattr(config, 'callback_delivery', 'inline')
+    query = {'callback_url': 'http://localhost:8001/v1/response',
+             'callback_batch': True}
+    response = await test_app.post("/v1/process", params=query,
+                                   json={'value': 1}, headers=HEADERS)
+
+    assert response.status_code == 406
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_batch_too_large(test_app: AsyncClient):
+    """ Test that an oversized batch is rejected.
+
+    :param test_app: TestClient instance.
+    """
+    items = [{'payload': {'value': idx}}
+             for idx in range(config.max_batch_size + 1)]
+    response = await test_app.post("/v1/process/batch",
+                                   json=items, headers=HEADERS)
+
+    assert response.status_code == 413
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_batch_empty(test_app: AsyncClient):
+    """ Test that an empty batch is rejected.
+
+    :param test_app: TestClient instance.
+    """
+    response = await test_app.post("/v1/process/batch",
+                                   json=[], headers=HEADERS)
+
+    assert response.status_code == 406
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_bulk_status_too_many(test_app: AsyncClient):
+    """ Test that a bulk status query with too many task IDs is rejected.
+
+    :param test_app: TestClient instance.
+    """
+    ids = [str(uuid4()) for _ in range(config.max_status_ids + 1)]
+    response = await test_app.post("/v1/process/status",
+                                   json=ids, headers=HEADERS)
+
+    assert response.status_code == 413
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_bulk_retry_too_many(test_app: AsyncClient):
+    """ Test that a bulk retry with a too large max_count is rejected.
+
+    :param test_app: TestClient instance.
+    """
+    filters = {'max_count': config.max_retry_count + 1}
+    response = await test_app.post("/v1/process/retry",
+                                   json=filters, headers=HEADERS)
+
+    assert response.status_code == 413
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_bulk_revoke_too_many(test_app: AsyncClient):
+    """ Test that a bulk revoke with too many task IDs is rejected.
+
+    :param test_app: TestClient instance.
+    """
+    ids = [str(uuid4()) for _ in range(config.max_status_ids + 1)]
+    response = await test_app.post("/v1/process/revoke",
+                                   json=ids, headers=HEADERS)
+
+    assert response.status_code == 413
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_process_ttl_and_deadline(test_app: AsyncClient):
+    """ Test that a payload with both ttl and deadline is rejected.
+
+    :param test_app: TestClient instance.
+    """
+    params = {'ttl': 60, 'deadline': '2026-10-17T12:00:00Z'}
+    response = await test_app.post("/v1/process", params=params,
+                                   json={'a': 1}, headers=HEADERS)
+
+    assert response.status_code == 406
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 21:08:02
+     $Rev: 12
+"""
+
+# BUILTIN modules
+import json
+import asyncio
+
+# Third party modules
+import pytest
+
+# local modules
+from src.tools.rabbit_client import RabbitClient
+
+
+# ---------------------------------------------------------
+#
+def body(idx: int) -> bytes:
+    """ Return a received message body. """
+    return json.dumps({'idx': idx}).encode()
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_bounded_concurrency(fake_message):
+    """ Test that received messages are handled concurrently, within the limit. """
+    active, peak, settled = 0, 0, []
+
+    async def handler(message: dict):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+
+    client = RabbitClient('amqp://localhost', 'test', handler, concurrency=3)
+    client._slots = asyncio.Semaphore(client.concurrency)
+    await asyncio.gather(*[client._dispatch(fake_message(body(idx), settled))
+                           for idx in range(10)])
+
+    assert client.prefetch == 3
+    assert peak == 3
+    assert sorted(settled) == [('ack', body(idx), False) for idx in range(10)]
+    assert not client._inflight
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_batch_acknowledgement(fake_message):
+    """ Test that a batch is acked at once, and failed messages are nacked. """
+    received, settled = [], []
+
+    async def handler(messages: list) -> list:
+        received.append(messages)
+        return [idx for idx, message in enumerate(messages) if message['idx'] % 2]
+
+    client = RabbitClient('amqp://localhost', 'test', handler,
+                          batch_size=3, batch_window=0.01)
+    client._batch_lock = asyncio.Lock()
+    batch = [fake_message(body(0), settled),
+             fake_message(body(1), settled, redelivered=True),
+             fake_message(b'not json', settled),
+             fake_message(body(3), settled)]
+
+    for message in batch[:2]:
+        await client._collect(message)
+
+    await asyncio.sleep(0.05)
+    await asyncio.gather(*client._inflight)
+
+    assert received == [[{'idx': 0}, {'idx': 1}]]
+    assert settled == [('nack', body(1), False), ('ack', body(0), True)]
+
+    settled.clear()
+    await client._process_incoming_batch(batch[2:])
+
+    assert settled == [('reject', b'not json', False),
+                       ('nack', body(3), True)]
+    assert client.prefetch == 6
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_batches_are_handled_in_order(fake_message):
+    """ Test that a batch with an undecodable message isn't overtaken. """
+    received, settled = [], []
+
+    async def handler(messages: list) -> list:
+        received.append(messages)
+        return []
+
+    client = RabbitClient('amqp://localhost', 'test', handler,
+                          batch_size=2, batch_window=1.0)
+    client._batch_lock = asyncio.Lock()
+
+    for message in [fake_message(b'not json', settled),
+                    fake_message(body(0), settled),
+                    fake_message(body(1), settled)]:
+        await client._collect(message)
+
+    client._flush()
+    await asyncio.gather(*client._inflight)
+
+    assert received == [[{'idx': 0}], [{'idx': 1}]]
+    assert settled == [('reject', b'not json', False),
+                       ('ack', body(0), True), ('ack', body(1), True)]
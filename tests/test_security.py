@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 20:57:28
+     $Rev: 12
+"""
+
+# local modules
+from src.core.setup import TenantConfig
+from src.tools.security import TokenBucket, owns_task, DEFAULT_TENANT
+from src.tools.task_routing import select_queue, tenant_queue, tenant_queue_names
+
+
+# ---------------------------------------------------------
+#
+def test_token_bucket():
+    """ Test that the bucket allows a burst and then rate limits. """
+    bucket = TokenBucket(rate=0.5, burst=2)
+
+    assert bucket.take() is None
+    assert bucket.take() is None
+    assert bucket.take() == 2
+
+
+# ---------------------------------------------------------
+#
+def test_token_bucket_count():
+    """ Test that a batch takes one token per task, and can leave a debt. """
+    bucket = TokenBucket(rate=1.0, burst=10)
+
+    assert bucket.take(8) is None
+    assert bucket.take(5) == 3
+
+    # A batch above the capacity is taken from a full bucket.
+    bucket.tokens = 10
+    assert bucket.take(25) is None
+    assert bucket.take() == 16
+
+
+# ---------------------------------------------------------
+#
+def test_owns_task():
+    """ Test that tenants only own their tasks, and the service key owns all. """
+    acme = TenantConfig(name='acme')
+    args = ({'data': 1}, {'callbackUrl': None, 'tenant': 'acme'})
+
+    assert owns_task(acme, args)
+    assert not owns_task(TenantConfig(name='other'), args)
+    assert not owns_task(acme, ({'data': 1}, {'callbackUrl': None}))
+    assert owns_task(DEFAULT_TENANT, args)
+
+
+# ---------------------------------------------------------
+#
+def test_tenant_queues():
+    """ Test weighted tenant queues and round-robin queue selection. """
+    tenant = TenantConfig(name='acme', weight=2)
+
+    assert tenant_queue_names(tenant) == ['tenant.acme.0', 'tenant.acme.1']
+    assert {tenant_queue(tenant) for _ in range(4)} == set(tenant_queue_names(tenant))
+    assert tenant_queue(DEFAULT_TENANT) is None
+
+
+# ---------------------------------------------------------
+#
+def test_select_queue_priority_lanes():
+    """ Test that the high and bulk lanes override the tenant queues. """
+    tenant = TenantConfig(name='acme', weight=1, priority='bulk')
+
+    assert select_queue(tenant) == 'processor.bulk'
+    assert select_queue(tenant, 'high') == 'processor.high'
+    assert select_queue(tenant, 'normal') == 'tenant.acme.0'
+    assert select_queue(DEFAULT_TENANT, 'normal') is None
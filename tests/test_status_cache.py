@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 20:02:34
+     $Rev: 12
+"""
+
+# local modules
+from src.tools import status_cache
+from src.tools.status_cache import StatusCache
+from src.api.models import StatusResponseModel
+
+# Constants
+SUCCESS = StatusResponseModel(status='SUCCESS', result={'message': 'Done'})
+""" Cached test value. """
+SIZE = len(SUCCESS.model_dump_json())
+""" Cached test value size. """
+
+
+# ---------------------------------------------------------
+#
+def test_cache_hit_and_miss():
+    """ Test cache counters. """
+    cache = StatusCache(ttl=60, max_bytes=1024)
+    cache.put('a', SUCCESS)
+
+    assert cache.get('a') == SUCCESS
+    assert cache.get('b') is None
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'items': 1, 'bytes': SIZE}
+
+
+# ---------------------------------------------------------
+#
+def test_cache_expiry(monkeypatch):
+    """ Test that expired entries are removed. """
+    cache = StatusCache(ttl=60, max_bytes=1024)
+    cache.put('a', SUCCESS)
+    now = status_cache.time.monotonic() + 61
+    monkeypatch.setattr(status_cache.time, 'monotonic', lambda: now)
+
+    assert cache.get('a') is None
+    assert cache.size == 0
+
+
+# ---------------------------------------------------------
+#
+def test_cache_lru_eviction():
+    """ Test that the least recently used entry is evicted. """
+    cache = StatusCache(ttl=60, max_bytes=2 * SIZE)
+    cache.put('a', SUCCESS)
+    cache.put('b', SUCCESS)
+    cache.get('a')
+    cache.put('c', SUCCESS)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == SUCCESS
+    assert cache.get('c') == SUCCESS
+    assert cache.size == 2 * SIZE
+
+
+# ---------------------------------------------------------
+#
+def test_cache_invalidate_and_disabled():
+    """ Test invalidation and a disabled cache. """
+    cache = StatusCache(ttl=60, max_bytes=1024)
+    cache.put('a', SUCCESS)
+    cache.invalidate('a', 'b')
+
+    assert cache.get('a') is None
+    assert cache.size == 0
+
+    disabled = StatusCache(ttl=0, max_bytes=1024)
+    disabled.put('a', SUCCESS)
+
+    assert disabled.get('a') is None
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 20:34:46
+     $Rev: 12
+"""
+
+# BUILTIN modules
+import asyncio
+
+# Third party modules
+import pytest
+
+# local modules
+from src.tools import status_hub
+from src.tools.status_hub import StatusHub
+from src.api.models import StatusResponseModel
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_hub_runs_while_subscribed(monkeypatch):
+    """ Test that the hub only polls while there are subscribers. """
+    polls = []
+
+    async def get_task_statuses(task_ids: list, _cache: bool) -> dict:
+        polls.append(task_ids)
+        return {task_id: StatusResponseModel(status='SUCCESS') for task_id in task_ids}
+
+    monkeypatch.setattr(status_hub, 'get_task_statuses', get_task_statuses)
+    hub = StatusHub('poll', interval=0.01)
+    queue = hub.subscribe(['a'])
+
+    assert await asyncio.wait_for(queue.get(), 1) == \
+        ('a', StatusResponseModel(status='SUCCESS'))
+
+    hub.unsubscribe(['a'], queue)
+    await asyncio.sleep(0.05)
+    count = len(polls)
+    await asyncio.sleep(0.05)
+
+    assert hub._task is None
+    assert len(polls) == count
+
+    # A new subscriber starts the source again.
+    queue = hub.subscribe(['b'])
+
+    assert (await asyncio.wait_for(queue.get(), 1))[0] == 'b'
+
+    await hub.close()
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 21:08:02
+     $Rev: 12
+"""
+
+# Third party modules
+import pytest
+
+# local modules
+from src.tools.task_durations import TaskDurations, payload_size, size_bucket
+
+# Constants
+NAME = 'tasks.processor'
+""" Recorded task name. """
+
+
+# ---------------------------------------------------------
+#
+def test_payload_size_buckets():
+    """ Test payload sizes of plain values and claim check references. """
+
+    assert payload_size({'a': 1}) == 8
+    assert payload_size({'$claim': 'ref', 'size': 5000}) == 5000
+    assert size_bucket(0) == size_bucket(1) == 1
+    assert size_bucket(1000) == size_bucket(1023) != size_bucket(1024)
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_short_and_long_tasks(fake_worker):
+    """ Test the routing decision from recorded runtimes. """
+    database = fake_worker.backend.database
+    database['task_durations'].insert_many(
+        [{'_id': f'{NAME}:{size_bucket(10)}', 'durations': [0.2] * 9 + [5.0]},
+         {'_id': f'{NAME}:{size_bucket(1000)}', 'durations': [20.0] * 10},
+         {'_id': f'{NAME}:{size_bucket(100)}', 'durations': [0.1] * 2}])
+    durations = TaskDurations(lambda: database, window=100, threshold=1.0, refresh=30)
+
+    assert await durations.is_short(NAME, 10)
+    assert not await durations.is_short(NAME, 1000)
+    assert not await durations.is_short(NAME, 100)
+    assert not await durations.is_short('tasks.unknown', 10)
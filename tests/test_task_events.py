@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 21:04:05
+     $Rev: 12
+"""
+
+# BUILTIN modules
+import socket
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+# local modules
+from src.tools import task_events
+from src.tools.task_events import TaskEventConsumer, TaskStateIndex
+
+
+# ---------------------------------------------------------
+#
+def test_index_keeps_in_flight_states():
+    """ Test that terminal states remove tasks, and that the index is bounded. """
+    index = TaskStateIndex(max_items=2, max_age=60)
+    index.update('a', 'PENDING')
+    index.update('a', 'STARTED')
+    index.update('b', 'PENDING')
+
+    assert index.get('a') == 'STARTED'
+
+    index.update('c', 'PENDING')
+
+    assert len(index) == 2
+    assert index.get('a') is None
+
+    index.update('b', 'SUCCESS')
+
+    assert index.get('b') is None
+    assert len(index) == 1
+
+
+# ---------------------------------------------------------
+#
+def test_index_ignores_old_states(monkeypatch):
+    """ Test that states older than max_age are not trusted. """
+    index = TaskStateIndex(max_items=10, max_age=60)
+    index.update('a', 'STARTED')
+    now = task_events.time.monotonic() + 61
+    monkeypatch.setattr(task_events.time, 'monotonic', lambda: now)
+
+    assert index.get('a') is None
+
+
+# ---------------------------------------------------------
+#
+def test_idle_capture_stops():
+    """ Test that the capture notices a stop while no events arrive. """
+    timeouts = []
+
+    class FakeReceiver:
+        def __init__(self, *_, **__):
+            self.should_stop = False
+
+        def capture(self, timeout: float, **_):
+            timeouts.append(timeout)
+
+            # Stopped while the receiver waits for events (a copied stop
+            # flag, and no timeout, would capture forever).
+            if len(timeouts) == 2:
+                consumer._stopped = True
+
+            raise socket.timeout()
+
+    worker = SimpleNamespace(connection_for_read=lambda: nullcontext(),
+                             events=SimpleNamespace(Receiver=FakeReceiver))
+    consumer = TaskEventConsumer(worker, TaskStateIndex(10, 60))
+    consumer._capture()
+
+    assert timeouts == [task_events.CAPTURE_TIMEOUT] * 2
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 21:08:02
+     $Rev: 12
+"""
+
+# Third party modules
+import pytest
+
+# local modules
+from src.tools.task_owners import TaskOwners
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_owned_tasks(fake_worker):
+    """ Test that a tenant only owns its own recorded tasks. """
+    fake_worker.backend.collection.insert_one({'_id': 't4', 'name': 'tasks.processor'})
+    owners = TaskOwners(fake_worker)
+    await owners.record(['t1', 't2'], 'acme', 'tasks.processor')
+    await owners.record(['t3'], 'other', 'tasks.processor')
+    await owners.record([], 'other', 'tasks.processor')
+
+    assert set(await owners.owned(['t1', 't3', 'unknown'], 'acme')) == {'t1'}
+    assert set(await owners.owned(['t1', 't3', 'unknown'], None)) == {'t1', 't3'}
+    assert (await owners.owned(['t2'], 'acme'))['t2']['name'] == 'tasks.processor'
+
+    # Tasks without an owner record are only found with the service key.
+    assert set(await owners.owned(['t1', 't4'], None)) == {'t1', 't4'}
+    assert set(await owners.owned(['t1', 't4'], 'acme')) == {'t1'}
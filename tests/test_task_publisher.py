@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 21:08:02
+     $Rev: 12
+"""
+
+# Third party modules
+import pytest
+from kombu.serialization import loads
+
+# local modules
+from src.tasks import WORKER, processor
+from src.tools.task_publisher import TaskPublisher
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_task_message_format(fake_publisher):
+    """ Test that published messages are Celery protocol v2 task messages. """
+    args = ({'data': 1}, {'callbackUrl': None, 'callbackQueue': None})
+    task_id = await TaskPublisher(WORKER, fake_publisher).apply_async(
+        processor.name, args, task_id='abc', queue='processor.high')
+    [(routing_key, message)] = fake_publisher.published
+
+    assert task_id == message.correlation_id == 'abc'
+    assert routing_key == 'processor.high'
+    assert list(fake_publisher.queues) == ['processor.high']
+    assert message.headers['task'] == processor.name
+    assert message.headers['id'] == 'abc'
+    assert message.content_type == 'application/json'
+
+    body = loads(message.body, message.content_type, message.content_encoding)
+
+    assert body[0] == list(args)
+    assert body[1] == {}
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.anyio
+async def test_batch_task_ids(fake_publisher):
+    """ Test that every batch task gets its own ID (a shared one is rejected). """
+    publisher = TaskPublisher(WORKER, fake_publisher)
+    args = ({'data': 1}, {'callbackUrl': None, 'callbackQueue': None})
+
+    assert len(set(await publisher.apply_many(processor.name, [args, args]))) == 2
+
+    with pytest.raises(ValueError):
+        await publisher.apply_many(processor.name, [args, args], task_id='abc')
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 21:08:02
+     $Rev: 12
+"""
+
+# BUILTIN modules
+import json
+
+# Third party modules
+from celery import states
+
+# local modules
+from src.tools import task_status
+from src.tasks import EXPIRED, EXPIRED_REASON
+from src.tools.task_status import TERMINAL_STATES, document_to_status, _projection
+
+
+# ---------------------------------------------------------
+#
+def _revoked(reason: str) -> dict:
+    """ Return a projected backend document for a revoked task. """
+    result = {'exc_type': 'TaskRevokedError', 'exc_message': [reason],
+              'exc_module': 'celery.exceptions'}
+    return {'status': states.REVOKED, 'result': json.dumps(result), 'traceback': None}
+
+
+# ---------------------------------------------------------
+#
+def test_expired_status(monkeypatch, fake_worker):
+    """ Test that a task that was revoked because it had expired is EXPIRED. """
+    monkeypatch.setattr(task_status, 'WORKER', fake_worker)
+
+    assert document_to_status(_revoked(EXPIRED_REASON), False).status == EXPIRED
+    assert document_to_status(_revoked(EXPIRED_REASON), True).status == EXPIRED
+    assert document_to_status(_revoked('revoked by client'), False).status == states.REVOKED
+    assert document_to_status({'status': states.STARTED}, False).status == states.STARTED
+
+
+# ---------------------------------------------------------
+#
+def test_projection_skips_non_terminal_results():
+    """ Test that the result and traceback are only fetched for terminal states. """
+    projection = _projection(True)
+    terminal, result, missing = projection['result']['$cond']
+
+    assert projection['status'] == 1
+    assert set(terminal['$in'][1]) == TERMINAL_STATES
+    assert (result, missing) == ('$result', '$$REMOVE')
+    assert projection['traceback']['$cond'][1] == '$traceback'
+    assert 'traceback' not in _projection(False)
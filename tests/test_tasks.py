@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright: Wilde Consulting
+  License: Apache 2.0
+
+VERSION INFO::
+
+    $Repo: fastapi_celery
+  $Author: Anders Wiklund
+    $Date: 2026-10-17 20:58:52
+     $Rev: 12
+"""
+
+# BUILTIN modules
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+# Third party modules
+import pytest
+from celery import Task
+from celery.exceptions import Ignore
+from celery.worker.request import Request
+
+# local modules
+from src import tasks
+from src.tasks import (processor, DeadlineRequest, EXPIRED, EXPIRED_REASON,
+                       EXPIRED_RESULT)
+
+# Constants
+PARAMS = {'callbackUrl': 'http://test/callback', 'callbackQueue': None}
+""" Task parameters with a callback. """
+
+
+# ---------------------------------------------------------
+#
+def _retry(monkeypatch, expires: datetime, calls: list):
+    """ Retry the processor task with the given deadline.
+
+    :param expires: Task deadline.
+    :param calls: Recorded backend, response and retry calls.
+    """
+    backend = SimpleNamespace(
+        mark_as_revoked=lambda task_id, reason, **_: calls.append((task_id, reason)))
+    monkeypatch.setattr(processor, '_backend', backend)
+    monkeypatch.setattr(tasks, 'send_response', lambda *args: calls.append(args))
+    monkeypatch.setattr(Task, 'retry', lambda *_, **__: calls.append('retry'))
+    processor.push_request(id='abc', args=({}, PARAMS), expires=expires.isoformat())
+
+    try:
+        processor.retry()
+
+    finally:
+        processor.pop_request()
+
+
+# ---------------------------------------------------------
+#
+def test_retry_before_deadline(monkeypatch):
+    """ Test that a failed task is retried before its deadline. """
+    calls = []
+    _retry(monkeypatch, datetime.now(timezone.utc) + timedelta(hours=1), calls)
+
+    assert calls == ['retry']
+
+
+# ---------------------------------------------------------
+#
+def test_retry_after_deadline(monkeypatch):
+    """ Test that a failed task is dropped (EXPIRED) after its deadline. """
+    calls = []
+
+    with pytest.raises(Ignore):
+        _retry(monkeypatch, datetime.now(timezone.utc) - timedelta(seconds=1), calls)
+
+    assert calls == [('abc', EXPIRED_REASON), ('abc', EXPIRED, EXPIRED_RESULT, PARAMS)]
+
+
+# ---------------------------------------------------------
+#
+def _announce_expired(monkeypatch, delivery: str, publish: callable) -> list:
+    """ Announce an expired task in the worker main process.
+
+    :param delivery: Callback delivery mode.
+    :param publish: Fake outbox publish method.
+    :return: Recorded expired_response task calls.
+    """
+    calls = []
+    monkeypatch.setattr(Request, '_announce_revoked', lambda *_: None)
+    monkeypatch.setattr(tasks.config, 'callback_delivery', delivery)
+    monkeypatch.setattr(tasks.WORKER, 'producer_or_acquire',
+                        lambda: nullcontext('producer'))
+    monkeypatch.setattr(tasks.OUTBOX, 'publish', publish)
+    monkeypatch.setattr(tasks.expired_response, 'apply_async',
+                        lambda args, **options: calls.append((args, options)))
+
+    request = object.__new__(DeadlineRequest)
+    request.id, request._args = 'abc', ({}, PARAMS)
+    request._announce_revoked('expired', False, None, True)
+    return calls
+
+
+# ---------------------------------------------------------
+#
+def test_expired_outbox(monkeypatch):
+    """ Test that the EXPIRED response is published to the outbox directly. """
+    published = []
+    calls = _announce_expired(monkeypatch, 'outbox',
+                              lambda *args: published.append(args))
+    response = {'job_id': 'abc', 'status': EXPIRED, 'result': EXPIRED_RESULT}
+
+    assert calls == []
+    assert published == [('producer', PARAMS, response)]
+
+
+# ---------------------------------------------------------
+#
+@pytest.mark.parametrize('delivery', ['inline', 'outbox'])
+def test_expired_high_lane(monkeypatch, delivery: str):
+    """ Test that the EXPIRED response is sent from the high lane.
+
+    Used in inline delivery mode, and when the outbox is unavailable.
+    """
+
+    def unavailable(*_):
+        raise ConnectionError('broker is down')
+
+    calls = _announce_expired(monkeypatch, delivery, unavailable)
+
+    assert calls == [(('abc', PARAMS), {'queue': 'processor.high'})]